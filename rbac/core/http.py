@@ -0,0 +1,115 @@
+#
+# Copyright 2026 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Pooled HTTP sessions for the services RBAC talks to."""
+
+import os
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from prometheus_client import Counter, Histogram
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUS_CODES = (502, 503, 504)
+
+http_client_request_duration = Histogram(
+    "rbac_http_client_request_duration_seconds",
+    "Time spent on outgoing HTTP requests, including retries",
+    ["client", "host"],
+)
+http_client_request_status = Counter(
+    "rbac_http_client_requests_total",
+    "Number of outgoing HTTP requests and resulting status",
+    ["client", "host", "status"],
+)
+
+
+class PooledSession:
+    """
+    A keep-alive requests session shared by all the threads of a process.
+
+    The session is created lazily and dropped in forked children, so gunicorn workers never share sockets with the
+    master process. Cookies are never stored, since the same session serves requests made for different users.
+    """
+
+    def __init__(self, client: str, retry_methods: tuple[str, ...] = ("GET",)):
+        """Set up the session for the given client name, retrying only the given idempotent methods."""
+        self.client = client
+        self.retry_methods = retry_methods
+        self._lock = threading.Lock()
+        self._session = None
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        """Forget the session inherited from the parent process."""
+        self._lock = threading.Lock()
+        self._session = None
+
+    def _create_session(self) -> requests.Session:
+        """Create a session with a connection pool and a retry policy."""
+        session = requests.Session()
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        retries = Retry(
+            total=settings.HTTP_CLIENT_RETRIES,
+            backoff_factor=settings.HTTP_CLIENT_RETRY_BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(self.retry_methods),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=settings.HTTP_CLIENT_POOL_CONNECTIONS,
+            pool_maxsize=settings.HTTP_CLIENT_POOL_MAXSIZE,
+            max_retries=retries,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        """Return the session of the current process, creating it on first use."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request through the pool, tracking its duration and status per host."""
+        host = urlsplit(url).hostname or ""
+        response_status = "error"
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+            response_status = str(response.status_code)
+            return response
+        finally:
+            http_client_request_duration.labels(client=self.client, host=host).observe(time.perf_counter() - start)
+            http_client_request_status.labels(client=self.client, host=host, status=response_status).inc()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a POST request."""
+        return self.request("POST", url, **kwargs)
@@ -18,13 +18,22 @@
 
 import json
 import logging
+import threading
 
 from django.conf import settings
+from django.db import transaction
 from kafka import KafkaProducer
 from kafka.errors import KafkaError
+from prometheus_client import Counter
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
+kafka_producer_collapsed_messages_total = Counter(
+    "rbac_kafka_producer_collapsed_messages_total",
+    "Total number of duplicate messages not sent because an identical one was sent on the same commit",
+    ["topic"],
+)
+
 
 class FakeKafkaProducer:
     """Fake kafka producer to enable local development without kafka server."""
@@ -37,6 +46,10 @@ class FakeKafkaProducer:
 class RBACProducer:
     """Kafka message producer to emit events to notification service."""
 
+    def __init__(self):
+        """Init the per-thread state of messages sent on commit."""
+        self._local = threading.local()
+
     def get_producer(self):
         """Init method to return fake kafka when flag is set to false."""
         if not hasattr(self, "producer"):
@@ -49,13 +62,15 @@ class RBACProducer:
                 while retries <= max_retries:
                     try:
                         if settings.KAFKA_AUTH:
-                            self.producer = KafkaProducer(**settings.KAFKA_AUTH)
+                            self.producer = KafkaProducer(**settings.KAFKA_AUTH, **settings.KAFKA_PRODUCER_OPTIONS)
                             logger.info("Kafka producer initialized successfully")
                             return self.producer
                         elif not settings.KAFKA_SERVERS:
                             raise AttributeError("Empty servers list")
                         else:
-                            self.producer = KafkaProducer(bootstrap_servers=settings.KAFKA_SERVERS)
+                            self.producer = KafkaProducer(
+                                bootstrap_servers=settings.KAFKA_SERVERS, **settings.KAFKA_PRODUCER_OPTIONS
+                            )
                             return self.producer
                     except KafkaError as e:
                         logger.error(f"Kafka error during initialization of Kafka producer: {e}")
@@ -67,11 +82,55 @@ class RBACProducer:
 
     def send_kafka_message(self, topic, message, headers=None):
         """Send message to kafka server."""
-        producer = self.get_producer()
         json_data = json.dumps(message).encode("utf-8")
+        self.send_serialized_kafka_message(topic, json_data, headers)
+
+    def send_serialized_kafka_message(self, topic, value, headers=None):
+        """Send an already serialized message to kafka server."""
+        producer = self.get_producer()
         if headers and not isinstance(headers, list):
             headers = [headers]
-        producer.send(topic, value=json_data, headers=headers)
+        producer.send(topic, value=value, headers=headers)
+
+    def send_kafka_message_on_commit(self, topic, dedup_key, build_message, build_headers=None):
+        """Send the message returned by build_message() once the current transaction commits.
+
+        The message (and its headers) are only built for messages that are sent: messages whose
+        transaction (or savepoint) is rolled back are dropped, and of the messages with the same
+        dedup_key on the same commit only the first one is sent. A failed send is logged without failing the
+        request or skipping the other commit hooks, since the change is already committed. Without
+        KAFKA_PRODUCER_DEFER_UNTIL_COMMIT the message is sent right away.
+        """
+        if not settings.KAFKA_PRODUCER_DEFER_UNTIL_COMMIT:
+            self._send_built_message(topic, build_message, build_headers)
+            return
+        sent = self._sent_on_commit()
+        # Keys are only recorded while commit callbacks run, so leftovers belong to an earlier commit.
+        if sent:
+            sent.clear()
+        key = (topic, dedup_key)
+
+        def send():
+            if key in sent:
+                kafka_producer_collapsed_messages_total.labels(topic).inc()
+                return
+            sent.add(key)
+            self._send_built_message(topic, build_message, build_headers)
+
+        transaction.on_commit(send, robust=True)
+
+    def _send_built_message(self, topic, build_message, build_headers):
+        """Build and send a message."""
+        if build_headers is None:
+            self.send_kafka_message(topic, build_message())
+        else:
+            self.send_kafka_message(topic, build_message(), build_headers())
+
+    def _sent_on_commit(self):
+        """Return the keys of the messages sent by the running commit on the current thread."""
+        if not hasattr(self._local, "sent"):
+            self._local.sent = set()
+        return self._local.sent
 
 
 """
@@ -28,13 +28,14 @@ from typing import Any, Dict, List, Optional
 
 import grpc
 from django.conf import settings
-from django.db import connection
+from django.db import close_old_connections, connection
 from google.protobuf import json_format
 from kafka import KafkaConsumer, TopicPartition
 from kafka.consumer.subscription_state import ConsumerRebalanceListener
 from kafka.errors import KafkaError
 from kafka.structs import OffsetAndMetadata
 from kessel.relations.v1beta1 import common_pb2
+from management.cache import KesselLookupCache
 from management.relation_replicator.relations_api_replicator import (
     RelationsApiReplicator,
 )
@@ -138,6 +139,23 @@ replication_event_latency = Histogram(
     buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
 )
 
+batch_size_messages = Histogram(
+    "rbac_kafka_consumer_batch_size_messages",
+    "Number of replication messages applied per micro-batch",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+
+batch_superseded_relations_total = Counter(
+    "rbac_kafka_consumer_batch_superseded_relations_total",
+    "Relationship operations dropped because a later message in the same micro-batch superseded them",
+)
+
+consistency_token_flushes_total = Counter(
+    "rbac_kafka_consumer_consistency_token_flushes_total",
+    "Total number of consistency token flushes to the database",
+    ["status"],  # success, failure
+)
+
 
 @dataclass
 class RetryConfig:
@@ -183,6 +201,19 @@ class CommitConfig:
     commit_on_shutdown: bool = True  # Commit offsets on shutdown
 
 
+@dataclass
+class BatchConfig:
+    """Configuration for micro-batching replication messages."""
+
+    max_size: int = 0  # Max messages replicated as one net delta (0 = batching disabled)
+    max_linger_ms: int = 100  # Max time to wait for a batch to fill
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if micro-batching is enabled."""
+        return self.max_size > 0
+
+
 @dataclass
 class DebeziumMessage:
     """Represents a validated Debezium message."""
@@ -219,6 +250,50 @@ class ReplicationMessage:
         )
 
 
+class ReplicationBatch:
+    """Net relationship delta of several replication messages, folded in offset order.
+
+    Only the last operation on each relationship survives, so an add that is later removed
+    in the same batch becomes a single delete (and vice versa). Within a message removes
+    are folded before adds, matching the delete-then-write order of single message processing.
+    """
+
+    def __init__(self):
+        """Initialize an empty batch."""
+        self.messages: List[DebeziumMessage] = []
+        self.superseded = 0
+        self._delta: Dict[bytes, tuple] = {}
+
+    def add(
+        self,
+        debezium_msg: DebeziumMessage,
+        relations_to_add: List[common_pb2.Relationship],
+        relations_to_remove: List[common_pb2.Relationship],
+    ):
+        """Fold the relationships of one message into the batch."""
+        self.messages.append(debezium_msg)
+        for relationship in relations_to_remove:
+            self._apply(relationship, add=False)
+        for relationship in relations_to_add:
+            self._apply(relationship, add=True)
+
+    def _apply(self, relationship: common_pb2.Relationship, add: bool):
+        key = relationship.SerializeToString(deterministic=True)
+        if self._delta.pop(key, None) is not None:
+            self.superseded += 1
+        self._delta[key] = (add, relationship)
+
+    @property
+    def relations_to_add(self) -> List[common_pb2.Relationship]:
+        """Relationships to create for the net delta."""
+        return [relationship for add, relationship in self._delta.values() if add]
+
+    @property
+    def relations_to_remove(self) -> List[common_pb2.Relationship]:
+        """Relationships to delete for the net delta."""
+        return [relationship for add, relationship in self._delta.values() if not add]
+
+
 class MessageValidator:
     """Validates Kafka messages."""
 
@@ -462,15 +537,17 @@ class OffsetManager:
     consumer loop cleaner and easier to understand.
     """
 
-    def __init__(self, consumer: KafkaConsumer, commit_config: CommitConfig):
+    def __init__(self, consumer: KafkaConsumer, commit_config: CommitConfig, pre_commit=None):
         """Initialize the offset manager.
 
         Args:
             consumer: The Kafka consumer instance
             commit_config: Configuration for commit behavior
+            pre_commit: Optional callable run before every commit; offsets are not committed if it raises
         """
         self.consumer = consumer
         self.commit_config = commit_config
+        self.pre_commit = pre_commit
         # Store tuples of (offset, leader_epoch) for each partition
         self.stored_offsets: Dict[TopicPartition, tuple] = {}
         self.offset_mutex = threading.Lock()
@@ -527,6 +604,13 @@ class OffsetManager:
 
             offsets_to_commit = self.stored_offsets.copy()
 
+        if self.pre_commit:
+            try:
+                self.pre_commit()
+            except Exception as e:
+                logger.error(f"Pre-commit hook failed, offsets NOT committed: {type(e).__name__}: {e}")
+                return False, 0
+
         # Initialize offset_dict before try block to avoid scoping issues
         offset_dict = None
 
@@ -596,6 +680,98 @@ class OffsetManager:
             self.stored_offsets.clear()
 
 
+class ConsistencyTokenStore:
+    """Write-behind store for tenant relations consistency tokens.
+
+    Keeps the latest token per org_id in memory and writes them with a single
+    UPDATE ... FROM (VALUES ...) that only touches the token column. Changes to relations
+    shared by all tenants (the public tenant's, or those of no tenant at all) are not covered
+    by any tenant's token, so flushing them invalidates the Kessel lookups of all tenants.
+    """
+
+    def __init__(self, flush_interval: float = 0.0):
+        """Initialize the token store.
+
+        Args:
+            flush_interval: Seconds between flushes (0 = flush after every message)
+        """
+        self.flush_interval = flush_interval
+        self.pending: Dict[str, str] = {}
+        self.shared_changed = False
+        self._mutex = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def record(self, org_id: str, token: str):
+        """Record the latest consistency token for an org_id (thread-safe)."""
+        with self._mutex:
+            self.pending[org_id] = token
+
+    def record_shared_change(self):
+        """Record that relations which belong to no tenant changed (thread-safe)."""
+        with self._mutex:
+            self.shared_changed = True
+
+    def should_flush(self) -> bool:
+        """Check if pending tokens are due to be written."""
+        has_pending = bool(self.pending) or self.shared_changed
+        return has_pending and time.monotonic() - self._last_flush >= self.flush_interval
+
+    def flush(self) -> int:
+        """Write all pending tokens with one UPDATE (thread-safe).
+
+        Returns:
+            int: The number of tenants updated
+
+        Raises:
+            Exception: If the update fails; the tokens are kept for the next flush
+        """
+        with self._mutex:
+            tokens, self.pending = self.pending, {}
+            shared_changed, self.shared_changed = self.shared_changed, False
+        self._last_flush = time.monotonic()
+        if not tokens:
+            if shared_changed:
+                KesselLookupCache().bump_generation()
+            return 0
+
+        update_sql = sql.SQL(
+            "UPDATE {table} SET {column} = v.token FROM (VALUES {values}) AS v(org_id, token) "
+            "WHERE {table}.{org_id} = v.org_id RETURNING {table}.{org_id}, {table}.{tenant_name}"
+        ).format(
+            table=sql.Identifier(Tenant._meta.db_table),
+            column=sql.Identifier("relations_consistency_token"),
+            org_id=sql.Identifier("org_id"),
+            tenant_name=sql.Identifier("tenant_name"),
+            values=sql.SQL(", ").join([sql.SQL("(%s, %s)")] * len(tokens)),
+        )
+        params = [value for item in tokens.items() for value in item]
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(update_sql, params)
+                updated_tenants = dict(cursor.fetchall())
+        except Exception:
+            consistency_token_flushes_total.labels(status="failure").inc()
+            with self._mutex:
+                # Tokens recorded while flushing are newer and take precedence
+                self.pending = {**tokens, **self.pending}
+                self.shared_changed = self.shared_changed or shared_changed
+            raise
+
+        consistency_token_flushes_total.labels(status="success").inc()
+        updated = len(updated_tenants)
+        missing_org_ids = sorted(tokens.keys() - updated_tenants.keys())
+        if shared_changed or missing_org_ids or Tenant.PUBLIC_TENANT_NAME in updated_tenants.values():
+            KesselLookupCache().bump_generation()
+        if missing_org_ids:
+            logger.warning(
+                f"Tenants not found for some org_ids: {missing_org_ids}. "
+                f"Unable to save {len(missing_org_ids)} consistency token(s)"
+            )
+        logger.debug(f"Flushed consistency tokens for {updated} tenant(s)")
+        return updated
+
+
 class RebalanceListener(ConsumerRebalanceListener):
     """Listen for Kafka consumer rebalance events.
 
@@ -716,6 +892,7 @@ class RBACKafkaConsumer:
         health_check_interval: int = 30,
         retry_config: Optional[RetryConfig] = None,
         commit_config: Optional[CommitConfig] = None,
+        batch_config: Optional[BatchConfig] = None,
     ):
         """Initialize the consumer."""
         self.topic = topic or settings.RBAC_KAFKA_CONSUMER_TOPIC
@@ -723,6 +900,12 @@ class RBACKafkaConsumer:
         self.validator = MessageValidator()
         self.retry_config = retry_config or RetryConfig()
         self.commit_config = commit_config or CommitConfig()
+        self.batch_config = batch_config or BatchConfig(
+            max_size=settings.RBAC_KAFKA_CONSUMER_BATCH_SIZE,
+            max_linger_ms=settings.RBAC_KAFKA_CONSUMER_BATCH_LINGER_MS,
+        )
+        # Consistency tokens are written behind and always flushed before offsets are committed
+        self.token_store = ConsistencyTokenStore(settings.RBAC_KAFKA_CONSUMER_TOKEN_FLUSH_INTERVAL)
         self.liveness_file = Path("/tmp/kubernetes-liveness")
         self.readiness_file = Path("/tmp/kubernetes-readiness")
         self.is_healthy = False
@@ -1109,6 +1292,30 @@ class RBACKafkaConsumer:
         Returns:
             bool: True if message processed successfully, False only on shutdown (InterruptedError)
 
+        Raises:
+            Exception: Re-raises any exception that should stop the consumer
+        """
+        return self._run_with_retry(
+            lambda: self._process_single(message_value, message_partition, message_offset),
+            message_partition,
+            message_offset,
+            message_value,
+            error_handler,
+        )
+
+    def _run_with_retry(self, process, message_partition: int, message_offset, message_content, error_handler=None):
+        """Run a processing callable with the consumer retry policy.
+
+        Args:
+            process: Callable returning a truthy value on success
+            message_partition: The partition number (for logging)
+            message_offset: The message offset or offset range (for logging)
+            message_content: The message content (for logging)
+            error_handler: Optional callable(Exception) -> bool to short-circuit retries
+
+        Returns:
+            bool: True if processed successfully, False only on shutdown (InterruptedError)
+
         Raises:
             Exception: Re-raises any exception that should stop the consumer
         """  # noqa: D202
@@ -1142,7 +1349,7 @@ class RBACKafkaConsumer:
         def process_wrapper():
             """Wrap message processing for retry logic."""
             # Process the message
-            success = self._process_single(message_value, message_partition, message_offset)
+            success = process()
 
             # If processing returned False, treat as an error and retry
             if not success:
@@ -1171,7 +1378,7 @@ class RBACKafkaConsumer:
                 f"Consumer will STOP to allow Kubernetes restart.\n"
                 f"Offset NOT committed - message will be retried on restart.\n"
                 f"To resolve: Fix the issue. Kubernetes will restart the pod automatically.\n"
-                f"Message content: {message_value}"
+                f"Message content: {message_content}"
             )
             logger.error(error_msg)
             messages_processed_total.labels(message_type="unknown", status="max_retries_exceeded").inc()
@@ -1233,23 +1440,7 @@ class RBACKafkaConsumer:
                     f"Replication message validation failed for aggregateid: {debezium_msg.aggregateid}"
                 )
 
-            resource_context = debezium_msg.payload.get("resource_context")
-            org_id = None
-            event_type = None
-            resource_id = None
-            created_at = None
-
-            # Extract org_id, event_type, resource_id, and created_at from resource_context if present
-            if resource_context and isinstance(resource_context, dict):
-                org_id = resource_context.get("org_id")
-                event_type = resource_context.get("event_type")
-                resource_id = resource_context.get("resource_id")
-                created_at = resource_context.get("created_at")
-            else:
-                logger.debug(
-                    f"No resource_context found, skipping org_id and event_type extraction. "
-                    f"aggregateid: {debezium_msg.aggregateid}"
-                )
+            org_id, event_type, resource_id, created_at = self._extract_resource_context(debezium_msg)
 
             # Create structured replication message
             replication_msg = ReplicationMessage.from_payload(debezium_msg.payload)
@@ -1262,66 +1453,15 @@ class RBACKafkaConsumer:
             )
 
             # Convert JSON dictionaries to protobuf objects
-            relations_to_add_pb = []
-            for relation_dict in replication_msg.relations_to_add:
-                relation_pb = json_format.ParseDict(relation_dict, common_pb2.Relationship())
-                relations_to_add_pb.append(relation_pb)
-
-            relations_to_remove_pb = []
-            for relation_dict in replication_msg.relations_to_remove:
-                relation_pb = json_format.ParseDict(relation_dict, common_pb2.Relationship())
-                relations_to_remove_pb.append(relation_pb)
-
-            # Build fencing check with lock token (thread-safe read)
-            # Note: Lock token should be available because _run_message_loop calls
-            # _ensure_lock_token_on_assignment before processing the first message.
-            # However, if that acquisition failed or token was cleared, we fail fast here.
-            fencing_check = None
-            with self._lock_mutex:
-                if self.lock_id and self.lock_token:
-                    from kessel.relations.v1beta1 import relation_tuples_pb2
+            relations_to_add_pb = self._to_relationships(replication_msg.relations_to_add)
+            relations_to_remove_pb = self._to_relationships(replication_msg.relations_to_remove)
 
-                    fencing_check = relation_tuples_pb2.FencingCheck(
-                        lock_id=self.lock_id,
-                        lock_token=self.lock_token,
-                    )
-                    logger.debug(
-                        f"Using fencing check - lock_id: {self.lock_id}, " f"lock_token: {self.lock_token[:8]}..."
-                    )
-                else:
-                    # Lock token not available - fail fast to prevent writes without fencing
-                    error_msg = (
-                        "Lock token not available during message processing. "
-                        "This indicates partition assignment failed or token was cleared. "
-                        "Cannot process message without fencing token."
-                    )
-                    logger.error(error_msg)
-                    raise RuntimeError(error_msg)
-
-            # Do tuple deletes for relationships with fencing check
-            replication_delete_response = relations_api_replication.delete_relationships(
-                relationships=relations_to_remove_pb, fencing_check=fencing_check
-            )
-
-            # Do tuple writes for relationships with fencing check
-            replication_add_response = relations_api_replication.write_relationships(
-                relationships=relations_to_add_pb, fencing_check=fencing_check
-            )
-
-            # Extract consistency token from responses
-            token = getattr(replication_add_response.consistency_token, "token", None) or getattr(
-                replication_delete_response.consistency_token, "token", None
-            )
+            token = self._replicate_relationships(relations_to_add_pb, relations_to_remove_pb)
 
             if token and org_id:
-                try:
-                    tenant = Tenant.objects.get(org_id=org_id)
-                    tenant.relations_consistency_token = token
-                    tenant.save()
-                except Tenant.DoesNotExist:
-                    logger.warning(
-                        f"Tenant not found for org_id: {org_id}. " f"Unable to save consistency token: {token}"
-                    )
+                self.token_store.record(org_id, token)
+            elif token:
+                self.token_store.record_shared_change()
             else:
                 logger.warning(
                     f"No consistency token in either write or delete response - "
@@ -1331,52 +1471,13 @@ class RBACKafkaConsumer:
 
             # Send NOTIFY for workspace creation events (Read-Your-Writes support)
             if event_type == "create_workspace" and resource_id:
-                logger.info(
-                    "Workspace create event processed - org_id=%s, workspace_id=%s, consistency_token=%s",
-                    org_id,
-                    resource_id,
-                    token,
-                )
-                try:
-                    notify_channel = settings.READ_YOUR_WRITES_CHANNEL
-                    notify_sql = sql.SQL("NOTIFY {}, %s").format(sql.Identifier(notify_channel))
-                    with connection.cursor() as cursor:
-                        # nosemgrep: python.sqlalchemy.security.sqlalchemy-execute-raw-query
-                        # Safe: Using psycopg2.sql.SQL with sql.Identifier for channel name
-                        # and parameterized query (%s) for resource_id
-                        cursor.execute(notify_sql, [resource_id])
-                    logger.info(
-                        f"Sent NOTIFY on channel '{notify_channel}' for workspace_id '{resource_id}' "
-                        f"after successful replication"
-                    )
-                except Exception as e:
-                    # Log error but don't fail the processing - NOTIFY is best-effort
-                    logger.error(
-                        f"Failed to send NOTIFY for workspace_id '{resource_id}' on channel '{notify_channel}': {e}"
-                    )
+                # Listeners read the tenant token as soon as they are notified
+                self.token_store.flush()
+                self._notify_workspace_created(org_id, resource_id, token)
+            elif self.token_store.should_flush():
+                self.token_store.flush()
 
-            # Calculate and emit replication latency metric
-            if created_at is not None:
-                try:
-                    latency_seconds = time.time() - float(created_at)
-                    latency_event_type = event_type or "unknown"
-                    replication_event_latency.labels(event_type=latency_event_type).observe(latency_seconds)
-                    # Log per-event latency at DEBUG level to avoid excessive log volume at scale
-                    logger.debug(
-                        "Replication event latency: %.3fs for event_type=%s, aggregateid=%s",
-                        latency_seconds,
-                        latency_event_type,
-                        debezium_msg.aggregateid,
-                    )
-                except (ValueError, TypeError) as e:
-                    logger.warning(
-                        f"Could not calculate replication latency: invalid created_at value '{created_at}': {e}"
-                    )
-            else:
-                logger.debug(
-                    f"No created_at timestamp in resource_context, skipping latency metric. "
-                    f"aggregateid: {debezium_msg.aggregateid}"
-                )
+            self._observe_replication_latency(event_type, created_at, debezium_msg.aggregateid)
 
             messages_processed_total.labels(message_type="relations", status="success").inc()
             return True
@@ -1385,30 +1486,219 @@ class RBACKafkaConsumer:
             # Re-raise ValidationError - will NOT be retried (non-retryable)
             raise
         except grpc.RpcError as e:
-            # Handle gRPC errors specially to check for invalid fencing tokens
-            if e.code() == grpc.StatusCode.FAILED_PRECONDITION:
-                # Invalid fencing token - partition was reassigned to another consumer
-                error_msg = (
-                    f"Fencing token validation failed - partition reassigned. "
-                    f"Lock ID: {self.lock_id}, Token: {self.lock_token}. "
-                    f"Consumer will stop processing to prevent stale updates."
-                )
-                logger.error(error_msg)
-                messages_processed_total.labels(message_type="relations", status="fencing_failed").inc()
-                # Raise a RuntimeError to stop the consumer - this is a fatal error
-                # The partition has been reassigned, so we should not continue processing
-                raise RuntimeError(error_msg) from e
-            else:
-                # Other gRPC errors - log and re-raise to trigger retry
-                logger.error(f"gRPC error processing relations message: {e.code()}: {e.details()}")
-                messages_processed_total.labels(message_type="relations", status="grpc_error").inc()
-                raise
+            self._raise_for_rpc_error(e)
         except Exception as e:
             logger.error(f"Error processing relations message: {e}")
             messages_processed_total.labels(message_type="relations", status="error").inc()
             # Re-raise to trigger retry logic
             raise
 
+    def _process_batch(self, message_values: List[Dict[str, Any]]) -> bool:
+        """Replicate several Debezium messages as one net relationship delta.
+
+        The batch is sent as a single delete + write pair under the fencing token. Per-message
+        side effects (workspace NOTIFY, latency metrics) run after the delta has been replicated.
+
+        Raises:
+            ValidationError: If any message in the batch is invalid
+            Other exceptions: If replication fails
+        """
+        with message_processing_duration.labels(message_type="relations_batch").time():
+            batch = ReplicationBatch()
+            for message_value in message_values:
+                debezium_msg = DebeziumMessage.from_kafka_message(self._parse_debezium_message(message_value))
+                if not self.validator.validate_replication_message(debezium_msg.payload):
+                    logger.error(f"Replication message validation failed. Payload content: {debezium_msg.payload}")
+                    messages_processed_total.labels(message_type="relations", status="validation_failed").inc()
+                    raise ValidationError(
+                        f"Replication message validation failed for aggregateid: {debezium_msg.aggregateid}"
+                    )
+                replication_msg = ReplicationMessage.from_payload(debezium_msg.payload)
+                batch.add(
+                    debezium_msg,
+                    self._to_relationships(replication_msg.relations_to_add),
+                    self._to_relationships(replication_msg.relations_to_remove),
+                )
+
+            relations_to_add_pb = batch.relations_to_add
+            relations_to_remove_pb = batch.relations_to_remove
+            logger.info(
+                f"Processing relations batch - messages: {len(batch.messages)}, "
+                f"relations_to_add: {len(relations_to_add_pb)}, "
+                f"relations_to_remove: {len(relations_to_remove_pb)}, "
+                f"superseded: {batch.superseded}"
+            )
+
+            try:
+                token = self._replicate_relationships(relations_to_add_pb, relations_to_remove_pb)
+            except grpc.RpcError as e:
+                self._raise_for_rpc_error(e)
+
+            contexts = [self._extract_resource_context(debezium_msg) for debezium_msg in batch.messages]
+            org_ids = {org_id for org_id, _, _, _ in contexts if org_id}
+            if token:
+                for org_id in org_ids:
+                    self.token_store.record(org_id, token)
+                if not all(org_id for org_id, _, _, _ in contexts):
+                    self.token_store.record_shared_change()
+            else:
+                logger.warning(f"No consistency token in either write or delete response - org_ids: {org_ids}")
+
+            # Listeners of workspace creations read the tenant token as soon as they are notified;
+            # otherwise the tokens are flushed by the offset commit that follows the batch
+            if any(event_type == "create_workspace" and resource_id for _, event_type, resource_id, _ in contexts):
+                self.token_store.flush()
+
+            for debezium_msg, (org_id, event_type, resource_id, created_at) in zip(batch.messages, contexts):
+                if event_type == "create_workspace" and resource_id:
+                    self._notify_workspace_created(org_id, resource_id, token)
+                self._observe_replication_latency(event_type, created_at, debezium_msg.aggregateid)
+
+            batch_size_messages.observe(len(batch.messages))
+            batch_superseded_relations_total.inc(batch.superseded)
+            messages_processed_total.labels(message_type="relations", status="success").inc(len(batch.messages))
+            return True
+
+    def _extract_resource_context(self, debezium_msg: DebeziumMessage) -> tuple:
+        """Return (org_id, event_type, resource_id, created_at) from the message resource_context."""
+        resource_context = debezium_msg.payload.get("resource_context")
+
+        if resource_context and isinstance(resource_context, dict):
+            return (
+                resource_context.get("org_id"),
+                resource_context.get("event_type"),
+                resource_context.get("resource_id"),
+                resource_context.get("created_at"),
+            )
+
+        logger.debug(
+            f"No resource_context found, skipping org_id and event_type extraction. "
+            f"aggregateid: {debezium_msg.aggregateid}"
+        )
+        return None, None, None, None
+
+    @staticmethod
+    def _to_relationships(relation_dicts: List[Dict[str, Any]]) -> List[common_pb2.Relationship]:
+        """Convert JSON relation dictionaries to protobuf relationships."""
+        return [json_format.ParseDict(relation_dict, common_pb2.Relationship()) for relation_dict in relation_dicts]
+
+    def _build_fencing_check(self):
+        """Build the fencing check from the current lock token (thread-safe read).
+
+        Note: Lock token should be available because _run_message_loop calls
+        _ensure_lock_token_on_assignment before processing the first message.
+        However, if that acquisition failed or token was cleared, we fail fast here.
+        """
+        with self._lock_mutex:
+            if self.lock_id and self.lock_token:
+                from kessel.relations.v1beta1 import relation_tuples_pb2
+
+                logger.debug(
+                    f"Using fencing check - lock_id: {self.lock_id}, " f"lock_token: {self.lock_token[:8]}..."
+                )
+                return relation_tuples_pb2.FencingCheck(
+                    lock_id=self.lock_id,
+                    lock_token=self.lock_token,
+                )
+
+        # Lock token not available - fail fast to prevent writes without fencing
+        error_msg = (
+            "Lock token not available during message processing. "
+            "This indicates partition assignment failed or token was cleared. "
+            "Cannot process message without fencing token."
+        )
+        logger.error(error_msg)
+        raise RuntimeError(error_msg)
+
+    def _replicate_relationships(
+        self,
+        relations_to_add_pb: List[common_pb2.Relationship],
+        relations_to_remove_pb: List[common_pb2.Relationship],
+    ) -> Optional[str]:
+        """Delete then write relationships under the fencing token and return the consistency token."""
+        fencing_check = self._build_fencing_check()
+
+        # Do tuple deletes for relationships with fencing check
+        replication_delete_response = relations_api_replication.delete_relationships(
+            relationships=relations_to_remove_pb, fencing_check=fencing_check
+        )
+
+        # Do tuple writes for relationships with fencing check
+        replication_add_response = relations_api_replication.write_relationships(
+            relationships=relations_to_add_pb, fencing_check=fencing_check
+        )
+
+        # Extract consistency token from responses
+        return getattr(replication_add_response.consistency_token, "token", None) or getattr(
+            replication_delete_response.consistency_token, "token", None
+        )
+
+    def _notify_workspace_created(self, org_id: Optional[str], resource_id: str, token: Optional[str]):
+        """Send NOTIFY for a replicated workspace creation (Read-Your-Writes support)."""
+        logger.info(
+            "Workspace create event processed - org_id=%s, workspace_id=%s, consistency_token=%s",
+            org_id,
+            resource_id,
+            token,
+        )
+        notify_channel = settings.READ_YOUR_WRITES_CHANNEL
+        try:
+            notify_sql = sql.SQL("NOTIFY {}, %s").format(sql.Identifier(notify_channel))
+            with connection.cursor() as cursor:
+                # nosemgrep: python.sqlalchemy.security.sqlalchemy-execute-raw-query
+                # Safe: Using psycopg2.sql.SQL with sql.Identifier for channel name
+                # and parameterized query (%s) for resource_id
+                cursor.execute(notify_sql, [resource_id])
+            logger.info(
+                f"Sent NOTIFY on channel '{notify_channel}' for workspace_id '{resource_id}' "
+                f"after successful replication"
+            )
+        except Exception as e:
+            # Log error but don't fail the processing - NOTIFY is best-effort
+            logger.error(f"Failed to send NOTIFY for workspace_id '{resource_id}' on channel '{notify_channel}': {e}")
+
+    def _observe_replication_latency(self, event_type: Optional[str], created_at: Any, aggregateid: str):
+        """Calculate and emit the replication latency metric for one event."""
+        if created_at is None:
+            logger.debug(
+                f"No created_at timestamp in resource_context, skipping latency metric. " f"aggregateid: {aggregateid}"
+            )
+            return
+
+        try:
+            latency_seconds = time.time() - float(created_at)
+            latency_event_type = event_type or "unknown"
+            replication_event_latency.labels(event_type=latency_event_type).observe(latency_seconds)
+            # Log per-event latency at DEBUG level to avoid excessive log volume at scale
+            logger.debug(
+                "Replication event latency: %.3fs for event_type=%s, aggregateid=%s",
+                latency_seconds,
+                latency_event_type,
+                aggregateid,
+            )
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Could not calculate replication latency: invalid created_at value '{created_at}': {e}")
+
+    def _raise_for_rpc_error(self, e: grpc.RpcError):
+        """Re-raise a Relations API error, translating invalid fencing tokens into a fatal error."""
+        if e.code() == grpc.StatusCode.FAILED_PRECONDITION:
+            # Invalid fencing token - partition was reassigned to another consumer
+            error_msg = (
+                f"Fencing token validation failed - partition reassigned. "
+                f"Lock ID: {self.lock_id}, Token: {self.lock_token}. "
+                f"Consumer will stop processing to prevent stale updates."
+            )
+            logger.error(error_msg)
+            messages_processed_total.labels(message_type="relations", status="fencing_failed").inc()
+            # Raise a RuntimeError to stop the consumer - this is a fatal error
+            # The partition has been reassigned, so we should not continue processing
+            raise RuntimeError(error_msg) from e
+
+        # Other gRPC errors - log and re-raise to trigger retry
+        logger.error(f"gRPC error processing relations message: {e.code()}: {e.details()}")
+        messages_processed_total.labels(message_type="relations", status="grpc_error").inc()
+        raise e
+
     def _initialize_consumer_setup(self):
         """Initialize consumer, subscribe to topic, and prepare for consumption.
 
@@ -1416,7 +1706,7 @@ class RBACKafkaConsumer:
             RebalanceListener: The rebalance listener instance
         """
         self.consumer = self._create_consumer()
-        self.offset_manager = OffsetManager(self.consumer, self.commit_config)
+        self.offset_manager = OffsetManager(self.consumer, self.commit_config, pre_commit=self.token_store.flush)
 
         # Subscribe to topic with rebalance listener
         rebalance_listener = RebalanceListener(self)
@@ -1631,37 +1921,80 @@ class RBACKafkaConsumer:
             logger.error(f"Failed to acquire lock token for {lock_id}: {e} (took {duration:.2f}s)")
             raise RuntimeError(f"Failed to acquire lock token for partition {partition.partition}") from e
 
-    def _run_message_loop(self):
-        """Run the main message consumption loop."""
-        last_committed_offsets = {}
+    def _ensure_ready_to_process(self, message, last_committed_offsets):
+        """Verify the consumer holds a fencing token before processing a message.
+
+        Args:
+            message: The next Kafka message to process
+            last_committed_offsets: Dict tracking last committed offsets (empty before the first message)
 
-        for message in self.consumer:
-            # Check if lock acquisition failed during rebalance
-            if self.lock_acquisition_failed:
+        Raises:
+            RuntimeError: If no lock token can be held for the assigned partition
+        """
+        # Check if lock acquisition failed during rebalance
+        if self.lock_acquisition_failed:
+            error_msg = (
+                "Lock acquisition failed during rebalance. Cannot process messages without fencing token. "
+                "Stopping consumer to prevent data corruption."
+            )
+            logger.critical(error_msg)
+            raise RuntimeError(error_msg)
+
+        # On first message, ensure we have a lock token
+        # This handles cases where on_partitions_assigned doesn't fire
+        if not last_committed_offsets:
+            token_acquired = self._ensure_lock_token_on_assignment()
+            if not token_acquired:
+                # Partitions not assigned yet - this should not happen since we have a message
+                # This is a fatal error - we cannot process without partition assignment
                 error_msg = (
-                    "Lock acquisition failed during rebalance. Cannot process messages without fencing token. "
-                    "Stopping consumer to prevent data corruption."
+                    f"Received message but no partitions assigned. "
+                    f"Message partition: {message.partition}, offset: {message.offset}. "
+                    f"This indicates a Kafka consumer state issue. "
+                    f"Cannot proceed without partition assignment - stopping consumer."
                 )
-                logger.critical(error_msg)
+                logger.error(error_msg)
+                # Raise error to stop consumer - at-least-once delivery will be preserved
+                # because offset was not committed. Message will be retried on restart.
                 raise RuntimeError(error_msg)
 
-            # On first message, ensure we have a lock token
-            # This handles cases where on_partitions_assigned doesn't fire
-            if not last_committed_offsets:
-                token_acquired = self._ensure_lock_token_on_assignment()
-                if not token_acquired:
-                    # Partitions not assigned yet - this should not happen since we have a message
-                    # This is a fatal error - we cannot process without partition assignment
-                    error_msg = (
-                        f"Received message but no partitions assigned. "
-                        f"Message partition: {message.partition}, offset: {message.offset}. "
-                        f"This indicates a Kafka consumer state issue. "
-                        f"Cannot proceed without partition assignment - stopping consumer."
-                    )
-                    logger.error(error_msg)
-                    # Raise error to stop consumer - at-least-once delivery will be preserved
-                    # because offset was not committed. Message will be retried on restart.
-                    raise RuntimeError(error_msg)
+    def _flush_tokens_while_idle(self):
+        """Flush due consistency tokens while no messages arrive.
+
+        The database connection may have been dropped while idle, so it is checked first. A failed flush keeps the
+        tokens, which are written by the next due flush or the flush before the next offset commit.
+        """
+        if not self.token_store.should_flush():
+            return
+        close_old_connections()
+        try:
+            self.token_store.flush()
+        except Exception as e:
+            logger.warning(f"Failed to flush consistency tokens while idle, retrying later: {e}")
+
+    def _iter_messages(self):
+        """Yield consumed messages, flushing due consistency tokens while no messages arrive.
+
+        Tokens are written after every message without a flush interval, so the consumer is iterated directly.
+        """
+        if not self.token_store.flush_interval:
+            yield from self.consumer
+            return
+
+        timeout_ms = int(self.token_store.flush_interval * 1000)
+        while self.is_consuming:
+            polled = self.consumer.poll(timeout_ms=timeout_ms, max_records=1)
+            if not polled:
+                self._flush_tokens_while_idle()
+            for messages in polled.values():
+                yield from messages
+
+    def _run_message_loop(self):
+        """Run the main message consumption loop."""
+        last_committed_offsets = {}
+
+        for message in self._iter_messages():
+            self._ensure_ready_to_process(message, last_committed_offsets)
 
             try:
                 topic_partition = TopicPartition(message.topic, message.partition)
@@ -1698,6 +2031,116 @@ class RBACKafkaConsumer:
                 messages_processed_total.labels(message_type="unknown", status="unexpected_error").inc()
                 raise
 
+    def _poll_batch(self) -> Dict[TopicPartition, list]:
+        """Poll until the batch is full or the linger time has elapsed.
+
+        Returns:
+            dict: Messages per TopicPartition in offset order (may be empty)
+        """
+        max_size = self.batch_config.max_size
+        deadline = time.monotonic() + self.batch_config.max_linger_ms / 1000
+        records: Dict[TopicPartition, list] = {}
+        count = 0
+
+        while self.is_consuming and count < max_size:
+            remaining_ms = max(int((deadline - time.monotonic()) * 1000), 0)
+            polled = self.consumer.poll(timeout_ms=remaining_ms, max_records=max_size - count)
+            for topic_partition, messages in polled.items():
+                records.setdefault(topic_partition, []).extend(messages)
+                count += len(messages)
+            if remaining_ms == 0:
+                break
+
+        return records
+
+    def _process_and_commit_batch(self, topic_partition, messages, last_committed_offsets):
+        """Replicate a batch of messages from one partition and commit its last offset.
+
+        Args:
+            topic_partition: TopicPartition object
+            messages: Kafka messages from the partition in offset order
+            last_committed_offsets: Dict tracking last committed offsets
+
+        Returns:
+            bool: True if should continue processing, False if should break loop
+        """
+        if topic_partition not in last_committed_offsets:
+            self._initialize_partition_offset_tracking(topic_partition, last_committed_offsets)
+
+        first_message, last_message = messages[0], messages[-1]
+        offsets = f"{first_message.offset}-{last_message.offset}"
+        logger.info(
+            f"Processing batch of {len(messages)} message(s) (partition: {topic_partition.partition}, "
+            f"offsets: {offsets}, last_committed: {last_committed_offsets.get(topic_partition, -1)})"
+        )
+
+        message_values = []
+        for message in messages:
+            if message.value is None:
+                logger.warning(
+                    f"Received message with None value, skipping "
+                    f"(partition: {message.partition}, offset: {message.offset})"
+                )
+                continue
+            message_values.append(self._parse_message_value(message))
+
+        if message_values:
+            success = self._run_with_retry(
+                lambda: self._process_batch(message_values),
+                topic_partition.partition,
+                offsets,
+                message_values,
+            )
+            if not success:
+                logger.info(
+                    f"Batch processing interrupted by shutdown "
+                    f"(partition: {topic_partition.partition}, offsets: {offsets}). "
+                    f"Offsets NOT committed - messages will be retried on restart."
+                )
+                return False
+
+        # A single commit covers the whole batch
+        self.offset_manager.store(topic_partition, last_message.offset, last_message.leader_epoch)
+        success, count = self.offset_manager.commit()
+        if success:
+            last_committed_offsets[topic_partition] = last_message.offset + 1
+
+        self.last_activity = time.time()
+        return True
+
+    def _run_batch_message_loop(self):
+        """Run the message consumption loop in micro-batching mode."""
+        last_committed_offsets = {}
+        logger.info(
+            f"Micro-batching enabled: up to {self.batch_config.max_size} messages, "
+            f"linger {self.batch_config.max_linger_ms}ms"
+        )
+
+        while self.is_consuming:
+            records = self._poll_batch()
+            if not records:
+                self._flush_tokens_while_idle()
+            for topic_partition, messages in records.items():
+                if not messages:
+                    continue
+
+                self._ensure_ready_to_process(messages[0], last_committed_offsets)
+
+                try:
+                    if not self._process_and_commit_batch(topic_partition, messages, last_committed_offsets):
+                        return  # Shutdown requested
+                except Exception as e:
+                    # Fail fast on unexpected exceptions
+                    logger.error(
+                        f"Unexpected error in batch message loop "
+                        f"(partition: {topic_partition.partition}, "
+                        f"offsets: {messages[0].offset}-{messages[-1].offset}): {e}. "
+                        f"Consumer will stop to prevent data loss. "
+                        f"Messages will be retried on restart."
+                    )
+                    messages_processed_total.labels(message_type="unknown", status="unexpected_error").inc()
+                    raise
+
     def start_consuming(self):
         """Start consuming messages from Kafka.
 
@@ -1724,7 +2167,10 @@ class RBACKafkaConsumer:
             # Start main message processing loop
             # Note: Partition assignment and lock token acquisition happen automatically
             # via the on_partitions_assigned callback during the first poll
-            self._run_message_loop()
+            if self.batch_config.enabled:
+                self._run_batch_message_loop()
+            else:
+                self._run_message_loop()
 
         except KafkaError as e:
             logger.error(f"Kafka error: {e}")
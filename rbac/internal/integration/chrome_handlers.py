@@ -17,6 +17,7 @@
 
 """Notification handlers of object change."""
 
+import copy
 import json
 import logging
 import os
@@ -36,7 +37,7 @@ with open(os.path.join(settings.BASE_DIR, "internal", "integration", "chrome_mes
 
 def build_chrome_message(event_type, uuid, org_id):
     """Create message based on template."""
-    message = message_template
+    message = copy.deepcopy(message_template)
     message["id"] = str(uuid4())
     message["time"] = timezone.now().isoformat()
     message["data"]["organizations"] = [org_id]
@@ -48,5 +49,6 @@ def build_chrome_message(event_type, uuid, org_id):
 
 def send_chrome_message(event_type, uuid, org_id):
     """Build and send chrome message."""
-    chrome_message = build_chrome_message(event_type, uuid, org_id)
-    chrome_producer.send_kafka_message(chrome_topic, chrome_message)
+    chrome_producer.send_kafka_message_on_commit(
+        chrome_topic, (event_type, str(uuid), org_id), lambda: build_chrome_message(event_type, uuid, org_id)
+    )
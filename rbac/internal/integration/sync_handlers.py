@@ -17,6 +17,7 @@
 
 """Notification handlers of object change."""
 
+import copy
 import json
 import logging
 import os
@@ -35,7 +36,7 @@ with open(os.path.join(settings.BASE_DIR, "internal", "integration", "message_te
 
 def build_sync_message(event_type, payload):
     """Create message based on template."""
-    message = message_template
+    message = copy.deepcopy(message_template)
     message["event_type"] = event_type
     message["timestamp"] = datetime.now().isoformat()
     message["events"][0]["payload"] = payload
@@ -44,5 +45,5 @@ def build_sync_message(event_type, payload):
 
 def send_sync_message(event_type, payload):
     """Build and send external service sync message."""
-    sync_message = build_sync_message(event_type, payload)
-    sync_producer.send_kafka_message(sync_topic, sync_message)
+    dedup_key = (event_type, json.dumps(payload, sort_keys=True, default=str))
+    sync_producer.send_kafka_message_on_commit(sync_topic, dedup_key, lambda: build_sync_message(event_type, payload))
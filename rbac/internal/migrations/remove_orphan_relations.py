@@ -78,12 +78,15 @@ class _ReadTuplesTyped(Protocol):
     ) -> Iterable[RelationTuple]: ...
 
 
-def _make_read_tuples_typed(read_tuples: Callable[[str, str, str, str, str], Iterable[dict]]) -> _ReadTuplesTyped:
+def _make_read_tuples_typed(
+    read_tuples: Callable[[str, str, str, str, str], Iterable[dict | RelationTuple]],
+) -> _ReadTuplesTyped:
     def impl(
         resource_type: str, resource_id: str, relation: str, subject_type: str, subject_id: str
     ) -> Iterable[RelationTuple]:
+        # Tuples streamed from Kessel are already decoded; ReadTuples response dicts still need converting.
         return (
-            RelationTuple.from_message_dict(r["tuple"])
+            r if isinstance(r, RelationTuple) else RelationTuple.from_message_dict(r["tuple"])
             for r in read_tuples(resource_type, resource_id, relation, subject_type, subject_id)
         )
 
@@ -642,7 +645,7 @@ def cleanup_tenant_orphaned_relationships(
         tenant: The Tenant object to clean relationships for
         read_tuples_fn: Function to read tuples from Kessel, signature:
                         (resource_type: str, resource_id: str, relation: str,
-                         subject_type: str = "", subject_id: str = "") -> list[dict]
+                         subject_type: str = "", subject_id: str = "") -> Iterable[dict | RelationTuple]
         dry_run: If True, only report what would be deleted without making changes
 
     Returns:
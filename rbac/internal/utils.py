@@ -47,6 +47,7 @@ from management.relation_replicator.relation_replicator import (
     ReplicationEventType,
 )
 from management.relation_replicator.relations_api_replicator import RelationsApiReplicator
+from management.relation_replicator.types import RelationTuple
 from management.role.v2_model import CustomRoleV2, RoleV2
 from management.role_binding.model import RoleBinding
 from management.tenant_mapping.model import DefaultAccessType, TenantMapping
@@ -184,39 +185,20 @@ def read_tuples_from_kessel(resource_type: str, resource_id: str, relation: str,
 
 def iterate_tuples_from_kessel(
     resource_type: str, resource_id: str, relation: str, subject_type: str, subject_id: str
-) -> Iterable[dict]:
+) -> Iterable[RelationTuple]:
     """
-    Read tuples from Kessel Relations API while handling pagination.
+    Stream tuples from Kessel Relations API while handling pagination.
 
-    This is similar to read_tuples_from_kessel, except that it also returns subsequent pages from Kessel, and it does
-    not necessarily return a list.
+    This is similar to read_tuples_from_kessel, except that it also returns subsequent pages from Kessel, and that the
+    tuples are decoded directly into RelationTuples and yielded as they are streamed.
     """
-    replicator = RelationsApiReplicator()
-
-    continuation_token = None
-    first = True
-
-    while (continuation_token not in (None, "")) or first:
-        batch = replicator.read_tuples(
-            resource_type=resource_type,
-            resource_id=resource_id,
-            relation=relation,
-            subject_type=subject_type,
-            subject_id=subject_id,
-            pagination_limit=100,
-            continuation_token=continuation_token,
-        )
-
-        if len(batch) == 0:
-            return
-
-        continuation_token = batch[-1].get("pagination", {}).get("continuationToken", None)
-        first = False
-
-        if continuation_token is None:
-            logger.warning(f"Unexpectedly missing continuation token from Kessel. Response: {batch}")
-
-        yield from batch
+    return RelationsApiReplicator().iter_tuples(
+        resource_type=resource_type,
+        resource_id=resource_id,
+        relation=relation,
+        subject_type=subject_type,
+        subject_id=subject_id,
+    )
 
 
 def _build_workspace_graph(tenant) -> tuple[list, dict]:
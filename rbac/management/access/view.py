@@ -119,7 +119,7 @@ class AccessView(APIView):
                 order_sign = ""
                 field = ordering
             return access_queryset.order_by(f"{order_sign}permission__{field}")
-        return access_queryset
+        return access_queryset.order_by("id")
 
     def get(self, request):
         """Provide access data for principal."""
@@ -22,6 +22,7 @@ from json import JSONDecodeError
 from typing import Protocol
 
 import requests
+from core.http import PooledSession
 from management.authorization.unable_meet_prerequisites import UnableMeetPrerequisitesError
 from management.cache import JWKSCache
 from requests import Response
@@ -29,6 +30,8 @@ from rest_framework import status
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
+jwks_session = PooledSession("jwks")
+
 
 class JWKSSource(Protocol):
     """Protocol for a source that provides JSON Web Key Sets (JWKS)."""
@@ -113,7 +116,7 @@ class JWKSCacheSource(JWKSSource):
 def _request_json(url: str) -> dict:
     """Perform an JWKS related GET request and return the JSON response."""
     try:
-        response: Response = requests.get(url=url)
+        response: Response = jwks_session.get(url=url)
     except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as ce:
         logger.error("Unable to fetch %s to validate the token: %s", url, ce)
 
@@ -1,13 +1,21 @@
 """Redis-based caching of per-Principal per-app access policy."""
 
 import contextlib
+import copy
+import hashlib
 import json
 import logging
+import os
 import pickle
+import threading
+import time
+from collections import OrderedDict, defaultdict
 
 from django.conf import settings
-from prometheus_client import Counter
-from redis import BlockingConnectionPool, exceptions
+from django.core.signals import request_finished, request_started
+from django.db import transaction
+from prometheus_client import Counter, Gauge
+from redis import BlockingConnectionPool, ConnectionPool, exceptions
 from redis.client import Pipeline, Redis
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
@@ -18,27 +26,305 @@ redis_disable_cache_get_total = Counter(
     "redis_disable_cache_get_total", "Total amount of times cache has been disabled"
 )
 
+redis_circuit_breaker_state = Gauge(
+    "redis_circuit_breaker_state",
+    "State of the Redis cache circuit breaker: 1 for the current state, 0 otherwise",
+    ["state"],
+)
+redis_circuit_breaker_failures_total = Counter(
+    "redis_circuit_breaker_failures_total", "Total amount of failed Redis cache commands"
+)
+
+local_cache_requests_total = Counter(
+    "local_cache_requests_total", "Total amount of in-process cache lookups", ["cache", "result"]
+)
+principal_lookup_cache_requests_total = Counter(
+    "principal_lookup_cache_requests_total", "Principal lookups served from or missed by the cache", ["result"]
+)
+kessel_lookup_cache_requests_total = Counter(
+    "kessel_lookup_cache_requests_total",
+    "Kessel lookups and checks served from or missed by the cache",
+    ["lookup", "result"],
+)
+
 BATCH_DELETE_SIZE = 1000
+INVALIDATION_CHANNEL = "rbac::cache::invalidation"
+ALL_TENANTS = "*"
+
+
+class RedisCircuitBreaker:
+    """Track the health of Redis from the outcome of real cache commands.
+
+    closed: Redis is healthy and cache commands are issued.
+    open: Redis failed recently, cache commands are skipped until the backoff window elapses.
+    half_open: the backoff window elapsed and a background PING probe decides whether to close or re-open.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    STATES = (CLOSED, OPEN, HALF_OPEN)
+
+    def __init__(self, failure_threshold, reset_timeout):
+        """Init the circuit breaker."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = 0.0
+        self._set_state(self.CLOSED)
+
+    @property
+    def state(self):
+        """Return the current state of the circuit."""
+        return self._state
+
+    def _set_state(self, state):
+        """Switch the circuit to the given state and export it."""
+        self._state = state
+        for name in self.STATES:
+            redis_circuit_breaker_state.labels(state=name).set(1 if name == state else 0)
+
+    def allow_request(self):
+        """Return whether a cache command should be sent to Redis."""
+        if self._state == self.CLOSED:
+            return True
+        start_probe = False
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._set_state(self.HALF_OPEN)
+                start_probe = True
+        if start_probe:
+            threading.Thread(target=self._probe, name="redis-circuit-breaker-probe", daemon=True).start()
+        return False
+
+    def record_success(self):
+        """Record a successful Redis command."""
+        if self._state == self.CLOSED and not self._failures:
+            return
+        with self._lock:
+            self._failures = 0
+            if self._state != self.CLOSED:
+                logger.info("Redis cache is reachable again, closing the circuit.")
+                self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        """Record a failed Redis command, opening the circuit once the threshold is reached."""
+        redis_circuit_breaker_failures_total.inc()
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Redis cache is not reachable, skipping cache for {self.reset_timeout}s.")
+                self._opened_at = time.monotonic()
+                self._set_state(self.OPEN)
+
+    def _probe(self):
+        """Ping Redis off the request path and close or re-open the circuit accordingly."""
+        try:
+            if Redis(connection_pool=_connection_pool, ssl=settings.REDIS_SSL).ping():
+                self.record_success()
+                return
+        except exceptions.RedisError:
+            logger.info("Redis cache probe failed.")
+        self.record_failure()
+
+    def reset(self):
+        """Close the circuit and forget previous failures."""
+        with self._lock:
+            self._failures = 0
+            self._set_state(self.CLOSED)
+
+
+circuit_breaker = RedisCircuitBreaker(
+    settings.REDIS_CIRCUIT_BREAKER_FAILURE_THRESHOLD, settings.REDIS_CIRCUIT_BREAKER_RESET_TIMEOUT
+)
+
+
+class LocalCache:
+    """Bounded per-process LRU cache whose entries expire after a short lifetime.
+
+    Values are stored pickled so every reader gets its own copy of the cached object.
+    """
+
+    def __init__(self, name, max_size=None, lifetime=None):
+        """Init the local cache."""
+        self.name = name
+        self.max_size = max_size if max_size is not None else settings.LOCAL_CACHE_MAX_SIZE
+        self.lifetime = lifetime if lifetime is not None else settings.LOCAL_CACHE_LIFETIME
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+
+    def get(self, key):
+        """Return the object cached for the key, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._items.move_to_end(key)
+                else:
+                    del self._items[key]
+                    entry = None
+        if entry is None:
+            local_cache_requests_total.labels(cache=self.name, result="miss").inc()
+            return None
+        local_cache_requests_total.labels(cache=self.name, result="hit").inc()
+        return pickle.loads(value)
+
+    def set(self, key, item):
+        """Cache the object for the key, evicting the least recently used entries when full."""
+        value = pickle.dumps(item)
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.lifetime, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def delete(self, key):
+        """Drop the entry for the key."""
+        with self._lock:
+            self._items.pop(key, None)
+
+    def delete_prefix(self, prefix):
+        """Drop every entry whose key starts with the prefix."""
+        with self._lock:
+            for key in [key for key in self._items if key.startswith(prefix)]:
+                del self._items[key]
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._items.clear()
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key within a process into a single call.
+
+    The first caller runs the function while later callers wait for it and get a copy of its result.
+    """
+
+    def __init__(self):
+        """Init the in-flight calls."""
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, function):
+        """Run the function for the key, or wait for the call already running for it."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {"done": threading.Event(), "result": None, "error": None}
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return copy.deepcopy(call["result"])
+        try:
+            call["result"] = function()
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call["done"].set()
+        return call["result"]
+
+
+class CacheInvalidationListener:
+    """Fan out local cache invalidations to every worker process over Redis pub/sub."""
+
+    def __init__(self):
+        """Init the listener."""
+        self._lock = threading.Lock()
+        self._pid = None
+        self._caches = {}
+
+    def register(self, cache):
+        """Register a local cache so invalidations published by other workers reach it."""
+        self._caches[cache.name] = cache
+
+    def ensure_started(self):
+        """Start the subscriber thread once per process, including after a fork."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            # A forked worker inherits entries its parent may never get invalidations for.
+            for cache in self._caches.values():
+                cache.clear()
+            threading.Thread(target=self._listen, name="rbac-cache-invalidation", daemon=True).start()
+
+    def publish(self, cache_name, key=None, prefix=None):
+        """Tell every worker to drop the given key or prefix from a local cache."""
+        message = json.dumps({"cache": cache_name, "key": key, "prefix": prefix})
+        try:
+            Redis(connection_pool=_connection_pool, ssl=settings.REDIS_SSL).publish(INVALIDATION_CHANNEL, message)
+        except exceptions.RedisError:
+            logger.exception(f"Error publishing invalidation of {cache_name} cache")
+
+    def handle(self, message):
+        """Apply an invalidation message to the matching local cache."""
+        payload = json.loads(message)
+        cache = self._caches.get(payload.get("cache"))
+        if cache is None:
+            return
+        if payload.get("prefix") is not None:
+            cache.delete_prefix(payload["prefix"])
+        elif payload.get("key") is not None:
+            cache.delete(payload["key"])
+        else:
+            cache.clear()
+
+    def _listen(self):
+        """Subscribe to the invalidation channel, reconnecting after errors."""
+        # The subscription holds its connection forever, so keep it out of the shared blocking pool.
+        pool = ConnectionPool(**{**settings.REDIS_CACHE_CONNECTION_PARAMS, "socket_timeout": None})
+        while True:
+            try:
+                pubsub = Redis(connection_pool=pool, ssl=settings.REDIS_SSL).pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Invalidations may have been missed while we were not subscribed.
+                for cache in self._caches.values():
+                    cache.clear()
+                for message in pubsub.listen():
+                    self.handle(message["data"])
+            except exceptions.RedisError:
+                logger.info("Lost subscription to the cache invalidation channel, retrying.")
+                time.sleep(settings.REDIS_CIRCUIT_BREAKER_RESET_TIMEOUT)
+
+
+invalidation_listener = CacheInvalidationListener()
 
 
 class BasicCache:
     """Basic cache class to be inherited."""
 
+    local_cache = None
+
     def __init__(self):
         """Init the class."""
         self._connection = None
         self.use_caching = True
 
+    @property
+    def use_local_cache(self):
+        """Whether the in-process cache in front of Redis should be used."""
+        if self.local_cache is None or not settings.LOCAL_CACHE_ENABLED:
+            return False
+        invalidation_listener.ensure_started()
+        return True
+
     @property
     def connection(self):
         """Get Redis connection from the pool."""
         if not self._connection:
+            # Reachability is tracked by the circuit breaker, so no PING is sent here.
             self._connection = Redis(connection_pool=_connection_pool, ssl=settings.REDIS_SSL)
-            try:
-                self._connection.ping()
-            except exceptions.RedisError:
-                self._connection = None
-                raise
         return self._connection
 
     def enable_caching(self):
@@ -56,19 +342,20 @@ class BasicCache:
         return self.use_caching
 
     def redis_health_check(self):
-        """Check whether redis cache is reachable. If it is not reachable, then disable caching."""
+        """Check whether redis cache is reachable and feed the result to the circuit breaker."""
         self._connection = Redis(connection_pool=_connection_pool, ssl=settings.REDIS_SSL)
         try:
             response = self._connection.ping()
             if response:
                 logger.info("Redis cache is reachable.")
-                self.enable_caching()
+                circuit_breaker.record_success()
                 return True
             else:
                 logger.info("Redis cache is not reachable.")
-                self.disable_caching()
+                circuit_breaker.record_failure()
                 return False
         except Exception as e:
+            circuit_breaker.record_failure()
             logger.exception(f"Error: {e}")
 
     @contextlib.contextmanager
@@ -77,7 +364,10 @@ class BasicCache:
         try:
             yield
         except exceptions.RedisError:
+            circuit_breaker.record_failure()
             logger.exception(err_msg)
+        else:
+            circuit_breaker.record_success()
 
     def get_from_redis(self, key):
         """Get object from redis based on key."""
@@ -85,21 +375,31 @@ class BasicCache:
 
     def get_cached(self, key, error_message):
         """Get cached object from redis, throw error if there is any."""
+        use_local_cache = self.use_local_cache
+        if use_local_cache:
+            obj = self.local_cache.get(key)
+            if obj is not None:
+                return obj
+        if not self.use_caching or not circuit_breaker.allow_request():
+            # Retrieve data directly
+            logger.debug("Not Retrieving Data from Redis Cache")
+            return None
         try:
-            if self.redis_health_check() is True:
-                if self.use_caching:
-                    return self.get_from_redis(key)
-            else:
-                # Retrieve data directly
-                logger.info("Not Retrieving Data from Redis Cache")
-                self.disable_caching()
-                pass
+            obj = self.get_from_redis(key)
         except exceptions.RedisError:
+            circuit_breaker.record_failure()
             logger.exception(error_message)
-        return None
+            return None
+        circuit_breaker.record_success()
+        if use_local_cache and obj is not None:
+            self.local_cache.set(key, obj)
+        return obj
 
     def delete_cached(self, key, obj_name):
         """Delete cache from redis."""
+        if self.use_local_cache:
+            self.local_cache.delete(key)
+            invalidation_listener.publish(self.local_cache.name, key=key)
         err_msg = f"Error deleting {obj_name} for {key}"
         with self.delete_handler(err_msg):
             logger.info(f"Deleting {obj_name} cache for {key}")
@@ -111,11 +411,17 @@ class BasicCache:
 
     def save(self, key, item, obj_name):
         """Save cache including exception handler."""
+        if self.use_local_cache:
+            self.local_cache.set(key, item)
+        if not circuit_breaker.allow_request():
+            return
         try:
             logger.info(f"Caching {obj_name} for {key}")
             with self.connection.pipeline() as pipe:
                 self.set_cache(pipe, key, item)
+            circuit_breaker.record_success()
         except exceptions.RedisError:
+            circuit_breaker.record_failure()
             logger.exception(f"Error writing {obj_name} for {key}")
         finally:
             try:
@@ -127,6 +433,8 @@ class BasicCache:
 class TenantCache(BasicCache):
     """Redis-based caching of tenant."""
 
+    local_cache = LocalCache("tenant")
+
     def key_for(self, key):
         """Redis key for a given tenant."""
         return f"rbac::tenant::tenant={key}"
@@ -157,7 +465,12 @@ class TenantCache(BasicCache):
 
 
 class AccessCache(BasicCache):
-    """Redis-based caching of per-Principal per-app access policy."""  # noqa: D204
+    """Redis-based caching of per-Principal per-app access policy.
+
+    Every policy entry is stored together with the generation of its tenant and of all
+    tenants ("*"). Invalidating a tenant increments its generation counter, after which
+    older entries are ignored and left to expire.
+    """  # noqa: D204
 
     def __init__(self, tenant: str):
         """
@@ -168,23 +481,49 @@ class AccessCache(BasicCache):
         if not tenant:
             raise ValueError("tenant must be provided")
         self.tenant = tenant
+        # Generation read before the policy is computed, so a concurrent invalidation is not lost on save
+        self._generation = None
         super().__init__()
 
     def key_for(self, uuid):
         """Redis key for a given user policy."""
         return f"rbac::policy::tenant={self.tenant}::user={uuid}"
 
+    @staticmethod
+    def generation_key_for(tenant):
+        """Redis key of the policy generation counter of a given tenant (or * for all tenants)."""
+        return f"rbac::generation::policy::tenant={tenant}"
+
+    def generation_keys(self):
+        """Redis keys of the generation counters the tenant's policies depend on."""
+        return [self.generation_key_for(ALL_TENANTS), self.generation_key_for(self.tenant)]
+
+    @staticmethod
+    def format_generation(counters):
+        """Combine the raw generation counters into the generation stored with entries."""
+        return ".".join(
+            (counter.decode() if isinstance(counter, bytes) else str(counter or 0)) for counter in counters
+        )
+
     def set_cache(self, pipe, args, item):
         """Set cache to redis."""
-        pipe.hset(self.key_for(args[0]), args[1], json.dumps(item))
+        if self._generation is None:
+            self._generation = self.format_generation(self.connection.mget(self.generation_keys()))
+        pipe.hset(self.key_for(args[0]), args[1], json.dumps([self._generation, item]))
         pipe.expire(self.key_for(args[0]), settings.ACCESS_CACHE_LIFETIME)
         pipe.execute()
 
     def get_from_redis(self, args):
-        """Get object from redis based on args."""
-        obj = self.connection.hget(*(self.key_for(args[0]), args[1]))
+        """Get object from redis based on args, ignoring entries from an older generation."""
+        with self.connection.pipeline(transaction=False) as pipe:
+            pipe.mget(self.generation_keys())
+            pipe.hget(self.key_for(args[0]), args[1])
+            counters, obj = pipe.execute()
+        self._generation = self.format_generation(counters)
         if obj:
-            return json.loads(obj)
+            entry = json.loads(obj)
+            if isinstance(entry, list) and len(entry) == 2 and entry[0] == self._generation:
+                return entry[1]
 
     def get_policy(self, uuid, sub_key):
         """Get the given user's policy for the given sub_key (application_offset_limit)."""
@@ -197,20 +536,14 @@ class AccessCache(BasicCache):
         super().delete_cached(uuid, "policy")
 
     def delete_all_policies_for_tenant(self):
-        """Purge users' policies for a given tenant from the cache."""
+        """Invalidate users' policies for a given tenant (or all tenants) by bumping its generation."""
         if not settings.ACCESS_CACHE_ENABLED:
             return
         err_msg = f"Error deleting all policies for tenant {self.tenant}"
         with self.delete_handler(err_msg):
-            logger.info(f"Deleting entire policy cache for tenant {self.tenant}")
-            # Following piece is taken from https://github.com/jazzband/django-redis/pull/617
-            count = 0
-            pipeline = self.connection.pipeline()
-            for key in self.connection.scan_iter(match=self.key_for("*"), count=BATCH_DELETE_SIZE):
-                pipeline.delete(key)
-                count += 1
-            pipeline.execute()
-            logger.info(f"Deleted {count} policies for tenant {self.tenant}")
+            generation = self.connection.incr(self.generation_key_for(self.tenant))
+            self._generation = None
+            logger.info(f"Invalidated policy cache for tenant {self.tenant} (generation {generation})")
 
     def save_policy(self, uuid, sub_key, policy):
         """Write the policy for a given user for a given sub_key (application_offset_limit) to Redis."""
@@ -219,6 +552,344 @@ class AccessCache(BasicCache):
         super().save((uuid, sub_key), policy, "policy")
 
 
+class AccessCacheInvalidationQueue(BasicCache):
+    """Per-thread queue of access cache invalidations applied once the transaction commits.
+
+    Signal handlers enqueue the principals (or whole tenants) whose policies are affected. Principals
+    are deduplicated and skipped for tenants invalidated as a whole; the rest of the keys are removed
+    with pipelined multi-key UNLINKs. Invalidations of rolled back transactions are applied with the
+    next commit on the same thread, which only causes extra cache misses.
+    """
+
+    def __init__(self):
+        """Init the queue."""
+        self._local = threading.local()
+        super().__init__()
+
+    def _pending(self):
+        """Return the pending (tenants, principals by tenant) of the current thread."""
+        if not hasattr(self._local, "tenants"):
+            self._local.tenants = set()
+            self._local.principals = defaultdict(set)
+        return self._local.tenants, self._local.principals
+
+    def delete_policies(self, tenant, principal_uuids):
+        """Invalidate the policies of the given principals of a tenant after commit."""
+        _, principals = self._pending()
+        principals[tenant].update(str(uuid) for uuid in principal_uuids)
+        transaction.on_commit(self.flush)
+
+    def delete_all_policies_for_tenant(self, tenant):
+        """Invalidate the policies of all principals of a tenant after commit."""
+        if not settings.ACCESS_CACHE_ENABLED:
+            return
+        tenants, _ = self._pending()
+        tenants.add(tenant)
+        transaction.on_commit(self.flush)
+
+    def flush(self):
+        """Apply and clear the pending invalidations of the current thread."""
+        tenants, principals = self._pending()
+        if not tenants and not principals:
+            return
+        self._local.tenants = set()
+        self._local.principals = defaultdict(set)
+        keys = [
+            AccessCache(tenant).key_for(uuid)
+            for tenant, uuids in principals.items()
+            if tenant not in tenants
+            for uuid in uuids
+        ]
+        err_msg = f"Error invalidating policies of {len(keys)} principals and {len(tenants)} tenants"
+        with self.delete_handler(err_msg):
+            logger.info(f"Invalidating policies of {len(keys)} principals and {len(tenants)} tenants")
+            with self.connection.pipeline(transaction=False) as pipe:
+                for tenant in tenants:
+                    pipe.incr(AccessCache.generation_key_for(tenant))
+                for start in range(0, len(keys), BATCH_DELETE_SIZE):
+                    pipe.unlink(*keys[start : start + BATCH_DELETE_SIZE])  # noqa: E203
+                pipe.execute()
+
+
+policy_invalidation_queue = AccessCacheInvalidationQueue()
+
+
+class PrincipalLookupCache(BasicCache):
+    """Redis-based short-lived caching of principal lookups, including lookups that found no principal."""
+
+    def key_for(self, org_id, username, params=""):
+        """Redis key of the lookup of a username in a tenant with the given query parameters."""
+        return f"rbac::principal_lookup::{org_id}::{username.casefold()}::{params}"
+
+    def set_cache(self, pipe, key, response):
+        """Set cache to redis, keeping lookups that found nothing for a shorter time."""
+        if response.get("data"):
+            lifetime = settings.PRINCIPAL_LOOKUP_CACHE_LIFETIME
+        else:
+            lifetime = settings.PRINCIPAL_LOOKUP_NEGATIVE_CACHE_LIFETIME
+        pipe.set(key, json.dumps(response), ex=lifetime)
+        pipe.execute()
+
+    def get_from_redis(self, key):
+        """Get the lookup response from redis."""
+        response = self.connection.get(key)
+        return json.loads(response) if response is not None else None
+
+    def get_lookup(self, org_id, username, params=""):
+        """Get the cached lookup response of a username, None if it is not cached."""
+        response = super().get_cached(
+            self.key_for(org_id, username, params), f"Error querying principal lookup of {username} in {org_id}"
+        )
+        principal_lookup_cache_requests_total.labels(result="miss" if response is None else "hit").inc()
+        return response
+
+    def save_lookup(self, org_id, username, params, response):
+        """Cache the lookup response of a username."""
+        super().save(self.key_for(org_id, username, params), response, "principal lookup")
+
+
+class ITServiceAccountsCache(BasicCache):
+    """Redis-based caching of the snapshot of a tenant's service accounts in IT, indexed by client ID."""
+
+    def key_for(self, org_id):
+        """Redis key of the service accounts snapshot of a tenant."""
+        return f"rbac::it::service_accounts::org_id={org_id}"
+
+    def set_cache(self, pipe, key, snapshot):
+        """Set cache to redis, keeping the snapshot for as long as it may be served stale."""
+        pipe.set(key, json.dumps(snapshot), ex=settings.IT_SERVICE_ACCOUNTS_CACHE_STALE_LIFETIME)
+        pipe.execute()
+
+    def get_from_redis(self, key):
+        """Get the snapshot from redis."""
+        snapshot = self.connection.get(key)
+        return json.loads(snapshot) if snapshot is not None else None
+
+    def get_snapshot(self, org_id):
+        """Get the service accounts snapshot of a tenant with the time it was taken, None if there is none."""
+        return super().get_cached(self.key_for(org_id), f"Error querying service accounts snapshot of {org_id}")
+
+    def save_snapshot(self, org_id, service_accounts):
+        """Save the service accounts of a tenant, indexed by client ID, as taken now."""
+        super().save(
+            self.key_for(org_id), {"taken_at": time.time(), "service_accounts": service_accounts}, "service accounts"
+        )
+
+    def refresh_lock_key_for(self, org_id):
+        """Redis key of the lock held while the service accounts snapshot of a tenant is refreshed."""
+        return f"{self.key_for(org_id)}::refreshing"
+
+    def acquire_refresh_lock(self, org_id):
+        """
+        Take the right to refresh the snapshot of a tenant, so that a single worker refreshes it at a time.
+
+        The lock is released once the refresh is over. Since a refresh pages through all the service accounts, the
+        lock only expires on its own after the stale lifetime, past which a missing snapshot is refreshed in line.
+        """
+        if not circuit_breaker.allow_request():
+            return False
+        try:
+            acquired = self.connection.set(
+                self.refresh_lock_key_for(org_id), 1, nx=True, ex=settings.IT_SERVICE_ACCOUNTS_CACHE_STALE_LIFETIME
+            )
+        except exceptions.RedisError:
+            circuit_breaker.record_failure()
+            logger.exception(f"Error locking the refresh of the service accounts snapshot of {org_id}")
+            return False
+        circuit_breaker.record_success()
+        return bool(acquired)
+
+    def release_refresh_lock(self, org_id):
+        """Release the right to refresh the snapshot of a tenant."""
+        with self.delete_handler(f"Error unlocking the refresh of the service accounts snapshot of {org_id}"):
+            self.connection.delete(self.refresh_lock_key_for(org_id))
+
+
+class KesselLookupCache(BasicCache):
+    """
+    Redis-based caching of Kessel lookup and check results under the tenant's relations consistency token.
+
+    The Kafka consumer moves the token whenever the tenant's relations change, so results cached under an older token
+    are never read again and simply expire. Relations shared by all tenants, such as the seeded system roles, are not
+    covered by any tenant's token: changing them bumps a generation counter that is part of every key instead.
+
+    The token and the generation are read once per request, and on every lookup outside of requests.
+    """
+
+    GENERATION_KEY = "rbac::generation::kessel"
+
+    # Values read by the request handled on the current thread
+    _request_values = threading.local()
+
+    def key_for(self, org_id, consistency_token, generation, lookup, subject):
+        """Redis key of a lookup in a tenant at a consistency token, which is hashed since it can be long."""
+        token_digest = hashlib.sha256(consistency_token.encode()).hexdigest()
+        return f"rbac::kessel::{org_id}::{generation}::{token_digest}::{lookup}::{subject}"
+
+    def set_cache(self, pipe, key, result):
+        """Set cache to redis."""
+        pipe.set(key, json.dumps(result), ex=settings.KESSEL_LOOKUP_CACHE_LIFETIME)
+        pipe.execute()
+
+    def get_from_redis(self, key):
+        """Get the lookup result from redis."""
+        result = self.connection.get(key)
+        return json.loads(result) if result is not None else None
+
+    def get_generation(self):
+        """Get the generation of the relations shared by all tenants, None if Redis cannot be queried."""
+        if not self.use_caching or not circuit_breaker.allow_request():
+            return None
+        try:
+            generation = self.connection.get(self.GENERATION_KEY)
+        except exceptions.RedisError:
+            circuit_breaker.record_failure()
+            logger.exception("Error querying the generation of Kessel lookups")
+            return None
+        circuit_breaker.record_success()
+        return int(generation or 0)
+
+    def bump_generation(self):
+        """Invalidate the lookups of all tenants, after relations shared by all tenants changed."""
+        if not settings.KESSEL_LOOKUP_CACHE_ENABLED:
+            return
+        with self.delete_handler("Error invalidating Kessel lookups of all tenants"):
+            generation = self.connection.incr(self.GENERATION_KEY)
+            logger.info(f"Invalidated Kessel lookups of all tenants (generation {generation})")
+
+    @classmethod
+    def start_request(cls, **kwargs):
+        """Read the consistency tokens and the generation once during the request starting on this thread."""
+        cls._request_values.values = {}
+
+    @classmethod
+    def finish_request(cls, **kwargs):
+        """Stop reusing the consistency tokens and the generation read during the request."""
+        cls._request_values.values = None
+
+    def _read_once_per_request(self, name, read):
+        """Return what read() returns, reused for the rest of the request handled on this thread unless None."""
+        values = getattr(self._request_values, "values", None)
+        if values is not None and name in values:
+            return values[name]
+        value = read()
+        if values is not None and value is not None:
+            values[name] = value
+        return value
+
+    @staticmethod
+    def _read_consistency_token(tenant):
+        """Read the tenant's current consistency token from the database."""
+        tenant.refresh_from_db(fields=["relations_consistency_token"])
+        return tenant.relations_consistency_token
+
+    def get_or_lookup(self, tenant, lookup, subject, function, consistency_token=None):
+        """
+        Return the cached result of a Kessel lookup in the tenant, or call the function and cache what it returns.
+
+        The tenant's current consistency token is read from the database unless it is given. Nothing is cached when
+        caching is disabled, the tenant has no token yet, Redis cannot be queried, or the function returns None
+        because the lookup failed.
+        """
+        if not settings.KESSEL_LOOKUP_CACHE_ENABLED or tenant is None:
+            return function()
+        if consistency_token is None:
+            consistency_token = self._read_once_per_request(
+                ("token", tenant.org_id), lambda: self._read_consistency_token(tenant)
+            )
+        if not consistency_token:
+            return function()
+        generation = self._read_once_per_request(("generation",), self.get_generation)
+        if generation is None:
+            return function()
+
+        key = self.key_for(tenant.org_id, consistency_token, generation, lookup, subject)
+        result = super().get_cached(key, f"Error querying Kessel {lookup} for {subject} in {tenant.org_id}")
+        kessel_lookup_cache_requests_total.labels(lookup=lookup, result="miss" if result is None else "hit").inc()
+        if result is None:
+            result = function()
+            if result is not None:
+                super().save(key, result, f"Kessel {lookup}")
+        return result
+
+
+request_started.connect(KesselLookupCache.start_request)
+request_finished.connect(KesselLookupCache.finish_request)
+
+
+class PrincipalCleanupCheckpointCache(BasicCache):
+    """Redis-based record of the tenant up to which the principal cleanup job has completed."""
+
+    def key_for(self, _=None):
+        """Redis key of the checkpoint."""
+        return "rbac::principal_cleanup::checkpoint"
+
+    def set_cache(self, pipe, _, tenant_id):
+        """Set cache to redis."""
+        pipe.set(self.key_for(), tenant_id, ex=settings.PRINCIPAL_CLEANUP_CHECKPOINT_LIFETIME)
+        pipe.execute()
+
+    def get_from_redis(self, _):
+        """Get the id of the last tenant cleaned up from redis."""
+        tenant_id = self.connection.get(self.key_for())
+        return int(tenant_id) if tenant_id is not None else None
+
+    def get_checkpoint(self):
+        """Get the id of the tenant up to which the principal cleanup completed, 0 if none."""
+        return super().get_cached(None, "Error querying principal cleanup checkpoint") or 0
+
+    def save_checkpoint(self, tenant_id):
+        """Record that the principal cleanup completed for all tenants up to the given id."""
+        super().save(None, tenant_id, "principal cleanup checkpoint")
+
+    def delete_checkpoint(self):
+        """Purge the checkpoint once the principal cleanup completed for all tenants."""
+        super().delete_cached(None, "principal cleanup checkpoint")
+
+
+class WorkspaceParentMapCache(BasicCache):
+    """Redis-based caching of the workspace parent map of a tenant."""
+
+    @property
+    def enabled(self):
+        """Whether the parent map cache is enabled."""
+        return settings.WORKSPACE_PARENT_MAP_CACHE_ENABLED
+
+    def key_for(self, tenant_id):
+        """Redis key for a given tenant's workspace parent map."""
+        return f"rbac::workspace::parents::tenant={tenant_id}"
+
+    def get_from_redis(self, key):
+        """Override the method to get the parent map based on key."""
+        obj = self.connection.get(self.key_for(key))
+        if obj:
+            return pickle.loads(obj)
+
+    def set_cache(self, pipe, key, item):
+        """Override the method to set the parent map to cache."""
+        pipe.set(self.key_for(key), pickle.dumps(item))
+        pipe.expire(self.key_for(key), settings.ACCESS_CACHE_LIFETIME)
+        pipe.execute()
+
+    def get_parent_map(self, tenant_id):
+        """Get the {workspace_id: parent_id} map of a tenant."""
+        if not self.enabled:
+            return None
+        return super().get_cached(tenant_id, f"Error querying workspace parent map for tenant {tenant_id}")
+
+    def save_parent_map(self, tenant_id, parent_map):
+        """Write the {workspace_id: parent_id} map of a tenant to Redis."""
+        if not self.enabled:
+            return
+        super().save(tenant_id, parent_map, "workspace parent map")
+
+    def delete_parent_map(self, tenant_id):
+        """Purge the workspace parent map of a tenant from the cache."""
+        if not self.enabled:
+            return
+        super().delete_cached(tenant_id, "workspace parent map")
+
+
 class JWKSCache(BasicCache):
     """Redis-based caching for the storage of JKWS certificates."""
 
@@ -304,6 +975,8 @@ class JWTCacheOptimized(JWTCache):
 class PrincipalCache(BasicCache):
     """Redis-based caching for storing the principals."""
 
+    local_cache = LocalCache("principal")
+
     def key_for(self, org_id: str, principal_username: str) -> str:
         """Generate the cache key for Redis.
 
@@ -313,19 +986,51 @@ class PrincipalCache(BasicCache):
         """
         return f"rbac::principal::{org_id}::{principal_username}"
 
+    @staticmethod
+    def generation_key_for(org_id: str) -> str:
+        """Generate the key of the principal generation counter of a tenant.
+
+        :param org_id: The tenant of the principals.
+        :returns: The key used in Redis to store the generation counter.
+        """
+        return f"rbac::generation::principal::{org_id}"
+
+    def _generation_key_for_principal_key(self, key: str) -> str:
+        """Return the generation counter key of the tenant a principal key belongs to."""
+        org_id = key.split("::", 3)[2]
+        return self.generation_key_for(org_id)
+
+    def __init__(self):
+        """Initialize the cache, with the generation observed on the last miss of each thread."""
+        super().__init__()
+        self._last_miss = threading.local()
+
     def set_cache(self, pipe: Pipeline, key: str, principal):
-        """Set cache to redis."""
-        pipe.set(name=key, value=pickle.dumps(principal))
+        """Set cache to redis together with the generation of the tenant the principal was read under.
+
+        The generation is the one observed when the principal was missing from the cache, i.e. before it was read
+        from the database, so an invalidation in between leaves the entry stale rather than stamping it as current.
+        """
+        miss = getattr(self._last_miss, "value", None)
+        self._last_miss.value = None
+        if miss is not None and miss[0] == key:
+            generation = miss[1]
+        else:
+            generation = self.connection.get(name=self._generation_key_for_principal_key(key))
+        pipe.set(name=key, value=pickle.dumps((generation, principal)))
         pipe.expire(name=key, time=settings.PRINCIPAL_CACHE_LIFETIME)
         pipe.execute()
 
     def get_from_redis(self, key: str):
-        """Get principal from redis based on the tenant and the principal."""
-        principal = self.connection.get(name=key)
+        """Get principal from redis based on the tenant and the principal, ignoring older generations."""
+        generation, principal = self.connection.mget([self._generation_key_for_principal_key(key), key])
         if principal:
-            return pickle.loads(principal)
-        else:
-            return None
+            entry = pickle.loads(principal)
+            if isinstance(entry, tuple) and len(entry) == 2 and entry[0] == generation:
+                self._last_miss.value = None
+                return entry[1]
+        self._last_miss.value = (key, generation)
+        return None
 
     def get_principal(self, org_id: str, principal_username: str):
         """Fetch the principal from the cache.
@@ -356,16 +1061,18 @@ class PrincipalCache(BasicCache):
 
         :param org_id: The tenant org_id to clear principals for.
         """
+        if self.use_local_cache:
+            prefix = self.key_for(org_id, "")
+            self.local_cache.delete_prefix(prefix)
+            invalidation_listener.publish(self.local_cache.name, prefix=prefix)
         err_msg = f"Error deleting all principals for tenant {org_id}"
         with self.delete_handler(err_msg):
-            logger.info(f"Deleting entire principal cache for tenant {org_id}")
-            count = 0
-            pipeline = self.connection.pipeline()
-            for key in self.connection.scan_iter(match=f"rbac::principal::{org_id}::*", count=BATCH_DELETE_SIZE):
-                pipeline.delete(key)
-                count += 1
-            pipeline.execute()
-            logger.info(f"Deleted {count} principals for tenant {org_id}")
+            generation = self.connection.incr(self.generation_key_for(org_id))
+            logger.info(f"Invalidated principal cache for tenant {org_id} (generation {generation})")
+
+
+invalidation_listener.register(TenantCache.local_cache)
+invalidation_listener.register(PrincipalCache.local_cache)
 
 
 def skip_purging_cache_for_public_tenant(tenant):
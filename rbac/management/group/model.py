@@ -18,7 +18,7 @@
 """Model for group management."""
 
 import logging
-from typing import Optional, Union
+from typing import Iterable, Optional, Union
 from uuid import uuid4
 
 from django.conf import settings
@@ -27,12 +27,12 @@ from django.db.models import signals
 from django.utils import timezone
 from internal.integration import chrome_handlers
 from internal.integration import sync_handlers
-from management.cache import AccessCache, skip_purging_cache_for_public_tenant
+from management.cache import policy_invalidation_queue, skip_purging_cache_for_public_tenant
 from management.principal.model import Principal
 from management.rbac_fields import AutoDateTimeField
 from management.relation_replicator.types import RelationTuple
 from management.role.model import Role
-from migration_tool.utils import create_relationship
+from migration_tool.utils import create_relationship, create_relationships
 
 from api.models import FilterQuerySet, TenantAwareModel, User
 
@@ -74,6 +74,16 @@ class Group(TenantAwareModel):
         id = Principal.user_id_to_principal_resource_id(user_id)
         return create_relationship(("rbac", "group"), group_uuid, ("rbac", "principal"), id, "member")
 
+    @staticmethod
+    def relationships_to_user_ids_for_groups(memberships: Iterable[tuple[str, str]]) -> list[RelationTuple]:
+        """Create the relationships between groups and user IDs for a batch of (group_uuid, user_id) pairs."""
+        return create_relationships(
+            ("rbac", "group"),
+            ("rbac", "principal"),
+            "member",
+            ((group_uuid, Principal.user_id_to_principal_resource_id(user_id)) for group_uuid, user_id in memberships),
+        )
+
     def relationship_to_principal(self, principal: Union[Principal, User]) -> Optional[RelationTuple]:
         """Create a relationship between a group and a principal given a Principal or User."""
         return Group.relationship_to_principal_for_group(self, principal)
@@ -112,9 +122,9 @@ def group_deleted_cache_handler(sender=None, instance=None, using=None, **kwargs
     if skip_purging_cache_for_public_tenant(instance.tenant):
         return
     logger.info("Handling signal for deleted group %s - invalidating policy cache for users in group", instance)
-    cache = AccessCache(instance.tenant.org_id)
-    for principal in instance.principals.all():
-        cache.delete_policy(principal.uuid)
+    policy_invalidation_queue.delete_policies(
+        instance.tenant.org_id, instance.principals.values_list("uuid", flat=True)
+    )
 
 
 def principals_to_groups_cache_handler(
@@ -123,25 +133,24 @@ def principals_to_groups_cache_handler(
     """Signal handler to purge caches when Group membership changes."""
     if skip_purging_cache_for_public_tenant(instance.tenant):
         return
-    cache = AccessCache(instance.tenant.org_id)
+    org_id = instance.tenant.org_id
     if action in ("post_add", "pre_remove"):
         logger.info("Handling signal for %s group membership change - invalidating policy cache", instance)
         if isinstance(instance, Group):
             # One or more principals was added to/removed from the group
-            for principal in Principal.objects.filter(pk__in=pk_set):
-                cache.delete_policy(principal.uuid)
+            principal_uuids = Principal.objects.filter(pk__in=pk_set).values_list("uuid", flat=True)
+            policy_invalidation_queue.delete_policies(org_id, principal_uuids)
         elif isinstance(instance, Principal):
             # One or more groups was added to/removed from the principal
-            cache.delete_policy(instance.uuid)
+            policy_invalidation_queue.delete_policies(org_id, [instance.uuid])
     elif action == "pre_clear":
         logger.info("Handling signal for %s group membership clearing - invalidating policy cache", instance)
         if isinstance(instance, Group):
             # All principals are being removed from this group
-            for principal in instance.principals.all():
-                cache.delete_policy(principal.uuid)
+            policy_invalidation_queue.delete_policies(org_id, instance.principals.values_list("uuid", flat=True))
         elif isinstance(instance, Principal):
             # All groups are being removed from this principal
-            cache.delete_policy(instance.uuid)
+            policy_invalidation_queue.delete_policies(org_id, [instance.uuid])
 
 
 def group_deleted_chrome_handler(sender=None, instance=None, using=None, **kwargs):
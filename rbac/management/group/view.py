@@ -18,6 +18,7 @@
 """View for group management."""
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Iterable, List, Optional, Tuple
 from uuid import UUID
 
@@ -565,16 +566,13 @@ class GroupViewSet(
         service_accounts: Iterable[dict],
     ):
         """Validate service account in IT Service and populate user IDs if needed."""
-        # Fetch all the user's service accounts from IT. If we are on a development or testing environment, we might
-        # want to skip calling IT
+        # Fetch all the user's service accounts from IT, by their client ID. If we are on a development or testing
+        # environment, we might want to skip calling IT
         it_service = ITService()
         if not settings.IT_BYPASS_IT_CALLS:
-            it_service_accounts = it_service.request_service_accounts(bearer_token=user.bearer_token)
-
-            # Organize them by their client ID.
-            it_service_accounts_by_client_ids: dict[str, dict] = {}
-            for it_sa in it_service_accounts:
-                it_service_accounts_by_client_ids[it_sa["clientId"]] = it_sa
+            it_service_accounts_by_client_ids = it_service.get_service_accounts_by_client_id(
+                user, required_client_ids=[sa["clientId"] for sa in service_accounts], allow_stale=False
+            )
 
             # Make sure that the service accounts the user specified are visible by them.
             invalid_service_accounts: set = set()
@@ -1128,8 +1126,8 @@ class GroupViewSet(
 
         return self.get_paginated_response(serializer.data)
 
-    def _list_user_based_principals_in_group(self, request, group, options):
-        """List user based principals in the group."""
+    def _request_user_based_principals_in_group(self, request, group, options, executor=None):
+        """Request the user based principals in the group from BOP, in the background if an executor is given."""
         principals_from_params = self.filtered_principals(group, request)
         username_list = [principal.username for principal in principals_from_params]
 
@@ -1139,7 +1137,54 @@ class GroupViewSet(
 
         proxy = PrincipalProxy()
         org_id = self.request.user.org_id
-        resp = proxy.request_filtered_principals(username_list, org_id=org_id, options=options)
+        if executor is not None:
+            return executor.submit(
+                proxy.request_filtered_principals, username_list, org_id=org_id, options=dict(options)
+            )
+        return proxy.request_filtered_principals(username_list, org_id=org_id, options=options)
+
+    def _paginate_user_based_principals_in_database(self, request):
+        """Whether the users of a group are paginated in the database, so that only one page is requested from BOP."""
+        # Only BOP knows which users are organization administrators, so filtering on it requires every member.
+        admin_only = validate_and_get_key(request.query_params, ADMIN_ONLY_KEY, VALID_BOOLEAN_VALUE, False, False)
+        return settings.GROUP_PRINCIPALS_DB_PAGINATION_ENABLED and admin_only != "true"
+
+    def _ordered_usernames_in_group(self, request, group, options):
+        """Return a queryset of the usernames of the filtered user based principals, in the requested order."""
+        order_field = "-username" if options.get("sort_order") == "des" else "username"
+        return self.filtered_principals(group, request).order_by(order_field).values_list("username", flat=True)
+
+    def _request_page_of_user_based_principals(self, usernames, options):
+        """Request the given page of usernames from BOP, returning the principals in the order of the page."""
+        proxy = PrincipalProxy()
+        resp = proxy.request_filtered_principals(usernames, org_id=self.request.user.org_id, options=options)
+        if isinstance(resp, dict) and "errors" in resp:
+            return resp
+
+        positions = {username.lower(): position for position, username in enumerate(usernames)}
+        resp["data"] = sorted(
+            resp.get("data", []), key=lambda user: positions.get(user.get("username", "").lower(), len(positions))
+        )
+        return resp
+
+    def _list_page_of_user_based_principals_in_group(self, request, group, options):
+        """List one page of user based principals in the group, counted and sliced by the database."""
+        page = self.paginate_queryset(self._ordered_usernames_in_group(request, group, options))
+        resp = self._request_page_of_user_based_principals(page, options)
+        if "errors" in resp:
+            return Response(status=resp.get("status_code"), data=resp.get("errors"))
+
+        return self.get_paginated_response(resp.get("data"))
+
+    def _list_user_based_principals_in_group(self, request, group, options, user_request=None):
+        """List user based principals in the group, waiting for their request to BOP if it was already sent."""
+        if options["principal_type"] != ALL_KEY and self._paginate_user_based_principals_in_database(request):
+            return self._list_page_of_user_based_principals_in_group(request, group, options)
+
+        if user_request is None:
+            resp = self._request_user_based_principals_in_group(request, group, options)
+        else:
+            resp = user_request.result()
         if isinstance(resp, dict) and "errors" in resp:
             return Response(status=resp.get("status_code"), data=resp.get("errors"))
 
@@ -1154,8 +1199,8 @@ class GroupViewSet(
         """
         List both principal types (user based, service account based) in the group.
 
-        First we try to list service account based principals and then user based principals.
-        For the second query we need to calculate new limit and offset.
+        The service account based principals come first and then the user based principals.
+        For the user based principals we need to calculate new limit and offset.
         Example:
             the group contains 3 SA + 4 U, limit = 2, offset = 0
             pagination:
@@ -1169,10 +1214,29 @@ class GroupViewSet(
         limit = paginator.limit
         offset = paginator.offset
 
-        # Get Service Account based principals
-        response_sa = self._list_service_accounts_in_group(request, group, options)
-        if response_sa.status_code != status.HTTP_200_OK:
-            return response_sa
+        # When every user based principal is needed, they do not depend on the service accounts, so they are
+        # requested from BOP while the service accounts are requested from IT, unless BOP verification bypass or the
+        # "username_only" parameter take them from the database. A page of users depends on the service accounts.
+        paginate_users_in_database = self._paginate_user_based_principals_in_database(request)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            user_request = None
+            if (
+                not paginate_users_in_database
+                and not settings.BYPASS_BOP_VERIFICATION
+                and options["username_only"] != "true"
+            ):
+                user_request = self._request_user_based_principals_in_group(request, group, options, executor)
+
+            # Get Service Account based principals
+            response_sa = self._list_service_accounts_in_group(request, group, options)
+            if response_sa.status_code != status.HTTP_200_OK:
+                return response_sa
+
+            # Get User based principals
+            if not paginate_users_in_database:
+                response_user = self._list_user_based_principals_in_group(request, group, options, user_request)
+                if response_user.get("status_code") != status.HTTP_200_OK:
+                    return response_user
 
         # Calculate new limit and offset for the user based principals query
         sa_count_total = int(response_sa.data.get("meta").get("count"))
@@ -1189,13 +1253,20 @@ class GroupViewSet(
                 new_limit = remaining_limit
                 new_offset = 0
 
-        # Get User based principals
-        response_user = self._list_user_based_principals_in_group(request, group, options)
-        if response_user.get("status_code") != status.HTTP_200_OK:
-            return response_user
-
         # Calculate the total count and save it for pagination
-        user_count_total = len(response_user.get("data"))
+        if paginate_users_in_database:
+            usernames = self._ordered_usernames_in_group(request, group, options)
+            user_count_total = usernames.count()
+            users = []
+            if remaining_limit:
+                page = list(usernames[new_offset : new_offset + new_limit])  # noqa: E203
+                response_user = self._request_page_of_user_based_principals(page, options)
+                if "errors" in response_user:
+                    return Response(status=response_user.get("status_code"), data=response_user.get("errors"))
+                users = response_user.get("data")
+        else:
+            user_count_total = len(response_user.get("data"))
+            users = response_user.get("data")[new_offset : new_offset + new_limit]  # noqa: E203
         self.paginator.count = sa_count_total + user_count_total
 
         # Put together the final response
@@ -1204,8 +1275,8 @@ class GroupViewSet(
         if response_sa.data.get("data", []):
             response_data["serviceAccounts"] = response_sa.data.get("data")
 
-        if response_user.get("data", []) and remaining_limit:
-            response_data["users"] = response_user.get("data")[new_offset : new_offset + new_limit]  # noqa: E203
+        if users and remaining_limit:
+            response_data["users"] = users
 
         return self.get_paginated_response(response_data)
 
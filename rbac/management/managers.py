@@ -94,3 +94,25 @@ class WorkspaceManager(models.Manager):
             rows = cursor.fetchall()
 
         return [str(row[0]) for row in rows]
+
+    def ancestor_ids(self, ids, tenant_id):
+        """Return the union of the ancestor workspace IDs of the workspaces supplied."""
+        with connection.cursor() as cursor:
+            sql = """
+                WITH RECURSIVE ancestors AS
+                    (SELECT parent_id AS id
+                    FROM management_workspace
+                    WHERE id = ANY(%s::uuid[])
+                    AND tenant_id = %s
+                    AND parent_id IS NOT NULL
+                    UNION SELECT w.parent_id
+                    FROM management_workspace w
+                    JOIN ancestors a ON w.id = a.id
+                    WHERE w.parent_id IS NOT NULL)
+                SELECT id
+                FROM ancestors
+            """
+            cursor.execute(sql, [ids, tenant_id])
+            rows = cursor.fetchall()
+
+        return [str(row[0]) for row in rows]
@@ -17,14 +17,18 @@
 
 """Notification handlers of object change."""
 
+import copy
 import json
 import logging
 import os
+import time
 from datetime import datetime
 from uuid import uuid4
 
 from core.kafka import RBACProducer
 from django.conf import settings
+from django.db import transaction
+from prometheus_client import Counter, Histogram
 
 from api.models import Tenant
 
@@ -36,10 +40,21 @@ noto_topic = settings.NOTIFICATIONS_TOPIC
 with open(os.path.join(settings.BASE_DIR, "management", "notifications", "message_template.json")) as template:
     message_template = json.load(template)
 
+notifications_fan_out_messages_total = Counter(
+    "rbac_notifications_fan_out_messages_total",
+    "Total number of notification messages sent to all tenants",
+    ["event_type"],
+)
+notifications_fan_out_duration_seconds = Histogram(
+    "rbac_notifications_fan_out_duration_seconds",
+    "Time taken to send a notification to all tenants",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600),
+)
+
 
 def build_notifications_message(event_type, payload, org_id=None):
     """Create message based on template."""
-    message = message_template
+    message = copy.deepcopy(message_template)
     message["org_id"] = org_id
     message["event_type"] = event_type
     message["timestamp"] = datetime.now().isoformat()
@@ -49,18 +64,74 @@ def build_notifications_message(event_type, payload, org_id=None):
 
 def notify(event_type, payload, org_id=None):
     """Actually send notifications message."""
-    noto_message = build_notifications_message(event_type, payload, org_id)
-    noto_headers = [("rh-message-id", str(uuid4()).encode("utf-8"))]
-    noto_producer.send_kafka_message(noto_topic, noto_message, noto_headers)
+    dedup_key = (event_type, org_id, json.dumps(payload, sort_keys=True, default=str))
+    noto_producer.send_kafka_message_on_commit(
+        noto_topic,
+        dedup_key,
+        lambda: build_notifications_message(event_type, payload, org_id),
+        lambda: [("rh-message-id", str(uuid4()).encode("utf-8"))],
+    )
 
 
 def notify_all(event_type, payload):
-    """Notify all tenants."""
-    # To avoid memory overloaded, use iterator:
-    # https://docs.djangoproject.com/en/4.0/ref/models/querysets/#django.db.models.query.QuerySet.iterator
-    for tenant in Tenant.objects.exclude(tenant_name="public").filter(ready=True).iterator():
-        # Tenant name pattern is acct12345
-        notify(event_type, payload, tenant.org_id)
+    """Notify all tenants, from a Celery task once committed if NOTIFICATIONS_FAN_OUT_IN_WORKER is set.
+
+    Otherwise the tenants are notified inline, once committed if KAFKA_PRODUCER_DEFER_UNTIL_COMMIT is set. Failures
+    after the commit are logged without skipping the other commit hooks.
+    """
+    if settings.NOTIFICATIONS_FAN_OUT_IN_WORKER:
+        # Imported here as management.tasks depends on modules importing this one
+        from management.tasks import notify_all_in_worker
+
+        transaction.on_commit(lambda: notify_all_in_worker.delay(event_type, payload), robust=True)
+        return
+    if settings.KAFKA_PRODUCER_DEFER_UNTIL_COMMIT:
+        transaction.on_commit(lambda: fan_out_notification(event_type, payload), robust=True)
+        return
+    fan_out_notification(event_type, payload)
+
+
+def fan_out_notification(event_type, payload, chunk_size=None):
+    """Send a notification to every ready tenant and return the number of messages sent.
+
+    Tenants are read in keyset-paginated chunks. The message is serialized once, only the
+    timestamp and org_id are serialized per tenant.
+    """
+    chunk_size = chunk_size or settings.NOTIFICATIONS_FAN_OUT_CHUNK_SIZE
+    message = build_notifications_message(event_type, payload)
+    body = json.dumps({key: value for key, value in message.items() if key not in ("timestamp", "org_id")})
+    body_prefix = body[:-1].encode("utf-8")
+    tenants = Tenant.objects.exclude(tenant_name="public").filter(ready=True).order_by("id")
+
+    start = time.monotonic()
+    sent = 0
+    last_id = 0
+    while True:
+        chunk = list(tenants.filter(id__gt=last_id).values_list("id", "org_id")[:chunk_size])
+        for _, org_id in chunk:
+            envelope = f', "timestamp": {json.dumps(datetime.now().isoformat())}, "org_id": {json.dumps(org_id)}}}'
+            noto_producer.send_serialized_kafka_message(
+                noto_topic,
+                body_prefix + envelope.encode("utf-8"),
+                [("rh-message-id", str(uuid4()).encode("utf-8"))],
+            )
+        if chunk:
+            last_id = chunk[-1][0]
+            sent += len(chunk)
+            notifications_fan_out_messages_total.labels(event_type).inc(len(chunk))
+            logger.info(
+                "Sent %s notification to %d tenants (%.0f messages/s)",
+                event_type,
+                sent,
+                sent / max(time.monotonic() - start, 1e-6),
+            )
+        if len(chunk) < chunk_size:
+            break
+
+    duration = time.monotonic() - start
+    notifications_fan_out_duration_seconds.observe(duration)
+    logger.info("Finished sending %s notification to %d tenants in %.2fs", event_type, sent, duration)
+    return sent
 
 
 def handle_system_role_change_notification(role_obj, operation):
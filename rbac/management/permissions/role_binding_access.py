@@ -154,7 +154,7 @@ class RoleBindingKesselAccessPermission(permissions.BasePermission):
 
         # Use WorkspaceInventoryAccessChecker for the Kessel permission check
         relation = self._get_relation()
-        checker = WorkspaceInventoryAccessChecker()
+        checker = WorkspaceInventoryAccessChecker(tenant=getattr(request, "tenant", None))
         return checker.check_resource_access(
             resource_type=resource_type,
             resource_id=resource_id,
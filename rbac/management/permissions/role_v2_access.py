@@ -78,7 +78,7 @@ class RoleV2KesselAccessPermission(permissions.BasePermission):
             return False
 
         relation = self._get_relation(view)
-        checker = WorkspaceInventoryAccessChecker()
+        checker = WorkspaceInventoryAccessChecker(tenant=tenant)
         return checker.check_resource_access(
             resource_type=self.RESOURCE_TYPE,
             resource_id=org_resource_id,
@@ -31,6 +31,7 @@ from kessel.inventory.v1beta2 import (
     streamed_list_objects_request_pb2,
 )
 from kessel.inventory.v1beta2.check_for_update_request_pb2 import CheckForUpdateRequest
+from management.cache import KesselLookupCache
 from management.inventory_client import (
     inventory_client,
     make_resource_ref,
@@ -50,6 +51,15 @@ class WorkspaceInventoryAccessChecker:
     # Maximum number of pages to fetch to prevent infinite loops from buggy server responses.
     MAX_PAGES = 10000
 
+    def __init__(self, tenant=None):
+        """
+        Initialize the checker.
+
+        Args:
+            tenant: Optional tenant of the checked principal, whose relations consistency token keys cached results
+        """
+        self.tenant = tenant
+
     def _log_and_return_allowed(
         self,
         allowed_value: int,
@@ -158,7 +168,13 @@ class WorkspaceInventoryAccessChecker:
                 relation,
             )
 
-        return self._call_inventory(rpc, False)
+        allowed = KesselLookupCache().get_or_lookup(
+            self.tenant,
+            "check",
+            f"{resource_type}:{resource_id}#{relation}@{principal_id}",
+            lambda: self._call_inventory(rpc, None),
+        )
+        return bool(allowed)
 
     def check_workspace_access(
         self,
@@ -246,6 +262,7 @@ class WorkspaceInventoryAccessChecker:
             principal_id: Principal identifier (e.g., "localhost/username")
             relation: The relation to check
             request_id: Optional request ID for logging/tracing
+            consistency_token: Optional token the results must be at least as fresh as
 
         Returns:
             Set[str]: Set of workspace IDs that the principal has access to
@@ -333,4 +350,11 @@ class WorkspaceInventoryAccessChecker:
 
             return accessible_workspaces
 
-        return self._call_inventory(rpc, set())
+        def lookup():
+            accessible_workspaces = self._call_inventory(rpc, None)
+            return None if accessible_workspaces is None else sorted(accessible_workspaces)
+
+        accessible_workspaces = KesselLookupCache().get_or_lookup(
+            self.tenant, "workspaces", f"{relation}@{principal_id}", lookup, consistency_token=consistency_token
+        )
+        return set(accessible_workspaces or ())
@@ -25,7 +25,7 @@ from django.db import models
 from django.db.models import signals
 from django.utils import timezone
 from internal.integration import sync_handlers
-from management.cache import AccessCache, skip_purging_cache_for_public_tenant
+from management.cache import policy_invalidation_queue, skip_purging_cache_for_public_tenant
 from management.group.model import Group
 from management.principal.model import Principal
 from management.rbac_fields import AutoDateTimeField
@@ -53,18 +53,20 @@ class Policy(TenantAwareModel):
         constraints = [models.UniqueConstraint(fields=["name", "tenant"], name="unique policy name per tenant")]
 
 
+def _invalidate_group_policies(org_id, group):
+    """Queue the invalidation of the cached policies affected by a change to a group's policy."""
+    if group.platform_default:
+        policy_invalidation_queue.delete_all_policies_for_tenant(org_id)
+    policy_invalidation_queue.delete_policies(org_id, group.principals.values_list("uuid", flat=True))
+
+
 def policy_changed_cache_handler(sender=None, instance=None, using=None, **kwargs):
     """Signal handler for Principal cache expiry on Policy deletion."""
     if skip_purging_cache_for_public_tenant(instance.tenant):
         return
     logger.info("Handling signal for deleted policy %s - invalidating associated user cache keys", instance)
-    cache = AccessCache(instance.tenant.org_id)
     if instance.group:
-        principals = instance.group.principals.all()
-        if instance.group.platform_default:
-            cache.delete_all_policies_for_tenant()
-        for principal in principals:
-            cache.delete_policy(principal.uuid)
+        _invalidate_group_policies(instance.tenant.org_id, instance.group)
 
 
 def policy_to_roles_cache_handler(
@@ -73,37 +75,30 @@ def policy_to_roles_cache_handler(
     """Signal handler for Principal cache expiry on Policy/Role m2m change."""
     if skip_purging_cache_for_public_tenant(instance.tenant):
         return
-    cache = AccessCache(instance.tenant.org_id)
+    org_id = instance.tenant.org_id
     if action in ("post_add", "pre_remove"):
         logger.info("Handling signal for %s roles change - invalidating policy cache", instance)
         if isinstance(instance, Policy):
             # One or more roles was added to/removed from the policy
             if instance.group:
-                if instance.group.platform_default:
-                    cache.delete_all_policies_for_tenant()
-                for principal in instance.group.principals.all():
-                    cache.delete_policy(principal.uuid)
+                _invalidate_group_policies(org_id, instance.group)
         elif isinstance(instance, Role):
             # One or more policies was added to/removed from the role
             for policy in Policy.objects.filter(pk__in=pk_set):
                 if policy.group:
-                    if policy.group.platform_default:
-                        cache.delete_all_policies_for_tenant()
-                    for principal in policy.group.principals.all():
-                        cache.delete_policy(principal.uuid)
+                    _invalidate_group_policies(org_id, policy.group)
     elif action == "pre_clear":
         logger.info("Handling signal for %s policy-roles clearing - invalidating policy cache", instance)
         if isinstance(instance, Policy):
             # All roles are being removed from this policy
             if instance.group:
-                if instance.group.platform_default:
-                    cache.delete_all_policies_for_tenant()
-                for principal in instance.group.principals.all():
-                    cache.delete_policy(principal.uuid)
+                _invalidate_group_policies(org_id, instance.group)
         elif isinstance(instance, Role):
             # All policies are being removed from this role
-            for principal in Principal.objects.filter(group__policies__roles__pk=instance.pk):
-                cache.delete_policy(principal.uuid)
+            principal_uuids = Principal.objects.filter(group__policies__roles__pk=instance.pk).values_list(
+                "uuid", flat=True
+            )
+            policy_invalidation_queue.delete_policies(org_id, principal_uuids)
 
 
 def policy_changed_sync_handler(sender=None, instance=None, using=None, **kwargs):
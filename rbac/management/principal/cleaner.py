@@ -20,11 +20,14 @@
 import logging
 import os
 import ssl
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 import xmltodict
 from django.conf import settings
 from django.db import connection, transaction
+from management.cache import PrincipalCleanupCheckpointCache
 from management.principal.model import Principal
 from management.principal.proxy import PrincipalProxy, external_principal_to_user
 from management.relation_replicator.outbox_replicator import OutboxReplicator
@@ -65,68 +68,117 @@ stomp_messages_nack_total = Counter(
 
 
 def clean_tenant_principals(tenant):
-    """Check if all the principals in the tenant exist, remove non-existent principals."""
+    """Check if all the principals in the tenant exist, remove non-existent principals.
+
+    Usernames are checked against BOP in batches of PRINCIPAL_CLEANUP_BATCH_SIZE, and the principals
+    missing from a batch are deleted together.
+    """
     removed_principals = []
-    principals = list(Principal.objects.filter(type="user").filter(tenant=tenant))
+    principals = Principal.objects.filter(type="user", tenant=tenant, cross_account=False)
+    usernames = list(principals.order_by("username").values_list("username", flat=True))
     tenant_id = tenant.org_id
-    logger.info(
-        "clean_tenant_principals: Running clean up on %d principals for tenant %s.", len(principals), tenant_id
-    )
-    for principal in principals:
-        if principal.cross_account:
-            continue
-        logger.debug("clean_tenant_principals: Checking for username %s for tenant %s.", principal.username, tenant_id)
-        org_id = tenant.org_id
-        resp = PROXY.request_filtered_principals([principal.username], org_id=org_id)
+    logger.info("clean_tenant_principals: Running clean up on %d principals for tenant %s.", len(usernames), tenant_id)
+    batch_size = settings.PRINCIPAL_CLEANUP_BATCH_SIZE
+    for start in range(0, len(usernames), batch_size):
+        batch = usernames[start : start + batch_size]  # noqa: E203
+        resp = PROXY.request_filtered_principals(batch, org_id=tenant_id)
         status_code = resp.get("status_code")
-        data = resp.get("data")
-        logger.info("clean_tenant_principals: Response code: %s Data: %s", str(status_code), str(data))
-        if status_code == status.HTTP_200_OK and data:
-            logger.debug(
-                "clean_tenant_principals: Username %s found for tenant %s, no change needed.",
-                principal.username,
-                tenant_id,
-            )
-        elif status_code == status.HTTP_200_OK and not data:
-            removed_principals.append(principal.username)
-            logger.info(
-                "clean_tenant_principals: Username %s not found for tenant %s, principal eligible for removal.",
-                principal.username,
-                tenant_id,
-            )
-            principal.delete()
-            logger.info(
-                "clean_tenant_principals: Username %s removed.",
-                principal.username,
-            )
-        else:
+        if status_code != status.HTTP_200_OK:
             logger.warning(
-                "clean_tenant_principals: Unknown status %d when checking username %s"
+                "clean_tenant_principals: Unknown status %d when checking %d usernames"
                 " for tenant %s, no change needed.",
                 status_code,
-                principal.username,
+                len(batch),
                 tenant_id,
             )
+            continue
+        found = {user.get("username", "").lower() for user in resp.get("data") or []}
+        missing = [username for username in batch if username not in found]
+        if not missing:
+            continue
+        logger.info(
+            "clean_tenant_principals: Usernames %s not found for tenant %s, principals eligible for removal.",
+            str(missing),
+            tenant_id,
+        )
+        with transaction.atomic():
+            principals.filter(username__in=missing).delete()
+        removed_principals.extend(missing)
+        logger.info("clean_tenant_principals: Usernames %s removed.", str(missing))
     removal_message = "clean_tenant_principals: Completed clean up of %d principals for tenant %s, %d removed: %s."
     logger.info(
         removal_message,
-        len(principals),
+        len(usernames),
         tenant_id,
         len(removed_principals),
         str(removed_principals),
     )
 
 
+def _clean_tenant_principals_in_thread(tenant):
+    """Clean up the principals of a tenant from a worker thread of the principal clean up."""
+    try:
+        clean_tenant_principals(tenant)
+    finally:
+        # Every worker thread opens its own database connection.
+        connection.close()
+
+
 def clean_tenants_principals():
-    """Check which principals are eligible for clean up."""
+    """Check which principals are eligible for clean up.
+
+    Up to PRINCIPAL_CLEANUP_CONCURRENCY tenants are cleaned up at the same time. Tenants are started in
+    id order and a checkpoint records the id up to which all tenants are done, so an interrupted job
+    resumes after it.
+    """
     logger.info("clean_tenant_principals: Start principal clean up.")
+    checkpoint = PrincipalCleanupCheckpointCache()
+    start_after = checkpoint.get_checkpoint()
+    if start_after:
+        logger.info("clean_tenant_principals: Resuming principal clean up after tenant id %d.", start_after)
+    tenants = list(Tenant.objects.filter(ready=True, id__gt=start_after).exclude(tenant_name="public").order_by("id"))
+
+    concurrency = settings.PRINCIPAL_CLEANUP_CONCURRENCY
+    if concurrency <= 1:
+        for tenant in tenants:
+            _clean_tenant_principals_with_logging(clean_tenant_principals, tenant)
+            checkpoint.save_checkpoint(tenant.id)
+    else:
+        in_progress = deque()
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="principal-cleanup") as executor:
+            try:
+                for tenant in tenants:
+                    future = executor.submit(
+                        _clean_tenant_principals_with_logging, _clean_tenant_principals_in_thread, tenant
+                    )
+                    in_progress.append((tenant.id, future))
+                    # Bound the tenants queued up front, and move the checkpoint as the oldest ones complete.
+                    if len(in_progress) >= 2 * concurrency:
+                        _wait_for_oldest(in_progress, checkpoint)
+                while in_progress:
+                    _wait_for_oldest(in_progress, checkpoint)
+            except Exception:
+                # The job resumes from the checkpoint, tenants not started yet are left for then.
+                for _, future in in_progress:
+                    future.cancel()
+                raise
+
+    checkpoint.delete_checkpoint()
+    logger.info("clean_tenant_principals: Principal cleanup complete for all tenants.")
 
-    for tenant in list(Tenant.objects.filter(ready=True).exclude(tenant_name="public")):
-        logger.info("clean_tenant_principals: Running principal clean up for tenant %s.", tenant.tenant_name)
-        clean_tenant_principals(tenant)
-        logger.info("clean_tenant_principals: Completed principal clean up for tenant %s.", tenant.tenant_name)
 
-    logger.info("clean_tenant_principals: Principal cleanup complete for all tenants.")
+def _clean_tenant_principals_with_logging(clean, tenant):
+    """Run the clean up of a tenant's principals, logging its start and completion."""
+    logger.info("clean_tenant_principals: Running principal clean up for tenant %s.", tenant.tenant_name)
+    clean(tenant)
+    logger.info("clean_tenant_principals: Completed principal clean up for tenant %s.", tenant.tenant_name)
+
+
+def _wait_for_oldest(in_progress, checkpoint):
+    """Wait for the oldest tenant in progress and checkpoint it, as all tenants before it are done."""
+    tenant_id, future = in_progress.popleft()
+    future.result()
+    checkpoint.save_checkpoint(tenant_id)
 
 
 ssl_context = ssl.create_default_context()
@@ -17,14 +17,17 @@
 """Class to manage interactions with the IT service accounts service."""
 
 import logging
+import threading
 import time
 import uuid
-from typing import Any, Optional, Tuple, Union
+from typing import Any, Iterable, Optional, Tuple, Union
 
 import requests
+from core.http import PooledSession
 from django.conf import settings
 from django.db.models import Q
 from management.authorization.missing_authorization import MissingAuthorizationError
+from management.cache import ITServiceAccountsCache, SingleFlight
 from management.models import Group, Principal
 from prometheus_client import Counter, Histogram
 from rest_framework import serializers, status
@@ -58,6 +61,17 @@ it_request_error = Counter(
     ["error"],
 )
 
+it_service_accounts_cache_requests_total = Counter(
+    "it_service_accounts_cache_requests_total",
+    "Number of reads of the tenants' service accounts snapshots, by whether the snapshot was fresh, stale or missing",
+    ["result"],
+)
+
+# Keep-alive connections to IT's SSO, shared by the threads of the process.
+it_session = PooledSession("it")
+# Tenants whose service accounts snapshot is being refreshed by a request thread of this process.
+service_accounts_refreshes = SingleFlight()
+
 # Keys for the "options" dictionary. The "options" dictionary represents the query parameters passed by the calling
 # client.
 SERVICE_ACCOUNT_DESCRIPTION_KEY = "service_account_description"
@@ -125,7 +139,7 @@ class ITService:
                     parameters["clientId"] = client_ids
 
                 # Call IT.
-                response = requests.get(
+                response = it_session.get(
                     url=self.it_url,
                     headers={"Authorization": f"Bearer {bearer_token}"},
                     params=parameters,
@@ -190,6 +204,62 @@ class ITService:
 
         return service_accounts
 
+    def get_service_accounts_by_client_id(
+        self, user: User, required_client_ids: Iterable[str] = (), allow_stale: bool = True
+    ) -> dict[str, dict]:
+        """Return the tenant's service accounts in IT indexed by client ID.
+
+        When IT_SERVICE_ACCOUNTS_CACHE_ENABLED is set, they come from a snapshot of the tenant's service accounts. A
+        snapshot older than IT_SERVICE_ACCOUNTS_CACHE_LIFETIME is still returned if allow_stale is set, while it is
+        refreshed in the background. It is refreshed right away instead when it is missing, too old to be served, or
+        lacks any of the required client IDs, since those service accounts may have been created after it was taken.
+        """
+        if not settings.IT_SERVICE_ACCOUNTS_CACHE_ENABLED:
+            return self._index_service_accounts(self.request_service_accounts(bearer_token=user.bearer_token))
+
+        snapshot = ITServiceAccountsCache().get_snapshot(user.org_id)
+        if snapshot is not None and set(required_client_ids) <= snapshot["service_accounts"].keys():
+            if time.time() - snapshot["taken_at"] < settings.IT_SERVICE_ACCOUNTS_CACHE_LIFETIME:
+                it_service_accounts_cache_requests_total.labels(result="fresh").inc()
+                return snapshot["service_accounts"]
+            if allow_stale:
+                it_service_accounts_cache_requests_total.labels(result="stale").inc()
+                self._refresh_service_accounts_in_background(user)
+                return snapshot["service_accounts"]
+
+        it_service_accounts_cache_requests_total.labels(result="miss").inc()
+        return service_accounts_refreshes.do(
+            user.org_id, lambda: self._refresh_service_accounts(user.org_id, user.bearer_token)
+        )
+
+    @staticmethod
+    def _index_service_accounts(service_accounts: list[dict]) -> dict[str, dict]:
+        """Index the service accounts by client ID, keeping the order IT returned them in."""
+        return {sa["clientId"]: sa for sa in service_accounts if "clientId" in sa}
+
+    def _refresh_service_accounts(self, org_id: str, bearer_token: str) -> dict[str, dict]:
+        """Request the tenant's service accounts from IT and save them as the tenant's snapshot."""
+        service_accounts = self._index_service_accounts(self.request_service_accounts(bearer_token=bearer_token))
+        ITServiceAccountsCache().save_snapshot(org_id, service_accounts)
+        return service_accounts
+
+    def _refresh_service_accounts_in_background(self, user: User):
+        """Refresh the tenant's snapshot in a background thread, unless another worker is refreshing it already."""
+        if not ITServiceAccountsCache().acquire_refresh_lock(user.org_id):
+            return
+
+        def refresh(org_id, bearer_token):
+            try:
+                self._refresh_service_accounts(org_id, bearer_token)
+            except Exception:
+                LOGGER.exception("Unable to refresh the service accounts snapshot of org %s", org_id)
+            finally:
+                ITServiceAccountsCache().release_refresh_lock(org_id)
+
+        threading.Thread(
+            target=refresh, args=(user.org_id, user.bearer_token), name="it-service-accounts-refresh", daemon=True
+        ).start()
+
     def is_service_account_valid_by_client_id(self, user: User, service_account_client_id: str) -> bool:
         """Check if the specified service account is valid."""
         if settings.IT_BYPASS_IT_CALLS:
@@ -219,66 +289,26 @@ class ITService:
             # In theory, we should be able to pass the client ID to the function below to just get the specified
             # service account and check if it is present or not. However, due to a bug, we need to fetch the whole
             # collection for now. More details in https://issues.redhat.com/browse/RHCLOUD-31265 .
-            service_accounts: list[dict] = self.request_service_accounts(bearer_token=user.bearer_token)
+            service_accounts = self.get_service_accounts_by_client_id(
+                user, required_client_ids=[client_id], allow_stale=False
+            )
 
-            for sa in service_accounts:
-                if client_id == sa.get("clientId"):
-                    return True
+            return client_id in service_accounts
 
-            return False
+    def get_service_accounts(
+        self, user: User, options: dict[str, Any] = {}, it_service_accounts: Optional[list[dict]] = None
+    ) -> Tuple[list[dict], int]:
+        """Request and returns the service accounts for the given tenant.
 
-    def get_service_accounts(self, user: User, options: dict[str, Any] = {}) -> Tuple[list[dict], int]:
-        """Request and returns the service accounts for the given tenant."""
+        The service accounts can be given if they were already requested from IT.
+        """
         # We might want to bypass calls to the IT service on ephemeral or test environments.
-        it_service_accounts: list[dict] = []
-        if not settings.IT_BYPASS_IT_CALLS:
-            it_service_accounts = self.request_service_accounts(bearer_token=user.bearer_token)
-
-        # Get the service accounts from the database. The weird filter is to fetch the service accounts depending on
-        # the account number or the organization ID the user gave.
-        service_account_principals = Principal.objects.filter(type=Principal.Types.SERVICE_ACCOUNT).filter(
-            (Q(tenant__isnull=False) & Q(tenant__account_id=user.account))
-            | (Q(tenant__isnull=False) & Q(tenant__org_id=user.org_id))
-        )
-
-        # The following filters do not make sense for service accounts, because we either do not have the
-        # corresponding fields to filter with, or it only applies to principals.
-        # - Admin only
-        # - Email
-        # - Status
-        usernames: list[str] = []
-        specified_usernames = options.get("usernames")
-        if specified_usernames:
-            usernames = specified_usernames.split(",")
-
-        # If "match_criteria" is specified and the usernames list is not empty,
-        # only the first username is taken into account
-        match_criteria = options.get("match_criteria")
-        if match_criteria and usernames:
-            username = usernames[0]
-
-            if match_criteria == "partial":
-                service_account_principals = service_account_principals.filter(username__startswith=username)
-            else:
-                service_account_principals = service_account_principals.filter(username=username)
-        elif len(usernames) > 0:
-            service_account_principals = service_account_principals.filter(username__in=usernames)
-
-        # Sort order which defaults to ascending.
-        sort_order_ascending = True
-        sort_order = options.get("sort_order")
-        if sort_order:
-            sort_order_ascending = sort_order == "asc"
-
-        asc_order_by_enabled = True
-        order_by = options.get("order_by")
-        if order_by:
-            asc_order_by_enabled = not order_by.startswith("-")
+        if it_service_accounts is None:
+            it_service_accounts = []
+            if not settings.IT_BYPASS_IT_CALLS:
+                it_service_accounts = list(self.get_service_accounts_by_client_id(user).values())
 
-        if sort_order_ascending and asc_order_by_enabled:
-            service_account_principals = service_account_principals.order_by("username")
-        else:
-            service_account_principals = service_account_principals.order_by("-username")
+        service_account_principals = self._get_service_account_principals(user=user, options=options)
 
         # If we are in an ephemeral or test environment, we will take all the service accounts of the user that are
         # stored in the database and generate a mocked response for them, simulating that IT has the corresponding
@@ -328,6 +358,7 @@ class ITService:
             service_accounts = filtered_service_accounts
             count = len(service_accounts)
 
+        order_by = options.get("order_by")
         if order_by:
             # If any order_by parameter is passed then sort the service accounts by that field either asc or desc
             if order_by in ["-time_created", "-name", "-description", "-clientId", "-owner"]:
@@ -340,15 +371,82 @@ class ITService:
 
         return service_accounts, count
 
-    def get_service_accounts_group(self, group: Group, user: User, options: dict[str, Any] = {}) -> list[dict]:
-        """Get the service accounts for the given group."""
+    def _get_service_account_principals(self, user: User, options: dict[str, Any] = {}):
+        """Get the service account principals of the tenant, filtered and sorted as the options specify."""
+        # Get the service accounts from the database. The weird filter is to fetch the service accounts depending on
+        # the account number or the organization ID the user gave.
+        service_account_principals = Principal.objects.filter(type=Principal.Types.SERVICE_ACCOUNT).filter(
+            (Q(tenant__isnull=False) & Q(tenant__account_id=user.account))
+            | (Q(tenant__isnull=False) & Q(tenant__org_id=user.org_id))
+        )
+
+        # The following filters do not make sense for service accounts, because we either do not have the
+        # corresponding fields to filter with, or it only applies to principals.
+        # - Admin only
+        # - Email
+        # - Status
+        usernames: list[str] = []
+        specified_usernames = options.get("usernames")
+        if specified_usernames:
+            usernames = specified_usernames.split(",")
+
+        # If "match_criteria" is specified and the usernames list is not empty,
+        # only the first username is taken into account
+        match_criteria = options.get("match_criteria")
+        if match_criteria and usernames:
+            username = usernames[0]
+
+            if match_criteria == "partial":
+                service_account_principals = service_account_principals.filter(username__startswith=username)
+            else:
+                service_account_principals = service_account_principals.filter(username=username)
+        elif len(usernames) > 0:
+            service_account_principals = service_account_principals.filter(username__in=usernames)
+
+        # Sort order which defaults to ascending.
+        sort_order_ascending = True
+        sort_order = options.get("sort_order")
+        if sort_order:
+            sort_order_ascending = sort_order == "asc"
+
+        asc_order_by_enabled = True
+        order_by = options.get("order_by")
+        if order_by:
+            asc_order_by_enabled = not order_by.startswith("-")
+
+        if sort_order_ascending and asc_order_by_enabled:
+            service_account_principals = service_account_principals.order_by("username")
+        else:
+            service_account_principals = service_account_principals.order_by("-username")
+
+        return service_account_principals
+
+    def estimate_service_accounts_count(self, user: User, options: dict[str, Any] = {}) -> Optional[int]:
+        """Estimate how many service accounts get_service_accounts will return, without requesting them from IT.
+
+        The estimate is the number of matching service accounts in the database, so it is None when filters that
+        only apply to the data in IT are given.
+        """
+        if options.get("name") or options.get("owner") or options.get("description"):
+            return None
+
+        return self._get_service_account_principals(user=user, options=options).count()
+
+    def get_service_accounts_group(
+        self, group: Group, user: User, options: dict[str, Any] = {}, it_service_accounts: Optional[list[dict]] = None
+    ) -> list[dict]:
+        """Get the service accounts for the given group.
+
+        The service accounts can be given if they were already requested from IT.
+        """
         username_only: str = options.get("username_only", "false")
         # We might want to bypass calls to the IT service
         #        - on ephemeral or test environments
         #        - when query param username_only == 'true'
-        it_service_accounts: list[dict[str, Union[str, int]]] = []
-        if not settings.IT_BYPASS_IT_CALLS and username_only == "false":
-            it_service_accounts = self.request_service_accounts(bearer_token=user.bearer_token)
+        if it_service_accounts is None:
+            it_service_accounts = []
+            if not settings.IT_BYPASS_IT_CALLS and username_only == "false":
+                it_service_accounts = list(self.get_service_accounts_by_client_id(user).values())
 
         # Fetch the service accounts from the group.
         group_service_account_principals = group.principals.filter(type=Principal.Types.SERVICE_ACCOUNT)
@@ -464,7 +562,7 @@ class ITService:
     def generate_service_accounts_report_in_group(self, group: Group, client_ids: set[str]) -> dict[str, bool]:
         """Check if the given service accounts are in the specified group."""
         # Fetch the service accounts from the group.
-        group_service_account_principals = (
+        group_service_account_principals = set(
             group.principals.values_list("service_account_id", flat=True)
             .filter(type=Principal.Types.SERVICE_ACCOUNT)
             .filter(service_account_id__in=client_ids)
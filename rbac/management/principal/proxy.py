@@ -18,9 +18,12 @@
 """Proxy for principal management."""
 
 import logging
+from urllib.parse import urlencode
 
 import requests
+from core.http import PooledSession
 from django.conf import settings
+from management.cache import PrincipalLookupCache, SingleFlight
 from management.models import Principal
 from prometheus_client import Counter, Histogram
 from rest_framework import status
@@ -49,6 +52,9 @@ bop_request_time_tracking = Histogram(
 bop_request_status_count = Counter(
     "bop_request_status_total", "Number of requests from RBAC to BOP and resulting status", ["method", "status"]
 )
+# BOP's POST endpoints are lookups, so they are as safe to retry as the GET ones.
+bop_session = PooledSession("bop", retry_methods=("GET", "POST"))
+principal_lookups = SingleFlight()
 
 
 class PrincipalProxy:  # pylint: disable=too-few-public-methods
@@ -153,7 +159,7 @@ class PrincipalProxy:  # pylint: disable=too-few-public-methods
         url,
         org_id=None,
         org_id_filter=False,
-        method=requests.get,
+        method=bop_session.get,
         params=None,
         data=None,
         return_id=False,  # noqa: C901
@@ -262,10 +268,10 @@ class PrincipalProxy:  # pylint: disable=too-few-public-methods
         if input:
             payload = input
             account_principals_path = f"/v3/accounts/{org_id}/usersBy"
-            method = requests.post
+            method = bop_session.post
         else:
             account_principals_path = f"/v3/accounts/{org_id}/users"
-            method = requests.get
+            method = bop_session.get
             payload = None
 
         params = self._create_params(limit, offset, options)
@@ -303,7 +309,7 @@ class PrincipalProxy:  # pylint: disable=too-few-public-methods
                 kwargs["verify"] = self.client_cert_path
 
             LOGGER.info(f"Fetching account-org mapping from BOP for {len(account_ids)} accounts")
-            response = requests.post(url, **kwargs)
+            response = bop_session.post(url, **kwargs)
 
             if response.status_code == status.HTTP_200_OK:
                 mapping = response.json()
@@ -319,6 +325,30 @@ class PrincipalProxy:  # pylint: disable=too-few-public-methods
             bop_request_status_count.labels(method="POST", status=500).inc()
             return None
 
+    def request_principal(self, username, org_id, options={}):
+        """Request a single principal of an account.
+
+        Identical concurrent lookups in the process share one request to BOP, and the response is cached for a
+        short time when PRINCIPAL_LOOKUP_CACHE_ENABLED is set, including the response for an unknown username.
+        """
+        params = self._create_params(options=options)
+        if not settings.PRINCIPAL_LOOKUP_CACHE_ENABLED or params.get("username_only") == "true":
+            return self.request_filtered_principals([username], org_id=org_id, options=options)
+
+        params["return_id"] = bool(options.get("return_id"))
+        params = urlencode(sorted(params.items()))
+        cache = PrincipalLookupCache()
+
+        def lookup():
+            resp = cache.get_lookup(org_id, username, params)
+            if resp is None:
+                resp = self.request_filtered_principals([username], org_id=org_id, options=options)
+                if resp.get("status_code") == status.HTTP_200_OK and "errors" not in resp:
+                    cache.save_lookup(org_id, username, params, resp)
+            return resp
+
+        return principal_lookups.do(cache.key_for(org_id, username, params), lookup)
+
     def request_filtered_principals(self, principals, org_id=None, limit=None, offset=None, options={}):
         """Request specific principals for an account."""
         if org_id is None:
@@ -338,7 +368,7 @@ class PrincipalProxy:  # pylint: disable=too-few-public-methods
             url,
             org_id=org_id,
             org_id_filter=org_id_filter,
-            method=requests.post,
+            method=bop_session.post,
             params=params,
             data=payload,
             return_id=return_id,
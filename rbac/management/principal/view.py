@@ -17,7 +17,10 @@
 
 """View for principal management."""
 
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from django.conf import settings
 from management.authorization.scope_claims import ScopeClaims
 from management.authorization.token_validator import ITSSOTokenValidator
 from management.utils import validate_and_get_key
@@ -222,8 +225,8 @@ class PrincipalView(APIView):
         return resp, usernames_filter
 
     @staticmethod
-    def service_accounts_from_it_service(request, user, query_params, options):
-        """Format Service Account request for IT Service and return prepped result."""
+    def prepare_service_accounts_request(request, user, query_params, options):
+        """Set the service account options and validate the token used to request the service accounts from IT."""
         options["email"] = query_params.get(EMAIL_KEY)
         options["match_criteria"] = validate_and_get_key(
             query_params, MATCH_CRITERIA_KEY, VALID_MATCH_VALUE, required=False
@@ -239,6 +242,12 @@ class PrincipalView(APIView):
             request=request, additional_scopes_to_validate=set[ScopeClaims]([ScopeClaims.SERVICE_ACCOUNTS_CLAIM])
         )
 
+    @staticmethod
+    def service_accounts_from_it_service(request, user, query_params, options, prepared=False):
+        """Format Service Account request for IT Service and return prepped result."""
+        if not prepared:
+            PrincipalView.prepare_service_accounts_request(request, user, query_params, options)
+
         try:
             it_service = ITService()
             service_accounts, sa_count = it_service.get_service_accounts(user=user, options=options)
@@ -260,12 +269,22 @@ class PrincipalView(APIView):
             usernames_filter = f"&usernames={options['usernames']}"
         return {"status_code": status.HTTP_200_OK, "saCount": sa_count, "data": service_accounts}, usernames_filter
 
+    @staticmethod
+    def user_principals_window(limit, offset, sa_count, sa_count_total):
+        """Return the limit and offset of the user based principals that follow the service accounts in a page."""
+        remaining_limit = limit - sa_count
+        if remaining_limit == 0:
+            return 1, 0
+        if offset >= sa_count_total:
+            return limit, offset - sa_count_total
+        return remaining_limit, 0
+
     def get_users_and_service_accounts(self, request, user, query_params, options, limit, offset):
         """
         Get user based and service account based principals and return prepped response.
 
-        First we try to get service account based principals and then user based principals.
-        For the second query we need to calculate new limit and offset.
+        The service account based principals come first and then the user based principals.
+        For the user based principals query we need to calculate new limit and offset.
         for example:
         in db 3 SA + 4 U, limit = 2, offset = 0
         pagination:
@@ -275,31 +294,47 @@ class PrincipalView(APIView):
         page 4 -> 1 U
         (SA = service account based principal, U = user based principal)
         """
-        # Get Service Accounts
-        sa_resp, usernames_filter = self.service_accounts_from_it_service(request, user, query_params, options)
-        if sa_resp.get("status_code") != status.HTTP_200_OK:
-            return sa_resp, ""
-
-        # Calculate new limit and offset for the user based principals query
-        sa_count_total = sa_resp.get("saCount")
-        sa_count = len(sa_resp.get("data", []))
+        self.prepare_service_accounts_request(request, user, query_params, options)
+
+        # The service accounts in the database tell how many IT will return, so the page of user based principals can
+        # be requested from BOP while the service accounts are requested from IT. The estimate is checked once IT
+        # responds, and the users are requested again in the rare case it was wrong. Users that BOP verification
+        # bypass or the "username_only" parameter take from the database are not requested in the background.
+        it_service = ITService()
+        sa_count_estimate = None
+        if not settings.BYPASS_BOP_VERIFICATION and options["username_only"] != "true":
+            sa_count_estimate = it_service.estimate_service_accounts_count(user=user, options=options)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            user_request = None
+            if sa_count_estimate is not None:
+                estimated_window = self.user_principals_window(
+                    limit, offset, min(limit, max(sa_count_estimate - offset, 0)), sa_count_estimate
+                )
+                user_request = executor.submit(
+                    self.users_from_proxy, user, query_params, dict(options), *estimated_window
+                )
 
-        remaining_limit = limit - sa_count
-        if remaining_limit == 0:
-            new_limit = 1
-            new_offset = 0
-        elif remaining_limit > 0:
-            if offset >= sa_count_total:
-                new_limit = limit
-                new_offset = offset - sa_count_total
+            # Get Service Accounts
+            sa_resp, usernames_filter = self.service_accounts_from_it_service(
+                request, user, query_params, options, prepared=True
+            )
+            if sa_resp.get("status_code") != status.HTTP_200_OK:
+                return sa_resp, ""
+
+            # Calculate new limit and offset for the user based principals query
+            sa_count_total = sa_resp.get("saCount")
+            sa_count = len(sa_resp.get("data", []))
+            remaining_limit = limit - sa_count
+            new_limit, new_offset = self.user_principals_window(limit, offset, sa_count, sa_count_total)
+
+            # Get user based principals
+            if user_request is not None and estimated_window == (new_limit, new_offset):
+                user_resp, usernames_filter = user_request.result()
             else:
-                new_limit = remaining_limit
-                new_offset = 0
-
-        # Get user based principals
-        user_resp, usernames_filter = self.users_from_proxy(user, query_params, options, new_limit, new_offset)
-        if user_resp.get("status_code") != status.HTTP_200_OK:
-            return user_resp, ""
+                user_resp, usernames_filter = self.users_from_proxy(user, query_params, options, new_limit, new_offset)
+            if user_resp.get("status_code") != status.HTTP_200_OK:
+                return user_resp, ""
 
         # Calculate the both types principals count
         userCount = 0
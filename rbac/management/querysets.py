@@ -31,6 +31,7 @@ from management.role.model import Access, Role
 from management.utils import (
     APPLICATION_KEY,
     access_for_principal,
+    access_queryset_for_principal,
     filter_queryset_by_tenant,
     get_admin_from_proxy,
     get_principal,
@@ -257,14 +258,16 @@ def get_access_queryset(request: Request) -> QuerySet:
     else:
         is_org_admin = _check_user_username_is_org_admin(request=request, username=username)
 
-    return get_object_principal_queryset(
-        request,
-        PRINCIPAL_SCOPE,
-        Access,
+    if request.method not in permissions.SAFE_METHODS:
+        return Access.objects.none()
+
+    principal = get_principal_from_request(request)
+    return access_queryset_for_principal(
+        principal,
+        request.tenant,
         **{
             APPLICATION_KEY: app,
             "prefetch_lookups_for_ids": "resourceDefinitions",
-            "prefetch_lookups_for_groups": "policies__roles__access",
             "is_org_admin": is_org_admin,
         },
     )
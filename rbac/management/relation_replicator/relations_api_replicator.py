@@ -19,7 +19,9 @@
 
 import json
 import logging
-from typing import Optional
+import threading
+from collections import deque
+from typing import Iterator, Optional
 
 import grpc
 from django.conf import settings
@@ -34,6 +36,7 @@ from management.relation_replicator.relation_replicator import (
     RelationReplicator,
     ReplicationEvent,
 )
+from management.relation_replicator.types import RelationTuple
 from management.utils import create_client_channel_relation
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
@@ -163,14 +166,16 @@ class RelationsApiReplicator(RelationReplicator):
     def delete_relationships(self, relationships, fencing_check=None):
         """Delete relationships using the new filter-based API.
 
-        For each relationship, create a filter that matches it exactly and delete it.
+        For each relationship, create a filter that matches it exactly and delete it. Duplicated relationships
+        are only deleted once, and up to RELATIONS_API_DELETE_CONCURRENCY deletes are in flight at the same time
+        over the shared channel.
 
         Args:
             relationships: List of relationship tuples to delete
             fencing_check: Optional FencingCheck protobuf for distributed locking
 
         Returns:
-            DeleteTuplesResponse from the API (last response if multiple deletes)
+            DeleteTuplesResponse from the API (last acknowledged response if multiple deletes)
 
         Raises:
             grpc.RpcError: If the API call fails (including FAILED_PRECONDITION for invalid fencing token)
@@ -189,46 +194,86 @@ class RelationsApiReplicator(RelationReplicator):
         token = jwt_manager.get_jwt_from_redis()
         metadata = [("authorization", f"Bearer {token}")] if token else []
 
+        # A filter matches a single tuple only when every field is set, so broader filters could delete tuples
+        # that were not requested. Only exact duplicates are merged.
+        requests = {}
+        for relationship in relationships:
+            request = self._delete_request(relationship, fencing_check)
+            requests.setdefault(request.filter.SerializeToString(deterministic=True), (relationship, request))
+
         with create_client_channel_relation(settings.RELATION_API_SERVER) as channel:
             stub = relation_tuples_pb2_grpc.KesselTupleServiceStub(channel)
+            return self._pipeline_deletes(stub, list(requests.values()), metadata, fencing_check)
+
+    @staticmethod
+    def _delete_request(relationship, fencing_check=None):
+        """Build the request deleting exactly the given relationship."""
+        relation_filter = relation_tuples_pb2.RelationTupleFilter(
+            resource_namespace=relationship.resource.type.namespace,
+            resource_type=relationship.resource.type.name,
+            resource_id=relationship.resource.id,
+            relation=relationship.relation,
+            subject_filter=relation_tuples_pb2.SubjectFilter(
+                subject_namespace=relationship.subject.subject.type.namespace,
+                subject_type=relationship.subject.subject.type.name,
+                subject_id=relationship.subject.subject.id,
+                relation=relationship.subject.relation or "",
+            ),
+        )
+
+        # Build request with optional fencing check
+        request_kwargs = {
+            "filter": relation_filter,
+        }
+
+        if fencing_check is not None:
+            request_kwargs["fencing_check"] = fencing_check
+
+        return relation_tuples_pb2.DeleteTuplesRequest(**request_kwargs)
+
+    @staticmethod
+    def _pipeline_deletes(stub, requests, metadata, fencing_check):
+        """Issue the delete requests with a bounded number in flight and return the last acknowledged response."""
+        window = max(1, settings.RELATIONS_API_DELETE_CONCURRENCY)
+        in_flight = deque()
+        # Futures are recorded by the gRPC threads in the order the server acknowledged them.
+        acknowledged = []
+        acknowledged_changed = threading.Condition()
+
+        def on_done(future):
+            with acknowledged_changed:
+                acknowledged.append(future)
+                acknowledged_changed.notify_all()
+
+        def wait_for(relationship, future):
+            return execute_grpc_call(
+                operation_name="delete relationship from the relation API server",
+                grpc_callable=future.result,
+                fencing_check=fencing_check,
+                log_context={"relationship": relationship},
+            )
 
-            # Delete each relationship individually using filters
-            responses = []
-            for relationship in relationships:
-                # Create a filter that matches this specific relationship
-                relation_filter = relation_tuples_pb2.RelationTupleFilter(
-                    resource_namespace=relationship.resource.type.namespace,
-                    resource_type=relationship.resource.type.name,
-                    resource_id=relationship.resource.id,
-                    relation=relationship.relation,
-                    subject_filter=relation_tuples_pb2.SubjectFilter(
-                        subject_namespace=relationship.subject.subject.type.namespace,
-                        subject_type=relationship.subject.subject.type.name,
-                        subject_id=relationship.subject.subject.id,
-                        relation=relationship.subject.relation or "",
-                    ),
-                )
-
-                # Build request with optional fencing check
-                request_kwargs = {
-                    "filter": relation_filter,
-                }
-
-                if fencing_check is not None:
-                    request_kwargs["fencing_check"] = fencing_check
-
-                request = relation_tuples_pb2.DeleteTuplesRequest(**request_kwargs)
-
-                response = execute_grpc_call(
-                    operation_name="delete relationship from the relation API server",
-                    grpc_callable=lambda req=request: stub.DeleteTuples(req, metadata=metadata),
-                    fencing_check=fencing_check,
-                    log_context={"relationship": relationship},
-                )
-                responses.append(response)
-
-            # Return the last response (for consistency token)
-            return responses[-1] if responses else None
+        response = None
+        try:
+            for relationship, request in requests:
+                if len(in_flight) >= window:
+                    response = wait_for(*in_flight.popleft())
+                future = stub.DeleteTuples.future(request, metadata=metadata)
+                future.add_done_callback(on_done)
+                in_flight.append((relationship, future))
+            while in_flight:
+                response = wait_for(*in_flight.popleft())
+        except grpc.RpcError:
+            for _, future in in_flight:
+                future.cancel()
+            raise
+
+        # Done callbacks may still be running right after the last result is available.
+        with acknowledged_changed:
+            if acknowledged_changed.wait_for(lambda: len(acknowledged) == len(requests), timeout=1):
+                response = acknowledged[-1].result()
+        # Return the last acknowledged response (for consistency token)
+        return response
 
     def read_tuples(
         self,
@@ -261,6 +306,88 @@ class RelationsApiReplicator(RelationReplicator):
         Raises:
             grpc.RpcError: If the API call fails
         """
+        return [
+            json_format.MessageToDict(r)
+            for r in self._stream_tuples(
+                resource_type,
+                resource_id,
+                relation,
+                subject_type,
+                subject_id,
+                subject_relation,
+                resource_namespace,
+                subject_namespace,
+                pagination_limit,
+                continuation_token,
+            )
+        ]
+
+    def iter_tuples(
+        self,
+        resource_type: str,
+        resource_id: str = "",
+        relation: str = "",
+        subject_type: str = "",
+        subject_id: str = "",
+        subject_relation: Optional[str] = None,
+        resource_namespace: str = "rbac",
+        subject_namespace: str = "rbac",
+        page_size: int = 1000,
+    ) -> Iterator[RelationTuple]:
+        """Stream tuples from the Relations API, following continuation tokens across pages.
+
+        Tuples are decoded straight from the protobuf messages and yielded as they arrive, so callers never hold
+        more than the tuple they are processing. The filters are the same as for read_tuples.
+
+        Raises:
+            grpc.RpcError: If the API call fails
+        """
+        continuation_token = None
+        while True:
+            last_token = None
+            for response in self._stream_tuples(
+                resource_type,
+                resource_id,
+                relation,
+                subject_type,
+                subject_id,
+                subject_relation,
+                resource_namespace,
+                subject_namespace,
+                page_size,
+                continuation_token,
+            ):
+                last_token = response.pagination.continuation_token
+                yield RelationTuple.from_message(response.tuple)
+
+            if last_token is None:
+                return
+            if not last_token:
+                logger.warning(
+                    "Unexpectedly missing continuation token from Kessel for %s:%s", resource_type, resource_id
+                )
+                return
+            if last_token == continuation_token:
+                logger.warning(
+                    "Kessel returned the same continuation token for %s:%s again", resource_type, resource_id
+                )
+                return
+            continuation_token = last_token
+
+    def _stream_tuples(
+        self,
+        resource_type: str,
+        resource_id: str,
+        relation: str,
+        subject_type: str,
+        subject_id: str,
+        subject_relation: Optional[str],
+        resource_namespace: str,
+        subject_namespace: str,
+        pagination_limit: Optional[int],
+        continuation_token: Optional[str],
+    ) -> Iterator[relation_tuples_pb2.ReadTuplesResponse]:
+        """Yield the ReadTuples responses of one request as they are streamed, keeping the channel open meanwhile."""
         if (pagination_limit is None) and (continuation_token is not None):
             raise TypeError("A pagination limit must be provided if a continuation token is.")
 
@@ -302,11 +429,8 @@ class RelationsApiReplicator(RelationReplicator):
                 },
             )
 
-            result = []
             if responses:
-                for r in responses:
-                    result.append(json_format.MessageToDict(r))
-            return result
+                yield from responses
 
 
 class GRPCError:
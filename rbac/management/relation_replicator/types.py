@@ -17,11 +17,18 @@
 """Shared domain types for the management module."""
 
 import dataclasses
+import functools
 import re
-from typing import Any, ClassVar, Optional
+from typing import Any, Iterable, Optional
 
 from kessel.relations.v1beta1 import common_pb2
 
+_TYPE_REGEX = re.compile(r"^[A-Za-z0-9_]+$")
+_ID_REGEX = re.compile(r"^(([a-zA-Z0-9/_|\-=+]{1,})|\*)$")
+
+# Upper bound on the number of distinct ids whose validation is remembered.
+ID_VALIDATION_CACHE_SIZE = 65536
+
 
 def _validate_required_str(field: str, value: object):
     """Validate that a field is a non-empty string."""
@@ -45,48 +52,78 @@ def _validate_optional_str(field: str, value: object):
 
 def _validate_pattern(field: str, value: str, pattern: re.Pattern, description: str):
     """Validate that a string matches a regex pattern."""
-    if not re.fullmatch(pattern, value):
+    if not pattern.fullmatch(value):
         raise ValueError(f"Expected {field} to be composed of {description}, but got: {value!r}")
 
 
-@dataclasses.dataclass(frozen=True)
+@functools.lru_cache(maxsize=ID_VALIDATION_CACHE_SIZE)
+def _validate_id(value: str):
+    """Validate a resource or subject id. Only successful validations are remembered."""
+    _validate_required_str("id", value)
+    _validate_pattern(
+        "id",
+        value,
+        _ID_REGEX,
+        "alphanumeric characters, underscores, hyphens, pipes, "
+        "equals signs, plus signs, and forward slashes, or exactly '*'",
+    )
+
+
+def _unchecked(cls, **values):
+    """Build a frozen instance from already validated values, bypassing __init__ and __post_init__."""
+    instance = object.__new__(cls)
+    for name, value in values.items():
+        object.__setattr__(instance, name, value)
+    return instance
+
+
+_object_types: dict[tuple[str, str], "ObjectType"] = {}
+
+
+@dataclasses.dataclass(frozen=True, slots=True, init=False, eq=False)
 class ObjectType:
-    """Resource or subject type (namespace + name)."""
+    """
+    Resource or subject type (namespace + name).
+
+    Instances are interned: constructing the same type twice returns the same object, so the type is only validated
+    once per process, and equality and hashing are by identity.
+    """
 
     namespace: str
     name: str
 
-    _type_regex: ClassVar[re.Pattern] = re.compile(r"^[A-Za-z0-9_]+$")
+    def __new__(cls, namespace: str, name: str):
+        """Return the shared instance for the type, validating it the first time it is seen."""
+        try:
+            return _object_types[(namespace, name)]
+        except (KeyError, TypeError):
+            pass
 
-    def __post_init__(self):
-        """Validate namespace and name."""
-        _validate_required_str("namespace", self.namespace)
-        _validate_required_str("name", self.name)
-        _validate_pattern("name", self.name, self._type_regex, "alphanumeric characters and underscores")
+        _validate_required_str("namespace", namespace)
+        _validate_required_str("name", name)
+        _validate_pattern("name", name, _TYPE_REGEX, "alphanumeric characters and underscores")
+
+        instance = _unchecked(cls, namespace=namespace, name=name)
+        return _object_types.setdefault((namespace, name), instance)
+
+    def __reduce__(self):
+        """Unpickle to the shared instance of the type."""
+        return ObjectType, (self.namespace, self.name)
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class ObjectReference:
     """Reference to a resource or subject (type + id)."""
 
     type: ObjectType
     id: str
 
-    _id_regex: ClassVar[re.Pattern] = re.compile(r"^(([a-zA-Z0-9/_|\-=+]{1,})|\*)$")
-
     def __post_init__(self):
         """Validate id."""
-        _validate_required_str("id", self.id)
-        _validate_pattern(
-            "id",
-            self.id,
-            self._id_regex,
-            "alphanumeric characters, underscores, hyphens, pipes, "
-            "equals signs, plus signs, and forward slashes, or exactly '*'",
-        )
+        _validate_id(self.id)
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class SubjectReference:
     """Reference to a subject with optional relation."""
 
@@ -98,7 +135,7 @@ class SubjectReference:
         _validate_optional_str("relation", self.relation)
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class RelationTuple:
     """
     Domain representation of a relation tuple.
@@ -109,6 +146,7 @@ class RelationTuple:
 
     Use as_message() to convert to the protobuf Relationship type when needed.
     Use to_dict() to serialize to JSON matching the protobuf JSON format.
+    Use bulk() to create many tuples of the same shape.
     """
 
     resource: ObjectReference
@@ -123,6 +161,43 @@ class RelationTuple:
                 "resource.id cannot be '*' (asterisk is only allowed for subjects)." f"\nFull relationship: {self!r}"
             )
 
+    @classmethod
+    def bulk(
+        cls,
+        resource_type: ObjectType,
+        relation: str,
+        subject_type: ObjectType,
+        ids: Iterable[tuple[str, str]],
+        subject_relation: Optional[str] = None,
+    ) -> list["RelationTuple"]:
+        """
+        Create the tuples relating each (resource_id, subject_id) pair with the same types and relations.
+
+        The relations are validated once for the whole batch, and each distinct id once, since the references are
+        shared between the tuples of the batch.
+        """
+        if not isinstance(resource_type, ObjectType) or not isinstance(subject_type, ObjectType):
+            raise TypeError("resource_type and subject_type must be ObjectTypes.")
+        _validate_required_str("relation", relation)
+        _validate_optional_str("relation", subject_relation)
+
+        resources: dict[str, ObjectReference] = {}
+        subjects: dict[str, SubjectReference] = {}
+        tuples = []
+        for resource_id, subject_id in ids:
+            resource = resources.get(resource_id)
+            if resource is None:
+                if resource_id == "*":
+                    raise ValueError("resource.id cannot be '*' (asterisk is only allowed for subjects).")
+                resource = resources[resource_id] = ObjectReference(type=resource_type, id=resource_id)
+            subject = subjects.get(subject_id)
+            if subject is None:
+                subject = subjects[subject_id] = SubjectReference(
+                    subject=ObjectReference(type=subject_type, id=subject_id), relation=subject_relation
+                )
+            tuples.append(_unchecked(cls, resource=resource, relation=relation, subject=subject))
+        return tuples
+
     @classmethod
     def from_message_dict(cls, relationship: dict) -> "RelationTuple":
         """Create a RelationTuple from a Relationship message dict."""
@@ -26,7 +26,7 @@ from django.db import models
 from django.db.models import signals
 from django.utils import timezone
 from internal.integration import sync_handlers
-from management.cache import AccessCache, skip_purging_cache_for_public_tenant
+from management.cache import policy_invalidation_queue, skip_purging_cache_for_public_tenant
 from management.models import Permission, Principal
 from management.rbac_fields import AutoDateTimeField
 from management.relation_replicator.types import RelationTuple
@@ -312,10 +312,11 @@ def role_related_obj_change_cache_handler(sender=None, instance=None, using=None
         "invalidating associated user cache keys",
         instance,
     )
-    cache = AccessCache(instance.tenant.org_id)
     if instance.role:
-        for principal in Principal.objects.filter(group__policies__roles__pk=instance.role.pk):
-            cache.delete_policy(principal.uuid)
+        principal_uuids = Principal.objects.filter(group__policies__roles__pk=instance.role.pk).values_list(
+            "uuid", flat=True
+        )
+        policy_invalidation_queue.delete_policies(instance.tenant.org_id, principal_uuids)
 
 
 def role_related_obj_change_sync_handler(sender=None, instance=None, using=None, **kwargs):
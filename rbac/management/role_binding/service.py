@@ -17,14 +17,16 @@
 """Service layer for role binding management."""
 
 import logging
+import uuid
 from dataclasses import dataclass
 from typing import Optional, Sequence
 
 from django.conf import settings
-from django.db import transaction
+from django.db import connection, transaction
 from django.db.models import CharField, Count, Max, Min, Prefetch, Q, QuerySet, TextChoices
 from django.db.models.functions import Cast
 from management.atomic_transactions import atomic
+from management.cache import KesselLookupCache
 from management.exceptions import InvalidFieldError, NotFoundError, RequiredFieldError
 from management.group.model import Group
 from management.group.platform import DefaultGroupNotAvailableError, GlobalPolicyIdService
@@ -47,9 +49,16 @@ from management.subject import Subject, SubjectType
 from management.tenant_mapping.model import DefaultAccessType, TenantMapping
 from management.tenant_mapping.v2_activation import ensure_v2_write_activated
 from management.workspace.model import Workspace
+from prometheus_client import Counter
 
 from api.models import Tenant
 
+inherited_bindings_shadow_comparisons = Counter(
+    "role_binding_inherited_bindings_shadow_comparisons_total",
+    "Comparisons of the inherited role bindings resolved by the Relations API and by the database",
+    ["result"],
+)
+
 
 class ExcludeSources(TextChoices):
     """Enum for exclude_sources query parameter values."""
@@ -59,6 +68,14 @@ class ExcludeSources(TextChoices):
     NONE = "none", "Show all bindings"
 
 
+class InheritanceResolver(TextChoices):
+    """Enum for the ways to resolve the role bindings a resource inherits."""
+
+    RELATIONS = "relations", "Look up the bindings with the Relations API"
+    DATABASE = "database", "Resolve the bindings from the workspace hierarchy in the database"
+    SHADOW = "shadow", "Look up the bindings with the Relations API and compare them with the database"
+
+
 @dataclass
 class UpdateRoleBindingResult:
     """Result of updating role bindings for a subject on a resource."""
@@ -124,7 +141,8 @@ class RoleBindingService:
         include_inherited = exclude_sources in (ExcludeSources.DIRECT, ExcludeSources.NONE)
 
         if include_inherited:
-            binding_uuids = self._lookup_binding_uuids_via_relations(resource_type, resource_id)
+            resolver = params.get("inheritance_resolver") or settings.ROLE_BINDING_INHERITANCE_RESOLVER
+            binding_uuids = self._lookup_inherited_binding_uuids(resource_type, resource_id, resolver)
 
         if subject_type == SubjectType.USER:
             # Build user queryset
@@ -547,9 +565,91 @@ class RoleBindingService:
         """Use the Relations API to resolve binding UUIDs that affect the given resource.
 
         Uses the recursive 'binding' relation to find role_bindings on this resource
-        and any parent resources in the hierarchy.
+        and any parent resources in the hierarchy. Results are cached until the tenant's relations change.
+        """
+        return KesselLookupCache().get_or_lookup(
+            self.tenant,
+            "binding_subjects",
+            f"{resource_type}:{resource_id}",
+            lambda: lookup_binding_subjects(resource_type, resource_id),
+        )
+
+    def _lookup_binding_uuids_in_database(self, resource_type: str, resource_id: str) -> list[str]:
+        """Resolve binding UUIDs that affect the given resource from the tenant's bindings in the database.
+
+        A workspace is affected by the bindings on itself, on its ancestor workspaces and on the tenant, which
+        are all collected with a single recursive query. Any other resource is only affected by its own bindings.
+        """
+        if resource_type != "workspace":
+            return [
+                str(binding_uuid)
+                for binding_uuid in RoleBinding.objects.for_resource(
+                    resource_type, resource_id, self.tenant
+                ).values_list("uuid", flat=True)
+            ]
+
+        try:
+            workspace_id = uuid.UUID(resource_id)
+        except ValueError:
+            return []
+
+        sql = """
+            WITH RECURSIVE ancestors AS (
+                SELECT id, parent_id
+                FROM management_workspace
+                WHERE id = %s AND tenant_id = %s
+                UNION
+                SELECT w.id, w.parent_id
+                FROM management_workspace w
+                JOIN ancestors a ON w.id = a.parent_id
+            ),
+            resources AS (
+                SELECT 'workspace' AS resource_type, id::text AS resource_id FROM ancestors
+                UNION ALL
+                SELECT 'tenant', %s WHERE EXISTS (SELECT 1 FROM ancestors)
+            )
+            SELECT b.uuid
+            FROM management_rolebinding b
+            JOIN resources r ON b.resource_type = r.resource_type AND b.resource_id = r.resource_id
+            WHERE b.tenant_id = %s
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [workspace_id, self.tenant.id, self.tenant.tenant_resource_id(), self.tenant.id])
+            return [str(row[0]) for row in cursor.fetchall()]
+
+    def _lookup_inherited_binding_uuids(
+        self, resource_type: str, resource_id: str, resolver: str
+    ) -> Optional[list[str]]:
+        """Resolve binding UUIDs that affect the given resource with the given resolver.
+
+        In shadow mode the Relations API result is returned, and it is compared with the database result so that
+        the two can be checked against each other before switching to the database.
         """
-        return lookup_binding_subjects(resource_type, resource_id)
+        if resolver == InheritanceResolver.DATABASE:
+            return self._lookup_binding_uuids_in_database(resource_type, resource_id)
+
+        binding_uuids = self._lookup_binding_uuids_via_relations(resource_type, resource_id)
+        if resolver != InheritanceResolver.SHADOW:
+            return binding_uuids
+
+        if binding_uuids is None:
+            inherited_bindings_shadow_comparisons.labels(result="relations_unavailable").inc()
+            return binding_uuids
+
+        database_uuids = set(self._lookup_binding_uuids_in_database(resource_type, resource_id))
+        relations_uuids = set(binding_uuids)
+        if database_uuids == relations_uuids:
+            inherited_bindings_shadow_comparisons.labels(result="match").inc()
+        else:
+            inherited_bindings_shadow_comparisons.labels(result="mismatch").inc()
+            logger.warning(
+                "Inherited role bindings of %s %s differ: only in Relations API %s, only in database %s",
+                resource_type,
+                resource_id,
+                sorted(relations_uuids - database_uuids),
+                sorted(database_uuids - relations_uuids),
+            )
+        return binding_uuids
 
     def _ensure_default_bindings_exist(self) -> None:
         """Lazily create default role bindings if they don't exist.
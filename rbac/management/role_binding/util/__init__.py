@@ -16,6 +16,10 @@
 #
 """Utility modules for role binding management."""
 
-from management.role_binding.util.relations_api_client import lookup_binding_subjects, parse_resource_type
+from management.role_binding.util.relations_api_client import (
+    iter_subject_ids,
+    lookup_binding_subjects,
+    parse_resource_type,
+)
 
-__all__ = ["lookup_binding_subjects", "parse_resource_type"]
+__all__ = ["iter_subject_ids", "lookup_binding_subjects", "parse_resource_type"]
@@ -17,10 +17,9 @@
 """Client for the Kessel Relations API for role binding lookups."""
 
 import logging
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
 from django.conf import settings
-from google.protobuf import json_format
 from internal.jwt_utils import JWTManager, JWTProvider
 from kessel.relations.v1beta1 import common_pb2, lookup_pb2, lookup_pb2_grpc
 from management.cache import JWTCache
@@ -50,6 +49,14 @@ def parse_resource_type(resource_type: str) -> tuple[str, str]:
     return ("rbac", resource_type)
 
 
+def iter_subject_ids(responses: Iterable[lookup_pb2.LookupSubjectsResponse]) -> Iterator[str]:
+    """Yield the subject ID of each streamed LookupSubjects response, skipping responses without one."""
+    for response in responses:
+        subject_id = response.subject.subject.id
+        if subject_id:
+            yield subject_id
+
+
 def lookup_binding_subjects(
     resource_type: str,
     resource_id: str,
@@ -109,15 +116,7 @@ def lookup_binding_subjects(
             logger.debug("LookupSubjects request: %s", request)
 
             responses = stub.LookupSubjects(request, metadata=metadata)
-            for idx, response in enumerate(responses, start=1):
-                payload = json_format.MessageToDict(response)
-                logger.debug("LookupSubjects response #%d: %s", idx, payload)
-
-                # Handle different response formats
-                subject = payload.get("subject", {})
-                subject_id = subject.get("id") or subject.get("subject", {}).get("id")
-                if subject_id:
-                    subject_ids.add(subject_id)
+            subject_ids.update(iter_subject_ids(responses))
 
         result = list(subject_ids)
         logger.info(
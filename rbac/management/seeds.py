@@ -19,7 +19,7 @@
 import logging
 
 from django.db import connections
-from management.cache import AccessCache
+from management.cache import AccessCache, KesselLookupCache
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
@@ -57,6 +57,8 @@ def _run_seeds(seed_type, **kwargs):
         seed_functions[seed_type](**kwargs)
         if seed_type in ("permission", "role"):
             permission_scope_cache.invalidate()
+        # Seeded objects belong to the public tenant and are shared by all tenants
+        KesselLookupCache().bump_generation()
         logger.info(f"Finished seeding {seed_type}.")
     except Exception as exc:
         logger.error(f"Error encountered during {seed_type} seeding {exc}.")
@@ -27,6 +27,7 @@ from internal.utils import (
     replicate_missing_binding_tuples,
 )
 from management.health.healthcheck import redis_health
+from management.notifications.notification_handlers import fan_out_notification
 from management.principal.cleaner import (
     clean_tenants_principals,
     process_principal_events_from_umb,
@@ -35,6 +36,12 @@ from migration_tool.migrate import migrate_data
 from migration_tool.migrate_binding_scope import migrate_all_role_bindings
 
 
+@shared_task
+def notify_all_in_worker(event_type, payload):
+    """Celery task to send a notification to all tenants."""
+    return fan_out_notification(event_type, payload)
+
+
 @shared_task
 def principal_cleanup():
     """Celery task to clean up principals no longer existing."""
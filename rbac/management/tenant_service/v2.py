@@ -339,8 +339,8 @@ class V2TenantBootstrapService:
 
         bootstrapped_mapping = {bootstrapped.tenant.org_id: bootstrapped for bootstrapped in bootstrapped_list}
 
-        tuples_to_add = []
-        tuples_to_remove = []
+        memberships_to_add = []
+        memberships_to_remove = []
         principals_to_update = []
 
         # Fetch existing principals
@@ -375,9 +375,14 @@ class V2TenantBootstrapService:
             if mapping is None:
                 raise ValueError(f"Expected TenantMapping but got None. org_id: {bootstrapped.tenant.org_id}")
 
-            sub_tuples_to_add, sub_tuples_to_remove = self._default_group_tuple_edits(user, mapping)
-            tuples_to_add.extend(sub_tuples_to_add)
-            tuples_to_remove.extend(sub_tuples_to_remove)
+            user_memberships_to_add, user_memberships_to_remove = self._default_group_membership_edits(user, mapping)
+            memberships_to_add.extend(user_memberships_to_add)
+            memberships_to_remove.extend(user_memberships_to_remove)
+
+        # Tuples are built for the whole batch at once, so each group and user is only validated once.
+        tuples_to_add = Group.relationships_to_user_ids_for_groups(memberships_to_add)
+        tuples_to_remove = Group.relationships_to_user_ids_for_groups(memberships_to_remove)
+
         # Bulk update existing principals
         if principals_to_update:
             logger.info(
@@ -745,25 +750,31 @@ class V2TenantBootstrapService:
 
     def _default_group_tuple_edits(self, user: User, mapping) -> tuple[list[RelationTuple], list[RelationTuple]]:
         """Get the tuples to add and remove for a user."""
-        tuples_to_add = []
-        tuples_to_remove = []
+        memberships_to_add, memberships_to_remove = self._default_group_membership_edits(user, mapping)
+        return (
+            Group.relationships_to_user_ids_for_groups(memberships_to_add),
+            Group.relationships_to_user_ids_for_groups(memberships_to_remove),
+        )
+
+    def _default_group_membership_edits(
+        self, user: User, mapping
+    ) -> tuple[list[tuple[str, str]], list[tuple[str, str]]]:
+        """Get the (group_uuid, user_id) default group memberships to add and remove for a user."""
+        memberships_to_add = []
+        memberships_to_remove = []
         user_id = self._get_user_id(user)
 
-        tuples_to_add.append(Group.relationship_to_user_id_for_group(str(mapping.default_group_uuid), user_id))
+        memberships_to_add.append((str(mapping.default_group_uuid), user_id))
 
         # Add user to admin group if admin
         if user.admin:
-            tuples_to_add.append(
-                Group.relationship_to_user_id_for_group(str(mapping.default_admin_group_uuid), user_id)
-            )
+            memberships_to_add.append((str(mapping.default_admin_group_uuid), user_id))
         else:
             # If not admin, ensure they are not in the admin group
             # (we don't know what the previous state was)
-            tuples_to_remove.append(
-                Group.relationship_to_user_id_for_group(str(mapping.default_admin_group_uuid), user_id)
-            )
+            memberships_to_remove.append((str(mapping.default_admin_group_uuid), user_id))
 
-        return tuples_to_add, tuples_to_remove
+        return memberships_to_add, memberships_to_remove
 
     def _built_in_hierarchy_tuples(self, default_workspace_id, root_workspace_id, org_id) -> List[RelationTuple]:
         """Create the tuples used to bootstrap the hierarchy of default->root->tenant->platform."""
@@ -19,15 +19,18 @@
 import logging
 import os
 import re
+import threading
 import uuid
 from contextlib import contextmanager
 from dataclasses import dataclass, field
+from functools import partial
 from typing import ClassVar, Optional, TypedDict
 from uuid import UUID
 
 import grpc
 from django.conf import settings
 from django.core.exceptions import PermissionDenied
+from django.db.models import Exists, Q, QuerySet
 from django.utils.translation import gettext as _
 from kessel.auth import OAuth2ClientCredentials
 from kessel.grpc import oauth2_call_credentials
@@ -39,6 +42,7 @@ from management.models import Access, Group, Policy, Principal, Role
 from management.permissions.principal_access import PrincipalAccessPermission
 from management.principal.it_service import ITService
 from management.principal.proxy import PrincipalProxy
+from prometheus_client import Counter, Gauge
 from rest_framework import serializers
 from rest_framework.fields import UUIDField
 from rest_framework.request import Request
@@ -66,55 +70,136 @@ inventory_auth_credentials = OAuth2ClientCredentials(
 call_credentials = oauth2_call_credentials(inventory_auth_credentials)
 
 
+grpc_channel_state = Gauge(
+    "rbac_grpc_channel_state",
+    "Connectivity state of the pooled gRPC channels: 1 for the current state, 0 otherwise",
+    ["target", "state"],
+)
+grpc_channel_created_total = Counter(
+    "rbac_grpc_channel_created_total", "Total amount of gRPC channels opened", ["target"]
+)
+
+
+def _use_insecure_channel():
+    """Whether to skip TLS, for local dev or Clowder (avoids ssl error)."""
+    return settings.DEVELOPMENT or os.getenv("CLOWDER_ENABLED", "false").lower() == "true"
+
+
+class GrpcChannelRegistry:
+    """Process-wide registry of long-lived gRPC channels, one per (kind, address).
+
+    gRPC channels multiplex concurrent calls over a single HTTP/2 connection and reconnect on their own, so
+    sharing them turns the TCP+TLS handshake into a one-time cost. Channels do not survive a fork, hence the
+    registry is emptied in every new process (e.g. each gunicorn worker).
+    """
+
+    def __init__(self):
+        """Init the registry."""
+        self._lock = threading.Lock()
+        self._channels = {}
+        self._pid = os.getpid()
+
+    def _channel_options(self):
+        return [
+            ("grpc.keepalive_time_ms", settings.GRPC_KEEPALIVE_TIME_MS),
+            ("grpc.keepalive_timeout_ms", settings.GRPC_KEEPALIVE_TIMEOUT_MS),
+            ("grpc.keepalive_permit_without_calls", 1),
+            ("grpc.http2.max_pings_without_data", 0),
+        ]
+
+    def get(self, kind, addr, credentials_factory=None):
+        """Return the channel for the address, opening it on first use."""
+        if self._pid != os.getpid():
+            self.reset()
+        key = (kind, addr)
+        channel = self._channels.get(key)
+        if channel is not None:
+            return channel
+        with self._lock:
+            channel = self._channels.get(key)
+            if channel is None:
+                if credentials_factory is None:
+                    channel = grpc.insecure_channel(addr, options=self._channel_options())
+                else:
+                    channel = grpc.secure_channel(addr, credentials_factory(), options=self._channel_options())
+                channel.subscribe(partial(self._record_state, kind), try_to_connect=False)
+                grpc_channel_created_total.labels(target=kind).inc()
+                self._channels[key] = channel
+        return channel
+
+    def discard(self, kind, addr, channel):
+        """Forget a channel, so that the next call opens a new one.
+
+        The channel is not closed, as that would cancel the calls other threads still make on it: it is closed once
+        the last of them drops it.
+        """
+        with self._lock:
+            if self._channels.get((kind, addr)) is channel:
+                del self._channels[(kind, addr)]
+            else:
+                return
+        logger.warning(f"Discarding the gRPC channel to {addr} ({kind}) after an error.")
+
+    def reset(self):
+        """Forget every channel, without closing the ones inherited from a parent process."""
+        with self._lock:
+            self._channels = {}
+            self._pid = os.getpid()
+
+    @staticmethod
+    def _record_state(kind, connectivity):
+        for state in grpc.ChannelConnectivity:
+            grpc_channel_state.labels(target=kind, state=state.name.lower()).set(1 if state == connectivity else 0)
+
+
+GRPC_CHANNELS = GrpcChannelRegistry()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=GRPC_CHANNELS.reset)
+
+
 @contextmanager
+def _pooled_channel(kind, addr, credentials_factory):
+    """Yield the shared channel, discarding it if the server turned out to be unavailable."""
+    channel = GRPC_CHANNELS.get(kind, addr, credentials_factory)
+    try:
+        yield channel
+    except grpc.RpcError as e:
+        code = getattr(e, "code", None)
+        if callable(code) and code() == grpc.StatusCode.UNAVAILABLE:
+            GRPC_CHANNELS.discard(kind, addr, channel)
+        raise
+
+
+def _relation_credentials():
+    return grpc.ssl_channel_credentials()
+
+
+def _inventory_credentials():
+    return grpc.composite_channel_credentials(grpc.ssl_channel_credentials(), call_credentials)
+
+
 def create_client_channel(addr):
-    """Create secure channel for grpc requests for relations api.
+    """Get the shared channel for grpc requests for relations api.
 
     Uses insecure channel in development/Clowder environments.
     Uses TLS in production environments.
     """
-    if settings.DEVELOPMENT or os.getenv("CLOWDER_ENABLED", "false").lower() == "true":
-        # Flag for local dev or Clowder (avoids ssl error)
-        channel = grpc.insecure_channel(addr)
-        yield channel
-    else:
-        # Use TLS for secure channel in production
-        ssl_credentials = grpc.ssl_channel_credentials()
-        secure_channel = grpc.secure_channel(addr, ssl_credentials)
-        yield secure_channel
+    return create_client_channel_relation(addr)
 
 
-@contextmanager
 def create_client_channel_inventory(addr):
-    """Create secure channel for grpc requests for inventory api."""
-    if settings.DEVELOPMENT or os.getenv("CLOWDER_ENABLED", "false").lower() == "true":
-        channel = grpc.insecure_channel(addr)
-        yield channel
-    else:
-        # Combine with TLS for secure channel
-        ssl_credentials = grpc.ssl_channel_credentials()
-        channel_credentials = grpc.composite_channel_credentials(ssl_credentials, call_credentials)
-        secure_channel = grpc.secure_channel(addr, channel_credentials)
-        yield secure_channel
+    """Get the shared channel for grpc requests for inventory api."""
+    return _pooled_channel("inventory", addr, None if _use_insecure_channel() else _inventory_credentials)
 
 
-@contextmanager
 def create_client_channel_relation(addr):
-    """Create secure channel for grpc requests for relations api.
+    """Get the shared channel for grpc requests for relations api.
 
     Uses insecure channel in development/Clowder environments.
     Uses TLS in production environments.
     Authentication is handled via JWT tokens passed in gRPC metadata.
     """
-    if settings.DEVELOPMENT or os.getenv("CLOWDER_ENABLED", "false").lower() == "true":
-        # Flag for local dev or Clowder (avoids ssl error)
-        channel = grpc.insecure_channel(addr)
-        yield channel
-    else:
-        # Use TLS for secure channel in production
-        ssl_credentials = grpc.ssl_channel_credentials()
-        secure_channel = grpc.secure_channel(addr, ssl_credentials)
-        yield secure_channel
+    return _pooled_channel("relations", addr, None if _use_insecure_channel() else _relation_credentials)
 
 
 def validate_psk(psk, client_id):
@@ -352,7 +437,7 @@ def verify_principal_with_proxy(username, request, verify_principal=True):
     if verify_principal:
         org_id = request.user.org_id
         proxy = PrincipalProxy()
-        resp = proxy.request_filtered_principals([username], org_id=org_id, options=request.query_params)
+        resp = proxy.request_principal(username, org_id=org_id, options=request.query_params)
 
         if isinstance(resp, dict) and "errors" in resp:
             raise Exception("Dependency error: request to get users from dependent service failed.")
@@ -442,6 +527,44 @@ def access_for_principal(principal, tenant, **kwargs):
     return access
 
 
+def _default_group_filter(default_set: QuerySet, tenant) -> Q:
+    """Match the tenant's own default group, or the public one when the tenant has not customized it."""
+    tenant_default_set = default_set.filter(tenant=tenant)
+    return Q(id__in=tenant_default_set.values("id")) | (
+        Q(id__in=default_set.filter(system=True, tenant__tenant_name=Tenant.PUBLIC_TENANT_NAME).values("id"))
+        & ~Exists(tenant_default_set)
+    )
+
+
+def access_queryset_for_principal(principal: Principal, tenant, **kwargs) -> QuerySet:
+    """Resolve all access of a principal for an application(s) in a single query.
+
+    Same semantics as access_for_principal, but the principal -> group -> policy -> role -> access walk is done by
+    the database through subqueries instead of materializing every step in Python.
+    """
+    if principal.cross_account:
+        role_ids = roles_for_cross_account_principal(principal).values("id")
+    else:
+        group_filter = Q(id__in=principal.group.values("id"))
+        # Only user principals get permissions from the default groups, see groups_for_principal.
+        if principal.type == "user":
+            group_filter |= _default_group_filter(Group.platform_default_set(), tenant)
+            if kwargs.get("is_org_admin"):
+                group_filter |= _default_group_filter(Group.admin_default_set(), tenant)
+        group_ids = Group.objects.filter(group_filter).values("id")
+        role_ids = Role.objects.filter(policies__group__in=group_ids).values("id")
+
+    access = Access.objects.filter(role__in=role_ids)
+    application = kwargs.get(APPLICATION_KEY)
+    if application:
+        access = access.filter(permission__application__in=application.split(","))
+
+    prefetch_lookups = kwargs.get("prefetch_lookups_for_ids")
+    if prefetch_lookups:
+        access = access.prefetch_related(prefetch_lookups)
+    return access.order_by("id")
+
+
 def queryset_by_id(objects, clazz, **kwargs):
     """Return a queryset of from the class ordered by id."""
     wanted_ids = [obj.id for obj in objects]
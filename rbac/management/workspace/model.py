@@ -18,11 +18,12 @@
 
 import uuid_utils.compat as uuid
 from django.core.exceptions import ValidationError
-from django.db import connection, models
-from django.db.models import Q, UniqueConstraint
+from django.db import connection, models, transaction
+from django.db.models import Q, UniqueConstraint, signals
 from django.db.models.expressions import RawSQL
 from django.db.models.functions import Upper
 from django.utils import timezone
+from management.cache import WorkspaceParentMapCache
 from management.managers import WorkspaceManager
 from management.rbac_fields import AutoDateTimeField
 from rest_framework import serializers
@@ -148,3 +149,13 @@ class Workspace(TenantAwareModel):
             SELECT id FROM descendants
         """
         return Workspace.objects.filter(id__in=RawSQL(sql, [self.id]))
+
+
+def workspace_parent_map_cache_handler(sender=None, instance=None, using=None, **kwargs):
+    """Signal handler dropping the tenant's cached workspace parent map once a workspace change is committed."""
+    tenant_id = instance.tenant_id
+    transaction.on_commit(lambda: WorkspaceParentMapCache().delete_parent_map(tenant_id), using=using)
+
+
+signals.post_save.connect(workspace_parent_map_cache_handler, sender=Workspace)
+signals.post_delete.connect(workspace_parent_map_cache_handler, sender=Workspace)
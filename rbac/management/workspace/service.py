@@ -17,10 +17,13 @@
 """Service for workspace management."""
 
 import logging
+import os
 import select
+import threading
 import time
 import uuid
-from collections import deque
+from collections import OrderedDict
+from concurrent.futures import Future
 from itertools import groupby
 
 from django.conf import settings
@@ -79,7 +82,104 @@ def _record_ryw_metrics(duration: float, result: str) -> None:
 
 
 LISTEN_SQL = sql.SQL("LISTEN {};").format(sql.Identifier(READ_YOUR_WRITES_CHANNEL))
-UNLISTEN_SQL = sql.SQL("UNLISTEN {};").format(sql.Identifier(READ_YOUR_WRITES_CHANNEL))
+
+
+class ReadYourWritesDispatcher:
+    """Deliver read-your-writes NOTIFYs to waiting requests from a single LISTEN connection per process."""
+
+    # Payloads remembered so a NOTIFY that beats the waiter's registration is not lost
+    RECENT_MAX_SIZE = 1024
+
+    def __init__(self):
+        """Init the dispatcher."""
+        self._lock = threading.Lock()
+        self._pid = None
+        self._waiters = {}
+        self._recent = OrderedDict()
+
+    def ensure_started(self):
+        """Start the listener thread once per process, including after a fork."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            # Waiters inherited from the parent process can never be resolved here.
+            self._waiters = {}
+            self._recent.clear()
+            threading.Thread(target=self._listen, name="rbac-ryw-listener", daemon=True).start()
+
+    def register(self, workspace_id) -> Future:
+        """Return a future resolved when the NOTIFY for the workspace arrives."""
+        key = str(workspace_id)
+        future = Future()
+        with self._lock:
+            self._prune_recent()
+            if key in self._recent:
+                future.set_result(key)
+            else:
+                self._waiters.setdefault(key, []).append(future)
+        return future
+
+    def discard(self, workspace_id, future: Future):
+        """Stop waiting on a future, e.g. after it timed out."""
+        key = str(workspace_id)
+        with self._lock:
+            futures = self._waiters.get(key, [])
+            if future in futures:
+                futures.remove(future)
+            if not futures:
+                self._waiters.pop(key, None)
+
+    def handle(self, payload: str):
+        """Resolve the futures waiting on a NOTIFY payload."""
+        key = (payload or "").strip()
+        with self._lock:
+            futures = self._waiters.pop(key, [])
+            self._recent[key] = time.monotonic()
+            self._recent.move_to_end(key)
+            self._prune_recent()
+        for future in futures:
+            future.set_result(key)
+
+    def _prune_recent(self):
+        """Drop remembered payloads no waiter could still be registering for."""
+        cutoff = time.monotonic() - settings.READ_YOUR_WRITES_TIMEOUT_SECONDS
+        while self._recent and (
+            len(self._recent) > self.RECENT_MAX_SIZE or next(iter(self._recent.values())) < cutoff
+        ):
+            self._recent.popitem(last=False)
+
+    def _listen(self):
+        """LISTEN on the read-your-writes channel, reconnecting after errors."""
+        # Django connections are per thread, so this thread's connection is only used for LISTEN.
+        while True:
+            try:
+                connection.ensure_connection()
+                conn = connection.connection
+                with connection.cursor() as cursor:
+                    cursor.execute(LISTEN_SQL)
+                while True:
+                    readable, _, _ = select.select([conn], [], [], 5.0)
+                    if not readable:
+                        continue
+                    conn.poll()
+                    notifies = list(conn.notifies)
+                    conn.notifies.clear()
+                    for notify in notifies:
+                        if notify.channel == READ_YOUR_WRITES_CHANNEL:
+                            self.handle(notify.payload)
+            except Exception:
+                logger.exception("Lost LISTEN connection on channel '%s', retrying.", READ_YOUR_WRITES_CHANNEL)
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+                time.sleep(1)
+
+
+ryw_dispatcher = ReadYourWritesDispatcher()
 
 
 def update_roles_for_removed_workspace(workspace_id: uuid.UUID) -> int:
@@ -420,11 +520,10 @@ class WorkspaceService:
     def _wait_for_notify_post_commit(self, workspace_id: uuid.UUID) -> None:
         """Wait for a NOTIFY on the configured channel for the given workspace id.
 
-        Intended for use as a transaction.on_commit callback.
+        Intended for use as a transaction.on_commit callback. The NOTIFY is received by the
+        process-wide ryw_dispatcher, so the request does not hold a LISTEN connection itself.
         """
         try:
-            connection.ensure_connection()
-            conn = connection.connection
             timeout_seconds = settings.READ_YOUR_WRITES_TIMEOUT_SECONDS
 
             # Early exit if misconfigured
@@ -436,8 +535,8 @@ class WorkspaceService:
                 )
                 return
 
-            with connection.cursor() as cursor:
-                cursor.execute(LISTEN_SQL)
+            ryw_dispatcher.ensure_started()
+            future = ryw_dispatcher.register(workspace_id)
 
             logger.info(
                 "[Service] RYW waiting for NOTIFY channel='%s' workspace_id='%s' timeout=%ss",
@@ -446,67 +545,32 @@ class WorkspaceService:
                 timeout_seconds,
             )
 
-            # Use monotonic clock and a strict deadline to avoid overshooting
             started = time.monotonic()
-            deadline = started + float(timeout_seconds)
-            workspace_id_str = str(workspace_id)
-
-            # Clear any stale notifications from before LISTEN was issued
             try:
-                conn.poll()  # bring any pending into conn.notifies
-                if getattr(conn, "notifies", None):
-                    conn.notifies.clear()
-            except Exception:
-                logger.debug("Failed to clear stale notifications before LISTEN, continuing anyway")
-
-            fd = conn.fileno() if hasattr(conn, "fileno") else conn
-
-            while True:
-                remaining = deadline - time.monotonic()
-                if remaining <= 0:
-                    break
-
-                readable, _, _ = select.select([fd], [], [], min(1.0, remaining))
-                if not readable:
-                    continue
-
-                conn.poll()
-                notifies = getattr(conn, "notifies", None)
-                if notifies:
-                    q = deque(notifies)
-                    notifies.clear()
-                    while q:
-                        n = q.popleft()
-                        payload = (getattr(n, "payload", "") or "").strip()
-                        if n.channel == READ_YOUR_WRITES_CHANNEL and payload == workspace_id_str:
-                            duration = time.monotonic() - started
-                            logger.info(
-                                "[Service] RYW received NOTIFY channel='%s' workspace_id='%s' after %.3fs",
-                                n.channel,
-                                payload,
-                                duration,
-                            )
-                            _record_ryw_metrics(duration, "success")
-                            return
+                future.result(timeout=float(timeout_seconds))
+            except TimeoutError:
+                ryw_dispatcher.discard(workspace_id, future)
+                duration = time.monotonic() - started
+                logger.error(
+                    "[Service] RYW timed out waiting for NOTIFY channel='%s' workspace_id='%s' after %ss",
+                    READ_YOUR_WRITES_CHANNEL,
+                    str(workspace_id),
+                    timeout_seconds,
+                )
+                _record_ryw_metrics(duration, "timeout")
+                raise TimeoutError(
+                    f"Read-your-writes consistency check timed out after {timeout_seconds}s "
+                    f"for workspace {workspace_id}"
+                )
 
             duration = time.monotonic() - started
-            logger.error(
-                "[Service] RYW timed out waiting for NOTIFY channel='%s' workspace_id='%s' after %ss",
+            logger.info(
+                "[Service] RYW received NOTIFY channel='%s' workspace_id='%s' after %.3fs",
                 READ_YOUR_WRITES_CHANNEL,
                 str(workspace_id),
-                timeout_seconds,
-            )
-            _record_ryw_metrics(duration, "timeout")
-            raise TimeoutError(
-                f"Read-your-writes consistency check timed out after {timeout_seconds}s for workspace {workspace_id}"
+                duration,
             )
+            _record_ryw_metrics(duration, "success")
         except Exception:
             logger.exception("Error while waiting for NOTIFY after workspace create")
             raise
-        finally:
-            try:
-                with connection.cursor() as cursor:
-                    cursor.execute(UNLISTEN_SQL)
-            except Exception:
-                # Best-effort cleanup
-                pass
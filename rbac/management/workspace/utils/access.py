@@ -23,6 +23,7 @@ from uuid import UUID
 
 from django.db.models.expressions import RawSQL
 from feature_flags import FEATURE_FLAGS
+from management.cache import WorkspaceParentMapCache
 from management.models import Access, Workspace
 from management.permissions.system_user_utils import SystemUserAccessResult, check_system_user_access
 from management.permissions.workspace_inventory_access import (
@@ -164,6 +165,57 @@ def filter_top_level_workspaces(queryset):
     return queryset.filter(id__in=RawSQL(sql, [accessible_ids_list, accessible_ids_list, accessible_ids_list]))
 
 
+def get_top_level_ancestor_ids(workspace_ids, tenant):
+    """
+    Return the ancestor IDs of the top-level workspaces among the given workspaces.
+
+    A workspace is top-level if none of its ancestors are among the given workspaces.
+    With WORKSPACE_PARENT_MAP_CACHE_ENABLED the tenant's cached parent map is walked in
+    memory; otherwise a single recursive query resolves the ancestors of all top-level
+    workspaces at once.
+
+    Args:
+        workspace_ids: IDs of the workspaces to resolve ancestors for
+        tenant: The tenant the workspaces belong to
+
+    Returns:
+        set[str]: Union of the ancestor IDs of the top-level workspaces
+    """
+    workspace_ids = {str(workspace_id) for workspace_id in workspace_ids}
+    if not workspace_ids:
+        return set()
+
+    parent_map_cache = WorkspaceParentMapCache()
+    if not parent_map_cache.enabled:
+        accessible_workspaces = Workspace.objects.filter(id__in=workspace_ids, tenant=tenant)
+        top_level_ids = [
+            str(id) for id in filter_top_level_workspaces(accessible_workspaces).values_list("id", flat=True)
+        ]
+        return set(Workspace.objects.ancestor_ids(top_level_ids, tenant.id)) if top_level_ids else set()
+
+    parent_map = parent_map_cache.get_parent_map(tenant.id)
+    # Workspaces bulk created outside of the model signals may be missing from a cached map, so it is rebuilt.
+    if parent_map is None or not workspace_ids <= parent_map.keys():
+        parent_map = {
+            str(id): str(parent_id) if parent_id else None
+            for id, parent_id in Workspace.objects.filter(tenant=tenant).values_list("id", "parent_id")
+        }
+        parent_map_cache.save_parent_map(tenant.id, parent_map)
+
+    ancestor_ids = set()
+    for workspace_id in workspace_ids:
+        if workspace_id not in parent_map:
+            continue
+        chain = []
+        parent_id = parent_map[workspace_id]
+        while parent_id is not None:
+            chain.append(parent_id)
+            parent_id = parent_map.get(parent_id)
+        if workspace_ids.isdisjoint(chain):
+            ancestor_ids.update(chain)
+    return ancestor_ids
+
+
 def is_user_allowed(request, required_operation, target_workspace):
     """
     Check if the user is allowed to perform the required permission on the target workspace.
@@ -327,7 +379,7 @@ def is_user_allowed_v2(request, required_operation, target_workspace):
         principal_id = Principal.user_id_to_principal_resource_id(user_id)
 
         # Create the Inventory API checker
-        checker = WorkspaceInventoryAccessChecker()
+        checker = WorkspaceInventoryAccessChecker(tenant=request.tenant)
 
         # Use the required_operation directly (already determined by permission_from_request)
         relation = required_operation
@@ -362,21 +414,10 @@ def is_user_allowed_v2(request, required_operation, target_workspace):
                 request.has_real_workspace_access = True
 
                 # Add ancestors only from the top-level workspace(s) in accessible workspaces (for ancestry needs)
-                # Get workspace objects for accessible IDs
-                with record_timing(timings, "db_filter_accessible_workspaces"):
-                    accessible_workspaces = Workspace.objects.filter(
-                        id__in=accessible_workspace_ids, tenant=request.tenant
-                    )
-
-                # Find the top-level workspace(s) - those that are not children of any other accessible workspace
-                with record_timing(timings, "filter_top_level_workspaces"):
-                    top_level_workspaces = filter_top_level_workspaces(accessible_workspaces)
-
                 with record_timing(timings, "add_ancestor_ids"):
-                    for workspace in top_level_workspaces:
-                        # Add ancestors directly for this top-level workspace
-                        ancestor_ids = {str(ancestor.id) for ancestor in workspace.ancestors()}
-                        accessible_workspace_ids.update(ancestor_ids)
+                    accessible_workspace_ids.update(
+                        get_top_level_ancestor_ids(accessible_workspace_ids, request.tenant)
+                    )
             else:
                 # User has no actual workspace permissions, only fallback access
                 request.has_real_workspace_access = False
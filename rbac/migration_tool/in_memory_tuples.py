@@ -10,6 +10,21 @@ from management.relation_replicator.types import RelationTuple  # noqa: F401 - R
 RelationPredicate = Callable[["RelationTuple"], bool]
 T = TypeVar("T", bound=Hashable)
 
+# An index lookup, as a pair of the name of the index and the key to look up in it.
+IndexLookup = Tuple[str, Hashable]
+
+_INDEX_KEYS: dict[str, Callable[[RelationTuple], Hashable]] = {
+    "resource": lambda rel: (rel.resource.type.namespace, rel.resource.type.name, rel.resource.id),
+    "subject": lambda rel: (
+        rel.subject.subject.type.namespace,
+        rel.subject.subject.type.name,
+        rel.subject.subject.id,
+        rel.subject.relation,
+    ),
+    "relation": lambda rel: rel.relation,
+}
+_EMPTY: frozenset = frozenset()
+
 
 def _to_relation_tuple(item: Union[RelationTuple, Relationship]) -> RelationTuple:
     """Convert a proto Relationship or RelationTuple to a RelationTuple."""
@@ -57,16 +72,35 @@ class TupleSet:
         """Count tuples matching the given predicate."""
         return len(self.find_tuples(predicate))
 
+    def _candidates(self, predicate: RelationPredicate) -> Iterable[RelationTuple]:
+        """
+        Return the tuples of this set that may match the predicate.
+
+        Predicates built from resource(), subject() and relation(), alone or combined with all_of(), can only match
+        the tuples of an index bucket. The smallest bucket is used instead of scanning the whole set; the predicate
+        must still be applied to the returned tuples.
+        """
+        lookups = getattr(predicate, "index_lookups", ())
+        if not lookups:
+            return self._set
+
+        bucket = min((self._full_set._lookup(lookup) for lookup in lookups), key=len)
+        if self._set is self._full_set._tuples:
+            return bucket
+        if len(bucket) < len(self._set):
+            return (rel for rel in bucket if rel in self._set)
+        return self._set
+
     def find_tuples(self, predicate: RelationPredicate = lambda _: True) -> "TupleSet":
         """Find tuples matching the given predicate."""
-        return TupleSet(self._full_set, {rel for rel in self._set if predicate(rel)})
+        return TupleSet(self._full_set, {rel for rel in self._candidates(predicate) if predicate(rel)})
 
     def find_tuples_grouped(
         self, predicate: RelationPredicate, group_by: Callable[[RelationTuple], T]
     ) -> dict[T, "TupleSet"]:
         """Filter tuples and group them by a key."""
         grouped_tuples: dict[T, set[RelationTuple]] = defaultdict(set)
-        for rel in self._set:
+        for rel in self._candidates(predicate):
             if predicate(rel):
                 key = group_by(rel)
                 grouped_tuples[key].add(rel)
@@ -294,20 +328,47 @@ class TupleSet:
 
 
 class InMemoryTuples(TupleSet):
-    """In-memory store for relation tuples."""
+    """
+    In-memory store for relation tuples.
+
+    The tuples are indexed by resource, subject and relation, so that finding the tuples related to an object does not
+    require scanning the whole store.
+    """
 
     def __init__(self, tuples=None):
         """Initialize the store."""
-        self._tuples: Set[RelationTuple] = set(tuples) if tuples is not None else set()
+        self._tuples: Set[RelationTuple] = set()
+        self._indexes: dict[str, dict[Hashable, Set[RelationTuple]]] = {name: {} for name in _INDEX_KEYS}
         super().__init__(self, self._tuples)
+        for item in tuples if tuples is not None else ():
+            self.add(item)
+
+    def _lookup(self, lookup: IndexLookup) -> Set[RelationTuple]:
+        """Return the tuples stored under the given index key."""
+        name, key = lookup
+        return self._indexes[name].get(key, _EMPTY)
 
     def add(self, item: Union[RelationTuple, Relationship]):
         """Add a tuple to the store."""
-        self._tuples.add(_to_relation_tuple(item))
+        rel = _to_relation_tuple(item)
+        if rel in self._tuples:
+            return
+        self._tuples.add(rel)
+        for name, index_key in _INDEX_KEYS.items():
+            self._indexes[name].setdefault(index_key(rel), set()).add(rel)
 
     def remove(self, item: Union[RelationTuple, Relationship]):
         """Remove a tuple from the store."""
-        self._tuples.discard(_to_relation_tuple(item))
+        rel = _to_relation_tuple(item)
+        if rel not in self._tuples:
+            return
+        self._tuples.discard(rel)
+        for name, index_key in _INDEX_KEYS.items():
+            key = index_key(rel)
+            bucket = self._indexes[name][key]
+            bucket.discard(rel)
+            if not bucket:
+                del self._indexes[name][key]
 
     def write(
         self,
@@ -345,6 +406,8 @@ class InMemoryTuples(TupleSet):
     def clear(self):
         """Clear all tuples from the store."""
         self._tuples.clear()
+        for index in self._indexes.values():
+            index.clear()
 
     def __str__(self):
         """Return a string representation of the store."""
@@ -360,12 +423,18 @@ class InMemoryTuples(TupleSet):
 
 
 class TuplePredicate:
-    """A predicate that can be used to filter relation tuples."""
+    """
+    A predicate that can be used to filter relation tuples.
+
+    A predicate may declare index lookups, each of which returns a superset of the tuples matching it, so that
+    InMemoryTuples can look up candidates instead of testing every tuple.
+    """
 
-    def __init__(self, func, repr):
+    def __init__(self, func, repr, index_lookups: Tuple[IndexLookup, ...] = ()):
         """Initialize the predicate."""
         self.func = func
         self.repr = repr
+        self.index_lookups = index_lookups
 
     def __call__(self, *args, **kwargs):
         """Call the predicate."""
@@ -384,7 +453,9 @@ def all_of(*predicates: RelationPredicate) -> RelationPredicate:
     def predicate(rel: RelationTuple) -> bool:
         return all(p(rel) for p in predicates)
 
-    return TuplePredicate(predicate, f"all_of({', '.join([str(p) for p in predicates])})")
+    # A tuple matching all the predicates is found under the index lookups of each of them.
+    index_lookups = tuple(lookup for p in predicates for lookup in getattr(p, "index_lookups", ()))
+    return TuplePredicate(predicate, f"all_of({', '.join([str(p) for p in predicates])})", index_lookups)
 
 
 def one_of(*predicates: RelationPredicate) -> RelationPredicate:
@@ -427,7 +498,8 @@ def resource_id(id: str) -> RelationPredicate:
 
 def resource(namespace: str, name: str, id: object) -> RelationPredicate:
     """Return a predicate that is true if the resource matches the given namespace and name."""
-    return all_of(resource_type(namespace, name), resource_id(str(id)))
+    predicate = all_of(resource_type(namespace, name), resource_id(str(id)))
+    return TuplePredicate(predicate, repr(predicate), (("resource", (namespace, name, str(id))),))
 
 
 def relation(relation: str) -> RelationPredicate:
@@ -436,7 +508,7 @@ def relation(relation: str) -> RelationPredicate:
     def predicate(rel: RelationTuple) -> bool:
         return rel.relation == relation
 
-    return TuplePredicate(predicate, f'relation("{relation}")')
+    return TuplePredicate(predicate, f'relation("{relation}")', (("relation", relation),))
 
 
 def subject_type(namespace: str, name: str, relation: Optional[str] = None) -> RelationPredicate:
@@ -463,7 +535,8 @@ def subject_id(id: str) -> RelationPredicate:
 
 def subject(namespace: str, name: str, id: object, relation: Optional[str] = None) -> RelationPredicate:
     """Return a predicate that is true if the subject matches the given namespace and name."""
-    return all_of(subject_type(namespace, name, relation), subject_id(str(id)))
+    predicate = all_of(subject_type(namespace, name, relation), subject_id(str(id)))
+    return TuplePredicate(predicate, repr(predicate), (("subject", (namespace, name, str(id), relation)),))
 
 
 class InMemoryRelationReplicator(RelationReplicator):
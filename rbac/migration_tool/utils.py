@@ -1,6 +1,6 @@
 """Utilities for working with the relation API server."""
 
-from typing import Optional, Tuple
+from typing import Iterable, Optional, Tuple
 
 from management.relation_replicator.types import ObjectReference, ObjectType, RelationTuple, SubjectReference
 
@@ -31,3 +31,23 @@ def create_relationship(
             relation=subject_relation,
         ),
     )
+
+
+def create_relationships(
+    resource_name: Tuple[str, str],
+    subject_name: Tuple[str, str],
+    relation: str,
+    ids: Iterable[Tuple[str, str]],
+    subject_relation: Optional[str] = None,
+) -> list[RelationTuple]:
+    """Create the relationships between each (resource_id, subject_id) pair of a batch.
+
+    This is equivalent to calling create_relationship for each pair, but validates the batch as a whole.
+    """
+    return RelationTuple.bulk(
+        resource_type=ObjectType(namespace=resource_name[0], name=resource_name[1]),
+        relation=relation,
+        subject_type=ObjectType(namespace=subject_name[0], name=subject_name[1]),
+        ids=ids,
+        subject_relation=subject_relation,
+    )
@@ -29,13 +29,19 @@ from django.http import Http404, HttpResponse, QueryDict
 from django.urls import resolve, reverse
 from feature_flags import FEATURE_FLAGS
 from management.authorization.token_validator import ITSSOTokenValidator, TokenValidator
-from management.cache import TenantCache
+from management.cache import AccessCache, TenantCache
 from management.models import Principal
 from management.principal.proxy import PrincipalProxy
 from management.relation_replicator.outbox_replicator import OutboxReplicator
 from management.tenant_service import get_tenant_bootstrap_service
 from management.tenant_service.tenant_service import TenantBootstrapService
-from management.utils import APPLICATION_KEY, access_for_principal, build_system_user_from_token, build_user_from_psk
+from management.utils import (
+    APPLICATION_KEY,
+    PRINCIPAL_CACHE,
+    access_queryset_for_principal,
+    build_system_user_from_token,
+    build_user_from_psk,
+)
 from prometheus_client import Counter
 from rest_framework import status
 
@@ -51,6 +57,8 @@ req_sys_counter = Counter(
     ["behalf", "method", "view", "status"],
 )
 TENANTS = TenantCache()
+# AccessCache sub key of the RBAC access map, application names never contain "::"
+RBAC_ACCESS_CACHE_SUB_KEY = "rbac::access"
 
 
 def catch_integrity_error(func):
@@ -102,7 +110,7 @@ def get_user_id(user: User):
     """Return the user ID for the given user."""
     user_id = user.user_id
     if not user_id:
-        resp = PROXY.request_filtered_principals([user.username], org_id=user.org_id, options={"return_id": True})
+        resp = PROXY.request_principal(user.username, org_id=user.org_id, options={"return_id": True})
         if isinstance(resp, dict) and "errors" in resp:
             logging.warning(resp.get("errors"))
             return
@@ -168,15 +176,32 @@ class IdentityHeaderMiddleware:
             TENANTS.save_tenant(tenant)
         return tenant
 
-    @staticmethod  # noqa: C901
-    def _get_access_for_user(username, tenant):  # pylint: disable=too-many-locals,too-many-branches
+    @staticmethod
+    def _get_access_for_user(username, tenant):
         """Obtain access data for given username.
 
-        Stubbed out to begin removal of RBAC on RBAC, with minimal disruption
+        Stubbed out to begin removal of RBAC on RBAC, with minimal disruption.
+        The computed access is cached next to the principal's access policies, so it is purged by the same
+        signals that purge the AccessCache.
         """
-        principal = None
-        access_list = None
+        try:
+            principal = PRINCIPAL_CACHE.get_principal(tenant.org_id, username)
+            if not principal:
+                principal = Principal.objects.get(username__iexact=username, tenant=tenant)
+                PRINCIPAL_CACHE.cache_principal(org_id=tenant.org_id, principal=principal)
+        except Principal.DoesNotExist:
+            return IdentityHeaderMiddleware._build_access_for_principal(None, tenant)
 
+        cache = AccessCache(tenant.org_id)
+        access = cache.get_policy(principal.uuid, RBAC_ACCESS_CACHE_SUB_KEY)
+        if access is None:
+            access = IdentityHeaderMiddleware._build_access_for_principal(principal, tenant)
+            cache.save_policy(principal.uuid, RBAC_ACCESS_CACHE_SUB_KEY, access)
+        return access
+
+    @staticmethod  # noqa: C901
+    def _build_access_for_principal(principal, tenant):  # pylint: disable=too-many-locals,too-many-branches
+        """Build the RBAC access map of the given principal, or the empty map if there is no principal."""
         access = {
             "group": {"read": [], "write": []},
             "role": {"read": [], "write": []},
@@ -185,41 +210,40 @@ class IdentityHeaderMiddleware:
             "permission": {"read": [], "write": []},
         }
 
-        try:  # pylint: disable=R1702
-            principal = Principal.objects.get(username__iexact=username, tenant=tenant)
-            kwargs = {APPLICATION_KEY: "rbac"}
-            access_list = access_for_principal(principal, tenant, **kwargs)
-            for access_item in access_list:  # pylint: disable=too-many-nested-blocks
-                resource_type = access_item.permission.resource_type
-                operation = access_item.permission.verb
-                if operation == "*":
-                    operation = "write"
-                res_list = ["*"]
-                if resource_type == "*":
-                    for resource in ("group", "role", "policy", "principal", "permission"):
-                        if (
-                            resource in access.keys()
-                            and operation in access.get(resource, {}).keys()  # noqa: W504
-                            and isinstance(access.get(resource, {}).get(operation), list)  # noqa: W504
-                        ):  # noqa: E127
-                            access[resource][operation] += res_list
-                            if operation == "write":
-                                access[resource]["read"] += res_list
-                elif (
-                    resource_type in access.keys()
-                    and operation in access.get(resource_type, {}).keys()  # noqa: W504
-                    and isinstance(access.get(resource_type, {}).get(operation), list)  # noqa: W504
-                ):
-                    access[resource_type][operation] += res_list
-                    if operation == "write":
-                        access[resource_type]["read"] += res_list
-                for res_type, res_ops_obj in access.items():
-                    for op_type, op_list in res_ops_obj.items():
-                        if "*" in op_list:
-                            access[res_type][op_type] = ["*"]
-        except Principal.DoesNotExist:
+        if principal is None:
             return access
 
+        kwargs = {APPLICATION_KEY: "rbac"}
+        access_list = access_queryset_for_principal(principal, tenant, **kwargs).select_related("permission")
+        for access_item in access_list:  # pylint: disable=too-many-nested-blocks
+            resource_type = access_item.permission.resource_type
+            operation = access_item.permission.verb
+            if operation == "*":
+                operation = "write"
+            res_list = ["*"]
+            if resource_type == "*":
+                for resource in ("group", "role", "policy", "principal", "permission"):
+                    if (
+                        resource in access.keys()
+                        and operation in access.get(resource, {}).keys()  # noqa: W504
+                        and isinstance(access.get(resource, {}).get(operation), list)  # noqa: W504
+                    ):  # noqa: E127
+                        access[resource][operation] += res_list
+                        if operation == "write":
+                            access[resource]["read"] += res_list
+            elif (
+                resource_type in access.keys()
+                and operation in access.get(resource_type, {}).keys()  # noqa: W504
+                and isinstance(access.get(resource_type, {}).get(operation), list)  # noqa: W504
+            ):
+                access[resource_type][operation] += res_list
+                if operation == "write":
+                    access[resource_type]["read"] += res_list
+            for res_type, res_ops_obj in access.items():
+                for op_type, op_list in res_ops_obj.items():
+                    if "*" in op_list:
+                        access[res_type][op_type] = ["*"]
+
         return access
 
     @catch_integrity_error
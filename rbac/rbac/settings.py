@@ -357,6 +357,12 @@ ACCESS_CACHE_CONNECT_SIGNALS = ENVIRONMENT.bool("ACCESS_CACHE_CONNECT_SIGNALS",
 REDIS_MAX_CONNECTIONS = ENVIRONMENT.get_value("REDIS_MAX_CONNECTIONS", default=10)
 REDIS_SOCKET_CONNECT_TIMEOUT = ENVIRONMENT.get_value("REDIS_SOCKET_CONNECT_TIMEOUT", default=0.1)
 REDIS_SOCKET_TIMEOUT = ENVIRONMENT.get_value("REDIS_SOCKET_TIMEOUT", default=0.1)
+REDIS_CIRCUIT_BREAKER_FAILURE_THRESHOLD = ENVIRONMENT.int("REDIS_CIRCUIT_BREAKER_FAILURE_THRESHOLD", default=3)
+REDIS_CIRCUIT_BREAKER_RESET_TIMEOUT = ENVIRONMENT.float("REDIS_CIRCUIT_BREAKER_RESET_TIMEOUT", default=30.0)
+# Per-process cache kept in front of Redis for tenants and principals
+LOCAL_CACHE_ENABLED = ENVIRONMENT.bool("LOCAL_CACHE_ENABLED", default=False)
+LOCAL_CACHE_MAX_SIZE = ENVIRONMENT.int("LOCAL_CACHE_MAX_SIZE", default=1024)
+LOCAL_CACHE_LIFETIME = ENVIRONMENT.float("LOCAL_CACHE_LIFETIME", default=30.0)
 REDIS_CACHE_CONNECTION_PARAMS = dict(
     max_connections=REDIS_MAX_CONNECTIONS,
     host=REDIS_HOST,
@@ -428,16 +434,33 @@ MOCK_KAFKA = ENVIRONMENT.get_value("MOCK_KAFKA", default=False)
 NOTIFICATIONS_ENABLED = ENVIRONMENT.get_value("NOTIFICATIONS_ENABLED", default=False)
 NOTIFICATIONS_RH_ENABLED = ENVIRONMENT.get_value("NOTIFICATIONS_RH_ENABLED", default=False)
 NOTIFICATIONS_TOPIC = ENVIRONMENT.get_value("NOTIFICATIONS_TOPIC", default=None)
+# Send notifications to all tenants from a Celery task, reading tenants in chunks of the given size
+NOTIFICATIONS_FAN_OUT_IN_WORKER = ENVIRONMENT.bool("NOTIFICATIONS_FAN_OUT_IN_WORKER", default=False)
+NOTIFICATIONS_FAN_OUT_CHUNK_SIZE = ENVIRONMENT.int("NOTIFICATIONS_FAN_OUT_CHUNK_SIZE", default=1000)
 
 EXTERNAL_SYNC_TOPIC = ENVIRONMENT.get_value("EXTERNAL_SYNC_TOPIC", default=None)
 EXTERNAL_CHROME_TOPIC = ENVIRONMENT.get_value("EXTERNAL_CHROME_TOPIC", default=None)
 
+# Send sync, chrome and notification messages once the transaction commits, collapsing duplicates
+KAFKA_PRODUCER_DEFER_UNTIL_COMMIT = ENVIRONMENT.bool("KAFKA_PRODUCER_DEFER_UNTIL_COMMIT", default=False)
+KAFKA_PRODUCER_OPTIONS = {
+    "linger_ms": ENVIRONMENT.int("KAFKA_PRODUCER_LINGER_MS", default=5),
+    "batch_size": ENVIRONMENT.int("KAFKA_PRODUCER_BATCH_SIZE", default=16384),
+    "compression_type": ENVIRONMENT.get_value("KAFKA_PRODUCER_COMPRESSION_TYPE", default="") or None,
+}
+
 RBAC_KAFKA_CONSUMER_TOPIC = ENVIRONMENT.get_value("RBAC_KAFKA_CONSUMER_TOPIC", default=None)
 
 RBAC_KAFKA_CONSUMER_GROUP_ID = ENVIRONMENT.get_value("RBAC_KAFKA_CONSUMER_GROUP_ID", default="rbac-consumer-group")
 
 RBAC_KAFKA_CUSTOM_CONSUMER_BROKER = ENVIRONMENT.get_value("RBAC_KAFKA_CUSTOM_CONSUMER_BROKER", default="")
 
+# Micro-batching for the RBAC Kafka consumer: 0 disables batching (one message at a time)
+RBAC_KAFKA_CONSUMER_BATCH_SIZE = ENVIRONMENT.int("RBAC_KAFKA_CONSUMER_BATCH_SIZE", default=0)
+RBAC_KAFKA_CONSUMER_BATCH_LINGER_MS = ENVIRONMENT.int("RBAC_KAFKA_CONSUMER_BATCH_LINGER_MS", default=100)
+# Seconds between consistency token writes (0 = after every message); tokens are always flushed before offset commits
+RBAC_KAFKA_CONSUMER_TOKEN_FLUSH_INTERVAL = ENVIRONMENT.float("RBAC_KAFKA_CONSUMER_TOKEN_FLUSH_INTERVAL", default=0.0)
+
 # if we don't enable KAFKA we can't use the notifications
 if not KAFKA_ENABLED:
     NOTIFICATIONS_ENABLED = False
@@ -521,12 +544,29 @@ IT_SERVICE_PORT = ENVIRONMENT.int("IT_SERVICE_PORT", default="443")
 IT_SERVICE_PROTOCOL_SCHEME = ENVIRONMENT.get_value("IT_SERVICE_PROTOCOL_SCHEME", default="https")
 IT_SERVICE_TIMEOUT_SECONDS = ENVIRONMENT.int("IT_SERVICE_TIMEOUT_SECONDS", default=10)
 IT_TOKEN_JKWS_CACHE_LIFETIME = ENVIRONMENT.int("IT_TOKEN_JKWS_CACHE_LIFETIME", default=28800)
+# Snapshot of each tenant's service accounts in IT: served as is while fresh, then served while it is refreshed in the
+# background until it is too old to be served at all
+IT_SERVICE_ACCOUNTS_CACHE_ENABLED = ENVIRONMENT.bool("IT_SERVICE_ACCOUNTS_CACHE_ENABLED", default=False)
+IT_SERVICE_ACCOUNTS_CACHE_LIFETIME = ENVIRONMENT.int("IT_SERVICE_ACCOUNTS_CACHE_LIFETIME", default=60)
+IT_SERVICE_ACCOUNTS_CACHE_STALE_LIFETIME = ENVIRONMENT.int("IT_SERVICE_ACCOUNTS_CACHE_STALE_LIFETIME", default=600)
+
+# Pooled HTTP sessions used for BOP, IT and JWKS requests: connections kept alive per host, and retries with
+# exponential backoff on connection errors and 502/503/504 responses
+HTTP_CLIENT_POOL_CONNECTIONS = ENVIRONMENT.int("HTTP_CLIENT_POOL_CONNECTIONS", default=10)
+HTTP_CLIENT_POOL_MAXSIZE = ENVIRONMENT.int("HTTP_CLIENT_POOL_MAXSIZE", default=10)
+HTTP_CLIENT_RETRIES = ENVIRONMENT.int("HTTP_CLIENT_RETRIES", default=2)
+HTTP_CLIENT_RETRY_BACKOFF_FACTOR = ENVIRONMENT.float("HTTP_CLIENT_RETRY_BACKOFF_FACTOR", default=0.2)
 
 PRINCIPAL_USER_DOMAIN = ENVIRONMENT.get_value("PRINCIPAL_USER_DOMAIN", default="localhost")
 
 # Settings for enabling/disabling deletion in principal cleanup job via UMB
 PRINCIPAL_CLEANUP_DELETION_ENABLED_UMB = ENVIRONMENT.bool("PRINCIPAL_CLEANUP_DELETION_ENABLED_UMB", default=False)
 PRINCIPAL_CLEANUP_UPDATE_ENABLED_UMB = ENVIRONMENT.bool("PRINCIPAL_CLEANUP_UPDATE_ENABLED_UMB", default=False)
+# Settings for the periodic principal cleanup job: usernames per BOP request, tenants cleaned concurrently and
+# how long (seconds) an interrupted job can be resumed from its checkpoint
+PRINCIPAL_CLEANUP_BATCH_SIZE = ENVIRONMENT.int("PRINCIPAL_CLEANUP_BATCH_SIZE", default=100)
+PRINCIPAL_CLEANUP_CONCURRENCY = ENVIRONMENT.int("PRINCIPAL_CLEANUP_CONCURRENCY", default=4)
+PRINCIPAL_CLEANUP_CHECKPOINT_LIFETIME = ENVIRONMENT.int("PRINCIPAL_CLEANUP_CHECKPOINT_LIFETIME", default=24 * 60 * 60)
 UMB_JOB_ENABLED = ENVIRONMENT.bool("UMB_JOB_ENABLED", default=True)
 UMB_HOST = ENVIRONMENT.get_value("UMB_HOST", default="localhost")
 UMB_PORT = ENVIRONMENT.get_value("UMB_PORT", default="61612")
@@ -551,6 +591,18 @@ if ENVIRONMENT.bool("CLOWDER_ENABLED", default=False):
             f"Falling back to default RELATION_API_SERVER value: {RELATION_API_SERVER}"
         )
 
+# Where the role bindings inherited by a resource are resolved for /role-bindings/by-subject: "relations" looks them up
+# with the Relations API, "database" from the workspace hierarchy in the database, and "shadow" serves the Relations
+# API result while comparing it with the database
+ROLE_BINDING_INHERITANCE_RESOLVER = ENVIRONMENT.get_value("ROLE_BINDING_INHERITANCE_RESOLVER", default="relations")
+
+# Caching of Kessel lookup and check results, keyed by the tenant's relations consistency token
+KESSEL_LOOKUP_CACHE_ENABLED = ENVIRONMENT.bool("KESSEL_LOOKUP_CACHE_ENABLED", default=False)
+KESSEL_LOOKUP_CACHE_LIFETIME = ENVIRONMENT.int("KESSEL_LOOKUP_CACHE_LIFETIME", default=600)
+
+# Maximum number of DeleteTuples calls in flight when replicating removed relationships
+RELATIONS_API_DELETE_CONCURRENCY = ENVIRONMENT.int("RELATIONS_API_DELETE_CONCURRENCY", default=8)
+
 RELATIONS_API_CLIENT_ID = ENVIRONMENT.get_value("RELATION_API_CLIENT_ID", default="")
 RELATIONS_API_CLIENT_SECRET = ENVIRONMENT.get_value("RELATION_API_CLIENT_SECRET", default="")
 RELATIONS_API_TOKEN_URL = ENVIRONMENT.get_value(
@@ -579,6 +631,10 @@ if CLOWDER_ENABLED:
             f"Falling back to default INVENTORY_API_SERVER value: {INVENTORY_API_SERVER}"
         )
 
+# Keepalive of the process-wide gRPC channels to the Relations and Inventory APIs
+GRPC_KEEPALIVE_TIME_MS = ENVIRONMENT.int("GRPC_KEEPALIVE_TIME_MS", default=30000)
+GRPC_KEEPALIVE_TIMEOUT_MS = ENVIRONMENT.int("GRPC_KEEPALIVE_TIMEOUT_MS", default=10000)
+
 ENV_NAME = ENVIRONMENT.get_value("ENV_NAME", default="stage")
 
 # Versioned API settings
@@ -613,6 +669,8 @@ WORKSPACE_HIERARCHY_DEPTH_LIMIT = ENVIRONMENT.int("WORKSPACE_HIERARCHY_DEPTH_LIM
 WORKSPACE_RESTRICT_DEFAULT_PEERS = ENVIRONMENT.bool("WORKSPACE_RESTRICT_DEFAULT_PEERS", default=False)
 # Enable detailed timing logs for v2 workspace access checks (for performance investigation)
 WORKSPACE_ACCESS_TIMING_ENABLED = ENVIRONMENT.bool("WORKSPACE_ACCESS_TIMING_ENABLED", default=False)
+# Cache each tenant's workspace parent map to resolve ancestors for workspace list checks without queries
+WORKSPACE_PARENT_MAP_CACHE_ENABLED = ENVIRONMENT.bool("WORKSPACE_PARENT_MAP_CACHE_ENABLED", default=False)
 
 # Permission scope configuration used by permission_scope.ImiplicitResourceService.
 # These can include wildcard patterns (e.g. "rbac:*:read" or "advisor:*:*").
@@ -635,3 +693,10 @@ SYSTEM_USERS = ENVIRONMENT.json("SYSTEM_USERS", default={})
 
 # Principal caching settings
 PRINCIPAL_CACHE_LIFETIME = ENVIRONMENT.int("PRINCIPAL_CACHE_LIFETIME", default=3600)
+# Short-lived caching of BOP lookups of a single principal, with a shorter lifetime for principals not found
+PRINCIPAL_LOOKUP_CACHE_ENABLED = ENVIRONMENT.bool("PRINCIPAL_LOOKUP_CACHE_ENABLED", default=False)
+PRINCIPAL_LOOKUP_CACHE_LIFETIME = ENVIRONMENT.int("PRINCIPAL_LOOKUP_CACHE_LIFETIME", default=60)
+PRINCIPAL_LOOKUP_NEGATIVE_CACHE_LIFETIME = ENVIRONMENT.int("PRINCIPAL_LOOKUP_NEGATIVE_CACHE_LIFETIME", default=10)
+# Page the user based principals of a group in the database and request only the page from BOP, instead of requesting
+# every member of the group and paginating in memory. Counts then include members BOP would not return.
+GROUP_PRINCIPALS_DB_PAGINATION_ENABLED = ENVIRONMENT.bool("GROUP_PRINCIPALS_DB_PAGINATION_ENABLED", default=False)
@@ -0,0 +1,96 @@
+#
+# Copyright 2026 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Test the pooled HTTP sessions."""
+
+from unittest.mock import Mock, patch
+from urllib.request import Request
+
+import requests
+from django.test import TestCase, override_settings
+from prometheus_client import REGISTRY
+
+from core.http import PooledSession
+
+
+class PooledSessionTests(TestCase):
+    """Test the keep-alive sessions shared by the threads of a process."""
+
+    @override_settings(
+        HTTP_CLIENT_POOL_CONNECTIONS=3,
+        HTTP_CLIENT_POOL_MAXSIZE=7,
+        HTTP_CLIENT_RETRIES=4,
+        HTTP_CLIENT_RETRY_BACKOFF_FACTOR=0.5,
+    )
+    def test_session_is_pooled_and_retries(self):
+        """Test that the session is reused and its adapter is configured from the settings."""
+        pooled = PooledSession("test", retry_methods=("GET", "POST"))
+        session = pooled.session
+
+        self.assertIs(pooled.session, session)
+        adapter = session.get_adapter("https://example.com")
+        self.assertEqual(adapter._pool_connections, 3)
+        self.assertEqual(adapter._pool_maxsize, 7)
+        self.assertEqual(adapter.max_retries.total, 4)
+        self.assertEqual(adapter.max_retries.backoff_factor, 0.5)
+        self.assertEqual(adapter.max_retries.allowed_methods, frozenset({"GET", "POST"}))
+        self.assertEqual(set(adapter.max_retries.status_forcelist), {502, 503, 504})
+        self.assertFalse(adapter.max_retries.raise_on_status)
+
+    def test_session_is_recreated_after_fork(self):
+        """Test that a forked child does not reuse the session of its parent."""
+        pooled = PooledSession("test")
+        session = pooled.session
+
+        pooled._reset()
+
+        self.assertIsNot(pooled.session, session)
+
+    def test_cookies_are_not_stored(self):
+        """Test that cookies set by a response are rejected, since the session serves every user."""
+        session = PooledSession("test").session
+        cookie = requests.cookies.create_cookie("session", "secret", domain="example.com")
+
+        self.assertFalse(session.cookies.get_policy().set_ok(cookie, Request("https://example.com/")))
+
+    @patch("requests.Session.request")
+    def test_request_metrics(self, request):
+        """Test that the duration and status of the requests are tracked per host."""
+        request.return_value = Mock(status_code=200)
+        pooled = PooledSession("metrics")
+        labels = {"client": "metrics", "host": "bop.example.com"}
+        before = REGISTRY.get_sample_value("rbac_http_client_requests_total", {**labels, "status": "200"}) or 0
+
+        response = pooled.post("https://bop.example.com/v1/users", json={"users": ["user"]})
+
+        self.assertIs(response, request.return_value)
+        request.assert_called_once_with("POST", "https://bop.example.com/v1/users", json={"users": ["user"]})
+        self.assertEqual(
+            REGISTRY.get_sample_value("rbac_http_client_requests_total", {**labels, "status": "200"}), before + 1
+        )
+        self.assertIsNotNone(REGISTRY.get_sample_value("rbac_http_client_request_duration_seconds_count", labels))
+
+    @patch("requests.Session.request", side_effect=requests.exceptions.ConnectionError())
+    def test_request_metrics_on_error(self, request):
+        """Test that failed requests are tracked and the error is raised again."""
+        pooled = PooledSession("metrics")
+        labels = {"client": "metrics", "host": "it.example.com", "status": "error"}
+        before = REGISTRY.get_sample_value("rbac_http_client_requests_total", labels) or 0
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            pooled.get(url="https://it.example.com/service_accounts/v1")
+
+        self.assertEqual(REGISTRY.get_sample_value("rbac_http_client_requests_total", labels), before + 1)
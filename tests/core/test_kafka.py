@@ -1,5 +1,7 @@
+import json
 from copy import deepcopy
 from unittest.mock import Mock, MagicMock, patch, DEFAULT
+from django.db import transaction
 from django.test import TestCase
 from kafka.errors import KafkaError
 from core.kafka import RBACProducer, logger
@@ -19,6 +21,18 @@ def copy_call_args(mock):
     return kafka_mock
 
 
+def copy_serialized_call_args(mock):
+    """Record the calls of a mocked send_serialized_kafka_message with their values deserialized."""
+    kafka_mock = Mock()
+
+    def side_effect(topic, value, headers=None):
+        kafka_mock(topic, json.loads(value), headers)
+        return DEFAULT
+
+    mock.side_effect = side_effect
+    return kafka_mock
+
+
 class KafkaTests(TestCase):
     @patch("core.kafka.RBACProducer")
     @patch("core.kafka.logger")
@@ -83,3 +97,87 @@ class KafkaTests(TestCase):
             MockKafkaProducer.get_producer.side_effect = mock_logger.info("Kafka producer initialized successfully")
 
         mock_logger.info.assert_any_call("Kafka producer initialized successfully")
+
+
+class RBACProducerOptionsTests(TestCase):
+    @override_settings(
+        DEVELOPMENT=False,
+        MOCK_KAFKA=False,
+        KAFKA_ENABLED=True,
+        KAFKA_AUTH={"bootstrap_servers": ["kafka:9092"]},
+        KAFKA_PRODUCER_OPTIONS={"linger_ms": 5, "batch_size": 16384, "compression_type": "gzip"},
+    )
+    @patch("core.kafka.KafkaProducer")
+    def test_producer_options(self, kafka_producer):
+        """Test that the batching and compression options are passed to the Kafka producer."""
+        RBACProducer().get_producer()
+
+        kafka_producer.assert_called_once_with(
+            bootstrap_servers=["kafka:9092"], linger_ms=5, batch_size=16384, compression_type="gzip"
+        )
+
+
+@override_settings(KAFKA_PRODUCER_DEFER_UNTIL_COMMIT=True)
+@patch("core.kafka.RBACProducer.send_kafka_message")
+class SendOnCommitTests(TestCase):
+    def test_messages_sent_on_commit_without_duplicates(self, send_kafka_message):
+        """Test that messages are sent once the transaction commits and duplicates are collapsed."""
+        from internal.integration.chrome_handlers import chrome_topic, send_chrome_message
+
+        with self.captureOnCommitCallbacks(execute=True):
+            send_chrome_message("create-group", "a", "12345")
+            send_chrome_message("create-group", "a", "12345")
+            send_chrome_message("create-group", "b", "12345")
+            send_kafka_message.assert_not_called()
+
+        self.assertEqual(send_kafka_message.call_count, 2)
+        entity_ids = [c.args[1]["data"]["payload"]["entityId"] for c in send_kafka_message.call_args_list]
+        self.assertEqual(entity_ids, ["a", "b"])
+        self.assertEqual({c.args[0] for c in send_kafka_message.call_args_list}, {chrome_topic})
+
+        # An identical message is sent again on a later commit
+        with self.captureOnCommitCallbacks(execute=True):
+            send_chrome_message("create-group", "a", "12345")
+        self.assertEqual(send_kafka_message.call_count, 3)
+
+    def test_messages_of_rolled_back_savepoint_are_dropped(self, send_kafka_message):
+        """Test that messages are not sent for changes that are rolled back."""
+        from internal.integration.sync_handlers import send_sync_message
+
+        with self.captureOnCommitCallbacks(execute=True):
+            send_sync_message("group_created", {"group": {"name": "kept"}})
+            with self.assertRaises(ValueError):
+                with transaction.atomic():
+                    send_sync_message("group_created", {"group": {"name": "rolled back"}})
+                    raise ValueError
+
+        send_kafka_message.assert_called_once()
+        self.assertEqual(send_kafka_message.call_args.args[1]["events"][0]["payload"], {"group": {"name": "kept"}})
+
+    def test_notification_headers_built_on_send(self, send_kafka_message):
+        """Test that every sent notification gets its own headers and message."""
+        from management.notifications.notification_handlers import notify
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notify("group-created", {"name": "a"}, "12345")
+            notify("group-created", {"name": "b"}, "12345")
+
+        (_, first, first_headers), (_, second, second_headers) = [c.args for c in send_kafka_message.call_args_list]
+        self.assertEqual(first["events"][0]["payload"], {"name": "a"})
+        self.assertEqual(second["events"][0]["payload"], {"name": "b"})
+        self.assertNotEqual(first_headers, second_headers)
+
+    @patch("management.cache.AccessCacheInvalidationQueue.flush")
+    def test_failed_send_does_not_skip_later_hooks(self, flush, send_kafka_message):
+        """Test that the cache invalidations of a commit still run when a message fails to be sent."""
+        from management.cache import policy_invalidation_queue
+        from management.notifications.notification_handlers import notify
+
+        send_kafka_message.side_effect = KafkaError("broker down")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notify("group-created", {"name": "a"}, "12345")
+            policy_invalidation_queue.delete_policies("12345", ["principal"])
+
+        send_kafka_message.assert_called_once()
+        flush.assert_called_once()
@@ -44,16 +44,25 @@ else:
         sys.path.insert(1, str(project_root))
 
 from core.kafka_consumer import (
+    BatchConfig,
+    CommitConfig,
+    ConsistencyTokenStore,
     DebeziumMessage,
     MessageValidator,
+    OffsetManager,
     RBACKafkaConsumer,
+    ReplicationBatch,
     ReplicationMessage,
     RetryConfig,
+    ValidationError,
 )
 from django.test import TestCase
 from django.test.utils import override_settings
+from kafka import TopicPartition
 from kafka.errors import KafkaError
 
+from api.models import Tenant
+
 
 class MessageValidatorTests(TestCase):
     """Tests for MessageValidator class."""
@@ -639,13 +648,9 @@ class RBACKafkaConsumerTests(TestCase):
     @patch("core.kafka_consumer.json_format.ParseDict")
     @patch("core.kafka_consumer.relations_api_replication.write_relationships")
     @patch("core.kafka_consumer.relations_api_replication.delete_relationships")
-    @patch("core.kafka_consumer.Tenant.objects.get")
-    def test_process_relations_message_success(self, mock_tenant_get, mock_delete, mock_write, mock_parse_dict):
+    def test_process_relations_message_success(self, mock_delete, mock_write, mock_parse_dict):
         """Test successful relations message processing."""
-        # Mock tenant lookup
-        mock_tenant = Mock()
-        mock_tenant.org_id = "12345"
-        mock_tenant_get.return_value = mock_tenant
+        tenant = Tenant.objects.create(tenant_name="acct12345", org_id="12345")
 
         # Mock protobuf conversion
         mock_relationship_pb = Mock()
@@ -691,7 +696,8 @@ class RBACKafkaConsumerTests(TestCase):
         result = consumer._process_relations_message(debezium_msg)
 
         self.assertTrue(result)
-        mock_tenant_get.assert_called_once_with(org_id="12345")
+        tenant.refresh_from_db()
+        self.assertEqual(tenant.relations_consistency_token, "test-token-123")
         mock_write.assert_called_once()
         mock_delete.assert_called_once()
 
@@ -1886,3 +1892,299 @@ class FencingTokenErrorHandlingTests(TestCase):
         # Should re-raise the gRPC error (not RuntimeError)
         with self.assertRaises(grpc.RpcError):
             self.consumer._process_relations_message(debezium_msg)
+
+
+def _relation(resource_id, subject_id):
+    """Build a relation dict as found in replication payloads."""
+    return {
+        "resource": {"type": {"namespace": "rbac", "name": "workspace"}, "id": resource_id},
+        "relation": "member",
+        "subject": {"subject": {"type": {"namespace": "rbac", "name": "user"}, "id": subject_id}},
+    }
+
+
+def _debezium_value(relations_to_add=(), relations_to_remove=(), resource_context=None):
+    """Build a standard Debezium message value wrapping a replication payload."""
+    payload = {"relations_to_add": list(relations_to_add), "relations_to_remove": list(relations_to_remove)}
+    if resource_context:
+        payload["resource_context"] = resource_context
+    return {"schema": {"type": "string"}, "payload": json.dumps(payload)}
+
+
+class ReplicationBatchTests(TestCase):
+    """Tests for folding replication messages into a net delta."""
+
+    def _add(self, batch, relations_to_add=(), relations_to_remove=()):
+        batch.add(
+            Mock(),
+            RBACKafkaConsumer._to_relationships(list(relations_to_add)),
+            RBACKafkaConsumer._to_relationships(list(relations_to_remove)),
+        )
+
+    def test_add_then_remove_becomes_remove(self):
+        """Test that a relation added and later removed is only deleted."""
+        batch = ReplicationBatch()
+        self._add(batch, relations_to_add=[_relation("ws1", "u1")])
+        self._add(batch, relations_to_remove=[_relation("ws1", "u1")])
+
+        self.assertEqual(batch.relations_to_add, [])
+        self.assertEqual([r.resource.id for r in batch.relations_to_remove], ["ws1"])
+        self.assertEqual(batch.superseded, 1)
+
+    def test_remove_then_add_becomes_add(self):
+        """Test that a relation removed and later re-added is only created."""
+        batch = ReplicationBatch()
+        self._add(batch, relations_to_remove=[_relation("ws1", "u1")])
+        self._add(batch, relations_to_add=[_relation("ws1", "u1"), _relation("ws2", "u1")])
+
+        self.assertEqual([r.resource.id for r in batch.relations_to_add], ["ws1", "ws2"])
+        self.assertEqual(batch.relations_to_remove, [])
+        self.assertEqual(batch.superseded, 1)
+
+
+class MicroBatchingTests(TestCase):
+    """Tests for the micro-batching consumer mode."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.consumer = RBACKafkaConsumer(batch_config=BatchConfig(max_size=3, max_linger_ms=10))
+        self.consumer.consumer = Mock()
+        self.consumer.offset_manager = Mock()
+        self.consumer.offset_manager.commit.return_value = (True, 1)
+        self.consumer.lock_id = "test-group/0"
+        self.consumer.lock_token = "test-token-12345"
+
+    @override_settings(RBAC_KAFKA_CONSUMER_BATCH_SIZE=0)
+    def test_batching_disabled_by_default(self):
+        """Test that batching is opt-in."""
+        self.assertFalse(RBACKafkaConsumer().batch_config.enabled)
+
+    @patch("core.kafka_consumer.relations_api_replication.write_relationships")
+    @patch("core.kafka_consumer.relations_api_replication.delete_relationships")
+    def test_process_batch_sends_net_delta_once(self, mock_delete, mock_write):
+        """Test that a batch results in a single delete and write carrying the net delta."""
+        tenant = Tenant.objects.create(tenant_name="acct-batch", org_id="batch-org")
+        mock_write.return_value.consistency_token.token = "token-1"
+        mock_delete.return_value.consistency_token.token = None
+        context = {"org_id": tenant.org_id, "event_type": "test"}
+
+        result = self.consumer._process_batch(
+            [
+                _debezium_value(relations_to_add=[_relation("ws1", "u1")], resource_context=context),
+                _debezium_value(
+                    relations_to_add=[_relation("ws2", "u1")],
+                    relations_to_remove=[_relation("ws1", "u1")],
+                    resource_context=context,
+                ),
+            ]
+        )
+
+        self.assertTrue(result)
+        mock_delete.assert_called_once()
+        mock_write.assert_called_once()
+        self.assertEqual([r.resource.id for r in mock_delete.call_args.kwargs["relationships"]], ["ws1"])
+        self.assertEqual([r.resource.id for r in mock_write.call_args.kwargs["relationships"]], ["ws2"])
+        self.assertEqual(mock_write.call_args.kwargs["fencing_check"].lock_token, "test-token-12345")
+        self.assertEqual(self.consumer.token_store.pending, {"batch-org": "token-1"})
+        self.consumer.token_store.flush()
+        tenant.refresh_from_db()
+        self.assertEqual(tenant.relations_consistency_token, "token-1")
+
+    @patch("core.kafka_consumer.relations_api_replication.write_relationships")
+    @patch("core.kafka_consumer.relations_api_replication.delete_relationships")
+    def test_process_batch_invalid_message_raises(self, mock_delete, mock_write):
+        """Test that an invalid message fails the whole batch before any replication."""
+        with self.assertRaises(ValidationError):
+            self.consumer._process_batch([_debezium_value(relations_to_add=[_relation("ws1", "u1")]), {"bad": 1}])
+
+        mock_delete.assert_not_called()
+        mock_write.assert_not_called()
+
+    @patch("core.kafka_consumer.RBACKafkaConsumer._process_batch", return_value=True)
+    def test_process_and_commit_batch_commits_once(self, mock_process_batch):
+        """Test that a batch stores the last offset and commits once."""
+        topic_partition = TopicPartition("test-topic", 0)
+        messages = [
+            Mock(partition=0, offset=offset, leader_epoch=1, value=json.dumps(_debezium_value()).encode())
+            for offset in (5, 6)
+        ]
+        messages.append(Mock(partition=0, offset=7, leader_epoch=1, value=None))
+        last_committed_offsets = {topic_partition: 5}
+
+        result = self.consumer._process_and_commit_batch(topic_partition, messages, last_committed_offsets)
+
+        self.assertTrue(result)
+        self.assertEqual(len(mock_process_batch.call_args.args[0]), 2)
+        self.consumer.offset_manager.store.assert_called_once_with(topic_partition, 7, 1)
+        self.consumer.offset_manager.commit.assert_called_once()
+        self.assertEqual(last_committed_offsets[topic_partition], 8)
+
+    def test_poll_batch_stops_at_max_size(self):
+        """Test that polling stops once the batch is full."""
+        topic_partition = TopicPartition("test-topic", 0)
+        self.consumer.is_consuming = True
+        self.consumer.consumer.poll.side_effect = [
+            {topic_partition: [Mock(offset=1), Mock(offset=2)]},
+            {topic_partition: [Mock(offset=3)]},
+        ]
+
+        records = self.consumer._poll_batch()
+
+        self.assertEqual([m.offset for m in records[topic_partition]], [1, 2, 3])
+        self.assertEqual(self.consumer.consumer.poll.call_count, 2)
+        self.assertEqual(self.consumer.consumer.poll.call_args.kwargs["max_records"], 1)
+
+
+class SingleMessageTokenFlushTests(TestCase):
+    """Tests for flushing consistency tokens in the single-message consumer mode."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.consumer = RBACKafkaConsumer()
+        self.consumer.consumer = Mock()
+        self.consumer.token_store = Mock(flush_interval=5.0)
+
+    def test_iterates_consumer_without_flush_interval(self):
+        """Test that the consumer is iterated directly when tokens are flushed after every message."""
+        self.consumer.token_store.flush_interval = 0
+        self.consumer.consumer.__iter__ = Mock(return_value=iter([Mock(offset=1)]))
+
+        self.assertEqual([m.offset for m in self.consumer._iter_messages()], [1])
+        self.consumer.consumer.poll.assert_not_called()
+
+    def _poll_one_message_then_stop(self):
+        """Make the consumer poll one message, then time out and stop on the following polls."""
+        topic_partition = TopicPartition("test-topic", 0)
+        self.consumer.is_consuming = True
+        self.consumer.token_store.should_flush.return_value = True
+
+        def poll(**kwargs):
+            if self.consumer.consumer.poll.call_count == 1:
+                return {topic_partition: [Mock(offset=1)]}
+            if self.consumer.consumer.poll.call_count == 3:
+                self.consumer.is_consuming = False
+            return {}
+
+        self.consumer.consumer.poll.side_effect = poll
+
+    @patch("core.kafka_consumer.close_old_connections")
+    def test_flushes_due_tokens_while_idle(self, close_old_connections):
+        """Test that due tokens are flushed on a checked connection when a poll times out without messages."""
+        self._poll_one_message_then_stop()
+
+        self.assertEqual([m.offset for m in self.consumer._iter_messages()], [1])
+        self.assertEqual(self.consumer.token_store.flush.call_count, 2)
+        self.assertEqual(close_old_connections.call_count, 2)
+        self.assertEqual(self.consumer.consumer.poll.call_args.kwargs, {"timeout_ms": 5000, "max_records": 1})
+
+    @patch("core.kafka_consumer.logger")
+    @patch("core.kafka_consumer.close_old_connections")
+    def test_failed_idle_flush_keeps_consuming(self, close_old_connections, mock_logger):
+        """Test that a failed flush while idle is logged and retried instead of stopping the consumer."""
+        self._poll_one_message_then_stop()
+        self.consumer.token_store.flush.side_effect = Exception("connection closed")
+
+        self.assertEqual([m.offset for m in self.consumer._iter_messages()], [1])
+        self.assertEqual(self.consumer.token_store.flush.call_count, 2)
+        self.assertEqual(mock_logger.warning.call_count, 2)
+
+
+class ConsistencyTokenStoreTests(TestCase):
+    """Tests for write-behind consistency token persistence."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.tenant_a = Tenant.objects.create(tenant_name="acct-a", org_id="org-a", account_id="a")
+        self.tenant_b = Tenant.objects.create(tenant_name="acct-b", org_id="org-b", account_id="b")
+        self.store = ConsistencyTokenStore(flush_interval=60)
+
+    def test_flush_writes_latest_token_per_org_in_one_query(self):
+        """Test that only the latest token per org is written, with a single UPDATE."""
+        self.store.record("org-a", "token-1")
+        self.store.record("org-a", "token-2")
+        self.store.record("org-b", "token-3")
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.store.flush(), 2)
+
+        self.tenant_a.refresh_from_db()
+        self.tenant_b.refresh_from_db()
+        self.assertEqual(self.tenant_a.relations_consistency_token, "token-2")
+        self.assertEqual(self.tenant_b.relations_consistency_token, "token-3")
+        self.assertEqual(self.tenant_a.account_id, "a")
+        self.assertEqual(self.store.pending, {})
+
+    def test_should_flush_respects_interval(self):
+        """Test that tokens are only due once the interval has elapsed."""
+        self.assertFalse(self.store.should_flush())
+        self.store.record("org-a", "token-1")
+        self.assertFalse(self.store.should_flush())
+        self.assertFalse(ConsistencyTokenStore(flush_interval=0).should_flush())
+
+        self.store.flush_interval = 0
+        self.assertTrue(self.store.should_flush())
+
+    @patch("core.kafka_consumer.KesselLookupCache.bump_generation")
+    def test_flush_invalidates_lookups_of_all_tenants_for_shared_relations(self, bump_generation):
+        """Test that Kessel lookups of all tenants are invalidated when relations of no regular tenant change."""
+        self.store.record("org-a", "token-1")
+        self.store.flush()
+        bump_generation.assert_not_called()
+
+        public_tenant, _ = Tenant.objects.get_or_create(tenant_name="public")
+        for record in (
+            lambda: self.store.record("unknown-org", "token-2"),
+            lambda: self.store.record(str(public_tenant.org_id), "token-3"),
+            self.store.record_shared_change,
+        ):
+            bump_generation.reset_mock()
+            record()
+            self.store.flush()
+            bump_generation.assert_called_once()
+            self.assertFalse(self.store.shared_changed)
+
+    @patch("core.kafka_consumer.logger")
+    def test_flush_logs_only_missing_org_ids(self, mock_logger):
+        """Test that only the org_ids without a tenant are reported as not found."""
+        self.store.record("org-a", "token-1")
+        self.store.record("unknown-org", "token-2")
+
+        self.assertEqual(self.store.flush(), 1)
+
+        mock_logger.warning.assert_called_once()
+        message = mock_logger.warning.call_args.args[0]
+        self.assertIn("['unknown-org']", message)
+        self.assertNotIn("org-a", message)
+
+    @patch("core.kafka_consumer.connection.cursor", side_effect=Exception("db down"))
+    def test_failed_flush_keeps_tokens(self, _):
+        """Test that tokens survive a failed flush."""
+        self.store.record("org-a", "token-1")
+
+        with self.assertRaises(Exception):
+            self.store.flush()
+
+        self.assertEqual(self.store.pending, {"org-a": "token-1"})
+
+    def test_offset_commit_flushes_tokens_first(self):
+        """Test that offsets are committed only after pending tokens are flushed."""
+        kafka_consumer = Mock()
+        topic_partition = TopicPartition("test-topic", 0)
+        kafka_consumer.assignment.return_value = {topic_partition}
+        offset_manager = OffsetManager(kafka_consumer, CommitConfig(), pre_commit=self.store.flush)
+        offset_manager.store(topic_partition, 10)
+        self.store.record("org-a", "token-1")
+
+        self.assertEqual(offset_manager.commit(), (True, 1))
+        self.tenant_a.refresh_from_db()
+        self.assertEqual(self.tenant_a.relations_consistency_token, "token-1")
+
+    def test_failed_flush_blocks_offset_commit(self):
+        """Test that offsets are not committed when the token flush fails."""
+        kafka_consumer = Mock()
+        offset_manager = OffsetManager(kafka_consumer, CommitConfig(), pre_commit=Mock(side_effect=Exception("db")))
+        offset_manager.store(TopicPartition("test-topic", 0), 10)
+
+        self.assertEqual(offset_manager.commit(), (False, 0))
+        kafka_consumer.commit.assert_not_called()
+        self.assertEqual(len(offset_manager.stored_offsets), 1)
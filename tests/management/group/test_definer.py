@@ -29,7 +29,7 @@ from management.group.definer import (
 )
 from management.role.definer import seed_roles
 from tests.identity_request import IdentityRequest
-from tests.core.test_kafka import copy_call_args
+from tests.core.test_kafka import copy_serialized_call_args
 from management.models import Group, Role, Policy
 
 
@@ -74,10 +74,10 @@ class GroupDefinerTests(IdentityRequest):
         self.assertEqual(group.tenant, self.public_tenant)
         group.roles().get(name="Approval Administrator Local Test")
 
-    @patch("core.kafka.RBACProducer.send_kafka_message")
-    def test_default_group_seeding_reassign_roles(self, send_kafka_message):
+    @patch("core.kafka.RBACProducer.send_serialized_kafka_message")
+    def test_default_group_seeding_reassign_roles(self, send_serialized_kafka_message):
         """Test that previous assigned roles would be eliminated before assigning new roles."""
-        kafka_mock = copy_call_args(send_kafka_message)
+        kafka_mock = copy_serialized_call_args(send_serialized_kafka_message)
         self.modify_default_group()
         new_platform_role = Role.objects.create(
             name="new_platform_role", platform_default=True, system=True, tenant=self.public_tenant
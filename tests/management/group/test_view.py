@@ -18,6 +18,7 @@
 
 import json
 import random
+import threading
 from datetime import timedelta
 from unittest.mock import call, patch, ANY, Mock
 from uuid import uuid4
@@ -3496,6 +3497,45 @@ class GroupPrincipalViewsetTests(GroupViewsetTests):
         self.assertEqual(len(response.data.get("data").get("serviceAccounts")), 3)
         self.assertEqual(len(response.data.get("data").get("users")), 1)
 
+    @override_settings(IT_BYPASS_TOKEN_VALIDATION=True)
+    @patch("management.principal.proxy.PrincipalProxy.request_filtered_principals")
+    @patch("management.principal.it_service.ITService.request_service_accounts")
+    def test_get_group_principal_both_types_concurrent(self, sa_mock, user_mock):
+        """Test that the users are requested from BOP while the service accounts are requested from IT."""
+        bop_requested = threading.Event()
+        waited_for_bop = []
+
+        def request_service_accounts(*args, **kwargs):
+            waited_for_bop.append(bop_requested.wait(5))
+            return [
+                {
+                    "clientId": uuid,
+                    "name": f"service_account_name_{uuid.split('-')[0]}",
+                    "description": f"Service Account description {uuid.split('-')[0]}",
+                    "owner": "jsmith",
+                    "username": "service_account-" + uuid,
+                    "time_created": 1706784741,
+                    "type": "service-account",
+                }
+                for uuid in self.sa_client_ids
+            ]
+
+        def request_filtered_principals(*args, **kwargs):
+            bop_requested.set()
+            return {"status_code": 200, "data": [{"username": "test-username", "is_active": True}]}
+
+        sa_mock.side_effect = request_service_accounts
+        user_mock.side_effect = request_filtered_principals
+
+        url = f"{reverse('v1_management:group-principals', kwargs={'uuid': self.group.uuid})}?principal_type=all"
+        client = APIClient()
+        response = client.get(url, **self.headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(waited_for_bop, [True])
+        self.assertEqual(len(response.data.get("data").get("serviceAccounts")), 3)
+        self.assertEqual(len(response.data.get("data").get("users")), 1)
+
     @override_settings(IT_BYPASS_TOKEN_VALIDATION=True)
     @patch("management.principal.proxy.PrincipalProxy.request_filtered_principals")
     @patch("management.principal.it_service.ITService.request_service_accounts")
@@ -3582,6 +3622,92 @@ class GroupPrincipalViewsetTests(GroupViewsetTests):
         self.assertEqual(len(response.data.get("data").get("users")), 1)
         self.assertTrue("serviceAccounts" not in response.data.get("data"))
 
+    @staticmethod
+    def echo_filtered_principals(usernames, org_id=None, options={}):
+        """Return the requested principals as BOP would, in an order of its own."""
+        return {"status_code": 200, "data": [{"username": username} for username in reversed(usernames)]}
+
+    @override_settings(GROUP_PRINCIPALS_DB_PAGINATION_ENABLED=True)
+    @patch("management.principal.proxy.PrincipalProxy.request_filtered_principals")
+    def test_get_group_principals_paginated_in_database(self, user_mock):
+        """Test that only the requested page of usernames is requested from BOP, and counted in the database."""
+        user_mock.side_effect = self.echo_filtered_principals
+        for index in range(1, 6):
+            self.group.principals.add(Principal.objects.create(username=f"db-page-user-{index}", tenant=self.tenant))
+
+        client = APIClient()
+        url = reverse("v1_management:group-principals", kwargs={"uuid": self.group.uuid})
+        response = client.get(f"{url}?principal_username=db-page&order_by=-username&limit=2&offset=1", **self.headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user_mock.assert_called_once_with(["db-page-user-4", "db-page-user-3"], org_id=ANY, options=ANY)
+        self.assertEqual(response.data.get("meta").get("count"), 5)
+        self.assertEqual(
+            [user.get("username") for user in response.data.get("data")], ["db-page-user-4", "db-page-user-3"]
+        )
+
+    @override_settings(GROUP_PRINCIPALS_DB_PAGINATION_ENABLED=True)
+    @patch("management.principal.proxy.PrincipalProxy.request_filtered_principals")
+    def test_get_group_principals_paginated_in_database_admin_only(self, user_mock):
+        """Test that every username is requested from BOP when only the organization administrators are listed."""
+        user_mock.return_value = {"status_code": 200, "data": [{"username": "mock_user", "is_org_admin": True}]}
+
+        client = APIClient()
+        url = reverse("v1_management:group-principals", kwargs={"uuid": self.group.uuid})
+        response = client.get(f"{url}?admin_only=true&limit=1", **self.headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertCountEqual(user_mock.call_args.args[0], [self.principal.username, self.principalB.username])
+        self.assertEqual(response.data.get("meta").get("count"), 1)
+
+    @override_settings(IT_BYPASS_TOKEN_VALIDATION=True, GROUP_PRINCIPALS_DB_PAGINATION_ENABLED=True)
+    @patch("management.principal.proxy.PrincipalProxy.request_filtered_principals")
+    @patch("management.principal.it_service.ITService.request_service_accounts")
+    def test_get_group_principal_both_types_paginated_in_database(self, sa_mock, user_mock):
+        """Test that listing both principal types requests from BOP only the users on the page."""
+        sa_mock.return_value = [
+            {
+                "clientId": client_id,
+                "name": f"service_account_name_{client_id.split('-')[0]}",
+                "description": f"Service Account description {client_id.split('-')[0]}",
+                "owner": "jsmith",
+                "username": "service_account-" + client_id,
+                "time_created": 1706784741,
+                "type": "service-account",
+            }
+            for client_id in self.sa_client_ids
+        ]
+        user_mock.side_effect = self.echo_filtered_principals
+        usernames = sorted([self.principal.username, self.principalB.username])
+
+        client = APIClient()
+        url = f"{reverse('v1_management:group-principals', kwargs={'uuid': self.group.uuid})}?principal_type=all"
+
+        # Page 1: 2 SA, no user is requested
+        response = client.get(f"{url}&order_by=username&limit=2&offset=0", **self.headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(int(response.data.get("meta").get("count")), 5)
+        self.assertTrue("users" not in response.data.get("data"))
+        user_mock.assert_not_called()
+
+        # Page 2: 1 SA + 1 U
+        response = client.get(f"{url}&order_by=username&limit=2&offset=2", **self.headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(int(response.data.get("meta").get("count")), 5)
+        self.assertEqual(len(response.data.get("data").get("serviceAccounts")), 1)
+        self.assertEqual([user.get("username") for user in response.data.get("data").get("users")], usernames[:1])
+        user_mock.assert_called_once_with(usernames[:1], org_id=ANY, options=ANY)
+
+        # Page 3: 1 U
+        response = client.get(f"{url}&order_by=username&limit=2&offset=4", **self.headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(int(response.data.get("meta").get("count")), 5)
+        self.assertTrue("serviceAccounts" not in response.data.get("data"))
+        self.assertEqual([user.get("username") for user in response.data.get("data").get("users")], usernames[1:])
+
     @override_settings(IT_BYPASS_TOKEN_VALIDATION=True)
     @patch("management.principal.it_service.ITService.request_service_accounts")
     def test_get_group_principal_both_types_usernames_only(self, sa_mock):
@@ -5926,7 +6052,7 @@ class GroupViewNonAdminTests(IdentityRequest):
 
     @override_settings(IT_BYPASS_TOKEN_VALIDATION=True)
     @patch("management.relation_replicator.outbox_replicator.OutboxReplicator._save_replication_event")
-    @patch("management.principal.it_service.requests.get")
+    @patch("management.principal.it_service.it_session.get")
     def test_add_service_account_principal_in_group_with_User_Access_Admin_success(self, mock_request, mock_method):
         """
         Test that non org admin with 'User Access administrator' role can add
@@ -0,0 +1,112 @@
+#
+# Copyright 2026 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Test the notification handlers."""
+
+from unittest.mock import ANY, patch
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from management.notifications.notification_handlers import fan_out_notification, notify_all
+
+from api.models import Tenant
+from tests.core.test_kafka import copy_serialized_call_args
+
+
+class FanOutNotificationTests(TestCase):
+    """Test sending notifications to all tenants."""
+
+    def setUp(self):
+        """Set up tenants to notify."""
+        super().setUp()
+        for org_id in ("fan1", "fan2", "fan3"):
+            Tenant.objects.create(tenant_name=f"acct{org_id}", org_id=org_id, ready=True)
+        Tenant.objects.create(tenant_name="unready", org_id="unready", ready=False)
+        self.org_ids = list(
+            Tenant.objects.exclude(tenant_name="public")
+            .filter(ready=True)
+            .order_by("id")
+            .values_list("org_id", flat=True)
+        )
+
+    @patch("core.kafka.RBACProducer.send_serialized_kafka_message")
+    def test_fan_out_notification(self, send_serialized_kafka_message):
+        """Test that every ready tenant gets the notification, reading tenants in chunks."""
+        kafka_mock = copy_serialized_call_args(send_serialized_kafka_message)
+        payload = {"username": "Red Hat", "name": "role", "uuid": "1234"}
+
+        with self.assertNumQueries(len(self.org_ids) // 2 + 1):
+            sent = fan_out_notification("rh-new-role-available", payload, chunk_size=2)
+
+        self.assertEqual(sent, len(self.org_ids))
+        self.assertEqual([c.args[1]["org_id"] for c in kafka_mock.call_args_list], self.org_ids)
+        kafka_mock.assert_any_call(
+            settings.NOTIFICATIONS_TOPIC,
+            {
+                "bundle": "console",
+                "application": "rbac",
+                "event_type": "rh-new-role-available",
+                "timestamp": ANY,
+                "events": [{"metadata": {}, "payload": payload}],
+                "org_id": "fan2",
+            },
+            [("rh-message-id", ANY)],
+        )
+        message_ids = {c.args[2][0][1] for c in kafka_mock.call_args_list}
+        self.assertEqual(len(message_ids), len(self.org_ids))
+
+    @override_settings(NOTIFICATIONS_FAN_OUT_IN_WORKER=True)
+    @patch("management.tasks.notify_all_in_worker")
+    @patch("core.kafka.RBACProducer.send_serialized_kafka_message")
+    def test_notify_all_in_worker(self, send_serialized_kafka_message, notify_all_in_worker):
+        """Test that the fan out is handed to a Celery task once the transaction commits."""
+        payload = {"username": "Red Hat", "name": "role", "uuid": "1234"}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_all("rh-new-role-available", payload)
+            notify_all_in_worker.delay.assert_not_called()
+
+        notify_all_in_worker.delay.assert_called_once_with("rh-new-role-available", payload)
+        send_serialized_kafka_message.assert_not_called()
+
+    @override_settings(NOTIFICATIONS_FAN_OUT_IN_WORKER=False, KAFKA_PRODUCER_DEFER_UNTIL_COMMIT=True)
+    @patch("core.kafka.RBACProducer.send_serialized_kafka_message")
+    def test_notify_all_inline_deferred_until_commit(self, send_serialized_kafka_message):
+        """Test that the inline fan out waits for the transaction to commit when sends are deferred."""
+        kafka_mock = copy_serialized_call_args(send_serialized_kafka_message)
+        payload = {"username": "Red Hat", "name": "role", "uuid": "1234"}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_all("rh-new-role-available", payload)
+            kafka_mock.assert_not_called()
+
+        self.assertEqual([c.args[1]["org_id"] for c in kafka_mock.call_args_list], self.org_ids)
+
+    @override_settings(NOTIFICATIONS_FAN_OUT_IN_WORKER=True)
+    @patch("management.cache.AccessCacheInvalidationQueue.flush")
+    @patch("management.tasks.notify_all_in_worker")
+    def test_notify_all_failure_does_not_skip_later_hooks(self, notify_all_in_worker, flush):
+        """Test that the cache invalidations of a commit still run when the fan out cannot be handed over."""
+        from management.cache import policy_invalidation_queue
+
+        notify_all_in_worker.delay.side_effect = ConnectionError("broker down")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_all("rh-new-role-available", {"uuid": "1234"})
+            policy_invalidation_queue.delete_policies("fan1", ["principal"])
+
+        notify_all_in_worker.delay.assert_called_once()
+        flush.assert_called_once()
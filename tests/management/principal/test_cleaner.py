@@ -30,7 +30,7 @@ from rest_framework import status
 from management.group.definer import seed_group
 from management.group.model import Group
 from management.policy.model import Policy
-from management.principal.cleaner import LOCK_ID, clean_tenant_principals
+from management.principal.cleaner import LOCK_ID, clean_tenant_principals, clean_tenants_principals
 from management.principal.model import Principal
 from management.principal.cleaner import (
     process_principal_events_from_umb,
@@ -178,6 +178,106 @@ class PrincipalCleanerTests(IdentityRequest):
             self.fail(msg="clean_tenant_principals encountered an exception")
         self.assertEqual(Principal.objects.count(), 1)
 
+    @override_settings(PRINCIPAL_CLEANUP_BATCH_SIZE=2)
+    @patch("management.principal.cleaner.PROXY.request_filtered_principals")
+    def test_principal_cleanup_checks_usernames_in_batches(self, request_filtered_principals):
+        """Test that usernames are checked in batches and missing principals are removed."""
+        request_filtered_principals.side_effect = lambda usernames, org_id: {
+            "status_code": status.HTTP_200_OK,
+            "data": [{"username": username.upper()} for username in usernames if username in ("user1", "user3")],
+        }
+        for username in ("user1", "user2", "user3", "user4", "user5"):
+            Principal.objects.create(username=username, tenant=self.tenant)
+
+        clean_tenant_principals(self.tenant)
+
+        self.assertEqual(
+            [c.args[0] for c in request_filtered_principals.call_args_list],
+            [["user1", "user2"], ["user3", "user4"], ["user5"]],
+        )
+        self.assertEqual(
+            sorted(Principal.objects.filter(tenant=self.tenant).values_list("username", flat=True)),
+            ["user1", "user3"],
+        )
+
+    @override_settings(PRINCIPAL_CLEANUP_BATCH_SIZE=2)
+    @patch("management.principal.cleaner.PROXY.request_filtered_principals")
+    def test_principal_cleanup_skips_failed_batches(self, request_filtered_principals):
+        """Test that principals of a batch BOP failed to check are kept."""
+        request_filtered_principals.side_effect = [
+            {"status_code": status.HTTP_504_GATEWAY_TIMEOUT},
+            {"status_code": status.HTTP_200_OK, "data": []},
+        ]
+        for username in ("user1", "user2", "user3"):
+            Principal.objects.create(username=username, tenant=self.tenant)
+
+        clean_tenant_principals(self.tenant)
+
+        self.assertEqual(
+            sorted(Principal.objects.filter(tenant=self.tenant).values_list("username", flat=True)),
+            ["user1", "user2"],
+        )
+
+
+@patch("management.principal.cleaner.PrincipalCleanupCheckpointCache")
+class CleanTenantsPrincipalsTests(IdentityRequest):
+    """Test the clean up of the principals of all tenants."""
+
+    def setUp(self):
+        """Set up tenants to clean up."""
+        super().setUp()
+        for org_id in ("cleanup1", "cleanup2", "cleanup3", "cleanup4", "cleanup5"):
+            Tenant.objects.create(tenant_name=f"acct{org_id}", org_id=org_id, ready=True)
+        self.tenant_ids = list(
+            Tenant.objects.filter(ready=True).exclude(tenant_name="public").order_by("id").values_list("id", flat=True)
+        )
+
+    @override_settings(PRINCIPAL_CLEANUP_CONCURRENCY=1)
+    @patch("management.principal.cleaner.clean_tenant_principals")
+    def test_resumes_from_checkpoint(self, clean_tenant_principals, checkpoint_class):
+        """Test that tenants up to the checkpoint are skipped and the checkpoint follows the cleaned tenants."""
+        checkpoint = checkpoint_class.return_value
+        checkpoint.get_checkpoint.return_value = self.tenant_ids[1]
+
+        clean_tenants_principals()
+
+        self.assertEqual([c.args[0].id for c in clean_tenant_principals.call_args_list], self.tenant_ids[2:])
+        self.assertEqual([c.args[0] for c in checkpoint.save_checkpoint.call_args_list], self.tenant_ids[2:])
+        checkpoint.delete_checkpoint.assert_called_once()
+
+    @override_settings(PRINCIPAL_CLEANUP_CONCURRENCY=2)
+    @patch("management.principal.cleaner._clean_tenant_principals_in_thread")
+    def test_cleans_tenants_concurrently(self, clean_in_thread, checkpoint_class):
+        """Test that tenants are cleaned from worker threads and checkpointed in order."""
+        checkpoint = checkpoint_class.return_value
+        checkpoint.get_checkpoint.return_value = 0
+
+        clean_tenants_principals()
+
+        self.assertEqual(sorted(c.args[0].id for c in clean_in_thread.call_args_list), self.tenant_ids)
+        self.assertEqual([c.args[0] for c in checkpoint.save_checkpoint.call_args_list], self.tenant_ids)
+        checkpoint.delete_checkpoint.assert_called_once()
+
+    @override_settings(PRINCIPAL_CLEANUP_CONCURRENCY=2)
+    @patch("management.principal.cleaner._clean_tenant_principals_in_thread")
+    def test_failure_keeps_checkpoint(self, clean_in_thread, checkpoint_class):
+        """Test that a failing tenant stops the job and leaves the checkpoint before it."""
+        checkpoint = checkpoint_class.return_value
+        checkpoint.get_checkpoint.return_value = 0
+        failing_id = self.tenant_ids[1]
+
+        def clean(tenant):
+            if tenant.id == failing_id:
+                raise RuntimeError("BOP unavailable")
+
+        clean_in_thread.side_effect = clean
+
+        with self.assertRaises(RuntimeError):
+            clean_tenants_principals()
+
+        self.assertEqual([c.args[0] for c in checkpoint.save_checkpoint.call_args_list], self.tenant_ids[:1])
+        checkpoint.delete_checkpoint.assert_not_called()
+
 
 FRAME_BODY = (
     b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<CanonicalMessage xmlns="http://esb.redhat.com/Canonical/6">\n    '
@@ -331,9 +431,9 @@ class PrincipalUMBTests(IdentityRequest):
             "data": [],
         },
     )
-    @patch("management.group.model.AccessCache")
+    @patch("management.group.model.policy_invalidation_queue")
     @patch("management.principal.cleaner.UMB_CLIENT")
-    def test_cleanup_principal_in_or_not_in_group(self, client_mock, cache_class, proxy_mock):
+    def test_cleanup_principal_in_or_not_in_group(self, client_mock, invalidation_queue, proxy_mock):
         """Test that we can run a principal clean up on a tenant with a principal in a group."""
         principal_name = "principal-test"
         self.principal = Principal(username=principal_name, tenant=self.tenant, user_id="56780000")
@@ -344,8 +444,8 @@ class PrincipalUMBTests(IdentityRequest):
         before = REGISTRY.get_sample_value(METRIC_STOMP_MESSAGES_ACK_TOTAL)
         client_mock.canRead.side_effect = [True, False]
         client_mock.receiveFrame.return_value = MagicMock(body=FRAME_BODY)
-        cache_mock = MagicMock()
-        cache_class.return_value = cache_mock
+        invalidated = []
+        invalidation_queue.delete_policies.side_effect = lambda org_id, uuids: invalidated.extend(uuids)
         process_principal_events_from_umb()
 
         after = REGISTRY.get_sample_value(METRIC_STOMP_MESSAGES_ACK_TOTAL)
@@ -355,7 +455,7 @@ class PrincipalUMBTests(IdentityRequest):
         self.assertFalse(Principal.objects.filter(username=principal_name).exists())
         self.group.refresh_from_db()
         self.assertFalse(self.group.principals.all())
-        cache_mock.delete_policy.assert_called_once_with(self.principal.uuid)
+        self.assertEqual(invalidated, [self.principal.uuid])
         self.assertTrue(before + 1 == after)
 
         # When principal not in group
@@ -957,10 +1057,12 @@ class PrincipalUMBTestsWithV2TenantBootstrap(PrincipalUMBTests):
             "data": [],
         },
     )
-    @patch("management.group.model.AccessCache")
+    @patch("management.group.model.policy_invalidation_queue")
     @patch("management.principal.cleaner.UMB_CLIENT")
     @patch("management.relation_replicator.outbox_replicator.OutboxReplicator.replicate")
-    def test_disable_principal_which_is_in_or_not_in_group(self, replicate, client_mock, cache_class, proxy_mock):
+    def test_disable_principal_which_is_in_or_not_in_group(
+        self, replicate, client_mock, invalidation_queue, proxy_mock
+    ):
         """Process a umb message to disable a principal which is either in or not in a group."""
         principal_name = "principal-test"
         self.principal = Principal.objects.create(username=principal_name, tenant=self.tenant, user_id="56780000")
@@ -993,8 +1095,8 @@ class PrincipalUMBTestsWithV2TenantBootstrap(PrincipalUMBTests):
         before = REGISTRY.get_sample_value(METRIC_STOMP_MESSAGES_ACK_TOTAL)
         client_mock.canRead.side_effect = [True, False]
         client_mock.receiveFrame.return_value = MagicMock(body=FRAME_BODY)
-        cache_mock = MagicMock()
-        cache_class.return_value = cache_mock
+        invalidated = []
+        invalidation_queue.delete_policies.side_effect = lambda org_id, uuids: invalidated.extend(uuids)
         self.assert_user_memberships(mapping, self.principal.user_id, custom_group_uuid, 1)
         replicate.side_effect = replicator.replicate
         process_principal_events_from_umb()
@@ -1006,7 +1108,7 @@ class PrincipalUMBTestsWithV2TenantBootstrap(PrincipalUMBTests):
         self.assertFalse(Principal.objects.filter(username=principal_name).exists())
         self.group.refresh_from_db()
         self.assertFalse(self.group.principals.all())
-        cache_mock.delete_policy.assert_called_once_with(self.principal.uuid)
+        self.assertEqual(invalidated, [self.principal.uuid])
         self.assertTrue(before + 1 == after)
         replicate.assert_called_once()
         replication_event = replicate.call_args_list[0].args[0]
@@ -1040,9 +1142,9 @@ class PrincipalUMBTestsWithV2TenantBootstrap(PrincipalUMBTests):
             "data": [],
         },
     )
-    @patch("management.group.model.AccessCache")
+    @patch("management.group.model.policy_invalidation_queue")
     @patch("management.principal.cleaner.UMB_CLIENT")
-    def test_disable_principal_without_user_id_in_group(self, client_mock, cache_class, proxy_mock):
+    def test_disable_principal_without_user_id_in_group(self, client_mock, invalidation_queue, proxy_mock):
         """Process a umb message to disable a principal which does not have user id."""
         principal_name = "principal-test"
         principal = Principal.objects.create(username=principal_name, tenant=self.tenant)
@@ -1053,8 +1155,8 @@ class PrincipalUMBTestsWithV2TenantBootstrap(PrincipalUMBTests):
         before = REGISTRY.get_sample_value(METRIC_STOMP_MESSAGES_ACK_TOTAL)
         client_mock.canRead.side_effect = [True, False]
         client_mock.receiveFrame.return_value = MagicMock(body=FRAME_BODY)
-        cache_mock = MagicMock()
-        cache_class.return_value = cache_mock
+        invalidated = []
+        invalidation_queue.delete_policies.side_effect = lambda org_id, uuids: invalidated.extend(uuids)
         process_principal_events_from_umb()
 
         after = REGISTRY.get_sample_value(METRIC_STOMP_MESSAGES_ACK_TOTAL)
@@ -1064,7 +1166,7 @@ class PrincipalUMBTestsWithV2TenantBootstrap(PrincipalUMBTests):
         self.assertFalse(Principal.objects.filter(username=principal_name).exists())
         self.group.refresh_from_db()
         self.assertFalse(self.group.principals.all())
-        cache_mock.delete_policy.assert_called_once_with(principal.uuid)
+        self.assertEqual(invalidated, [principal.uuid])
         self.assertTrue(before + 1 == after)
 
     @patch("management.principal.cleaner.retrieve_user_info")
@@ -17,6 +17,7 @@
 """Test the principal model."""
 
 import requests
+import time
 import uuid
 
 from django.conf import settings
@@ -303,7 +304,7 @@ class ITServiceTests(IdentityRequest):
                 "the time created and created at fields for the RBAC and IT models do not match",
             )
 
-    @mock.patch("management.principal.it_service.requests.get")
+    @mock.patch("management.principal.it_service.it_session.get")
     def test_request_service_accounts_single_page(self, get: mock.Mock):
         """Test that the function under test can handle fetching a single page of service accounts from IT"""
         # Create the mocked response from IT.
@@ -345,7 +346,7 @@ class ITServiceTests(IdentityRequest):
             it_service_accounts=mocked_service_accounts, rbac_service_accounts=result
         )
 
-    @mock.patch("management.principal.it_service.requests.get")
+    @mock.patch("management.principal.it_service.it_session.get")
     def test_request_service_accounts_multiple_pages(self, get: mock.Mock):
         """Test that the function under test can handle fetching multiple pages from IT"""
         # Create the mocked response from IT.
@@ -432,7 +433,7 @@ class ITServiceTests(IdentityRequest):
             it_service_accounts=mocked_service_accounts, rbac_service_accounts=result
         )
 
-    @mock.patch("management.principal.it_service.requests.get")
+    @mock.patch("management.principal.it_service.it_session.get")
     def test_request_service_accounts_unexpected_status_code(self, get: mock.Mock):
         """Test that the function under test raises an exception when an unexpected status code is received from IT"""
         get.__name__ = "get"
@@ -472,7 +473,7 @@ class ITServiceTests(IdentityRequest):
             timeout=settings.IT_SERVICE_TIMEOUT_SECONDS,
         )
 
-    @mock.patch("management.principal.it_service.requests.get")
+    @mock.patch("management.principal.it_service.it_session.get")
     def test_request_service_accounts_connection_error(self, get: mock.Mock):
         """Test that the function under test raises an exception a connection error happens when connecting to IT"""
         get.__name__ = "get"
@@ -511,7 +512,7 @@ class ITServiceTests(IdentityRequest):
             timeout=settings.IT_SERVICE_TIMEOUT_SECONDS,
         )
 
-    @mock.patch("management.principal.it_service.requests.get")
+    @mock.patch("management.principal.it_service.it_session.get")
     def test_request_service_accounts_timeout(self, get: mock.Mock):
         """Test that the function under test raises an exception a connection error happens when connecting to IT"""
         get.__name__ = "get"
@@ -785,6 +786,37 @@ class ITServiceTests(IdentityRequest):
             created_database_sa_principals=[first_sa, second_sa], function_result=result
         )
 
+    @mock.patch("management.principal.it_service.ITService.request_service_accounts")
+    def test_get_service_accounts_prefetched(self, request_service_accounts: mock.Mock):
+        """Test that the service accounts already requested from IT are not requested again"""
+        user = User()
+        user.account = self.tenant.account_id
+        user.org_id = self.tenant.org_id
+        tenant_one_service_accounts, _ = self._create_database_service_account_principals_two_tenants()
+        it_service_accounts = self.it_service._get_mock_service_accounts(tenant_one_service_accounts)
+
+        result, count = self.it_service.get_service_accounts(
+            user=user, options={"limit": 100, "offset": 0}, it_service_accounts=it_service_accounts
+        )
+
+        request_service_accounts.assert_not_called()
+        self.assertEqual(len(tenant_one_service_accounts), count)
+        self._assert_created_sa_and_result_are_same(
+            created_database_sa_principals=tenant_one_service_accounts, function_result=result
+        )
+
+    def test_estimate_service_accounts_count(self):
+        """Test that the service accounts are counted from the database unless IT only filters are given"""
+        user = User()
+        user.account = self.tenant.account_id
+        user.org_id = self.tenant.org_id
+        tenant_one_service_accounts, _ = self._create_database_service_account_principals_two_tenants()
+        first_sa: Principal = tenant_one_service_accounts[0]
+
+        self.assertEqual(len(tenant_one_service_accounts), self.it_service.estimate_service_accounts_count(user, {}))
+        self.assertEqual(1, self.it_service.estimate_service_accounts_count(user, {"usernames": first_sa.username}))
+        self.assertIsNone(self.it_service.estimate_service_accounts_count(user, {"name": "service account"}))
+
     @mock.patch("management.principal.it_service.ITService.request_service_accounts")
     def test_get_service_accounts_filter_partial_match_username(self, request_service_accounts: mock.Mock):
         """Test the function under test returns the expected service account when filtering by partial match criteria"""
@@ -1617,3 +1649,138 @@ class ITServiceTests(IdentityRequest):
             count,
             "unexpected number of service accounts fetched for the tenant",
         )
+
+
+class SynchronousThread:
+    """Run the target of a thread as soon as it is started."""
+
+    def __init__(self, target, args=(), **kwargs):
+        self.target = target
+        self.args = args
+
+    def start(self):
+        self.target(*self.args)
+
+
+@override_settings(IT_SERVICE_ACCOUNTS_CACHE_ENABLED=True, IT_SERVICE_ACCOUNTS_CACHE_LIFETIME=60)
+@mock.patch("management.principal.it_service.threading.Thread", SynchronousThread)
+@mock.patch("management.principal.it_service.ITServiceAccountsCache.acquire_refresh_lock", return_value=True)
+@mock.patch("management.principal.it_service.ITServiceAccountsCache.save_snapshot")
+@mock.patch("management.principal.it_service.ITServiceAccountsCache.get_snapshot")
+@mock.patch("management.principal.it_service.ITService.request_service_accounts")
+class ITServiceAccountsSnapshotTests(IdentityRequest):
+    """Test serving the tenant's service accounts from a snapshot."""
+
+    def setUp(self):
+        """Set up the user and the service accounts in IT."""
+        super().setUp()
+        self.it_service = ITService()
+        self.user = User()
+        self.user.org_id = "1234"
+        self.user.bearer_token = "mocked-bt"
+        self.service_accounts = [
+            {"clientId": "b6636c60-a31d-013c-b93d-6aa2427b506c", "name": "first", "type": "service-account"},
+            {"clientId": "69a116a0-a3d4-013c-b940-6aa2427b506c", "name": "second", "type": "service-account"},
+        ]
+        self.indexed = {sa["clientId"]: sa for sa in self.service_accounts}
+
+    def snapshot(self, age):
+        """Return a snapshot of the service accounts taken the given seconds ago."""
+        return {"taken_at": time.time() - age, "service_accounts": self.indexed}
+
+    def test_no_snapshot(self, request_service_accounts, get_snapshot, save_snapshot, acquire_refresh_lock):
+        """Test that a missing snapshot is taken right away."""
+        request_service_accounts.return_value = self.service_accounts
+        get_snapshot.return_value = None
+
+        result = self.it_service.get_service_accounts_by_client_id(self.user)
+
+        self.assertEqual(result, self.indexed)
+        self.assertEqual(list(result), [sa["clientId"] for sa in self.service_accounts])
+        request_service_accounts.assert_called_once_with(bearer_token="mocked-bt")
+        save_snapshot.assert_called_once_with("1234", self.indexed)
+
+    def test_fresh_snapshot(self, request_service_accounts, get_snapshot, save_snapshot, acquire_refresh_lock):
+        """Test that a fresh snapshot is served without calling IT."""
+        get_snapshot.return_value = self.snapshot(age=10)
+
+        self.assertEqual(self.it_service.get_service_accounts_by_client_id(self.user), self.indexed)
+
+        request_service_accounts.assert_not_called()
+        save_snapshot.assert_not_called()
+
+    def test_stale_snapshot(self, request_service_accounts, get_snapshot, save_snapshot, acquire_refresh_lock):
+        """Test that a stale snapshot is served and refreshed in the background."""
+        request_service_accounts.return_value = self.service_accounts[:1]
+        get_snapshot.return_value = self.snapshot(age=120)
+
+        with mock.patch(
+            "management.principal.it_service.ITServiceAccountsCache.release_refresh_lock"
+        ) as release_refresh_lock:
+            self.assertEqual(self.it_service.get_service_accounts_by_client_id(self.user), self.indexed)
+
+        acquire_refresh_lock.assert_called_once_with("1234")
+        save_snapshot.assert_called_once_with("1234", {self.service_accounts[0]["clientId"]: self.service_accounts[0]})
+        release_refresh_lock.assert_called_once_with("1234")
+
+    def test_stale_snapshot_refresh_fails(
+        self, request_service_accounts, get_snapshot, save_snapshot, acquire_refresh_lock
+    ):
+        """Test that the refresh lock is released when the background refresh fails."""
+        request_service_accounts.side_effect = Exception("IT is down")
+        get_snapshot.return_value = self.snapshot(age=120)
+
+        with mock.patch(
+            "management.principal.it_service.ITServiceAccountsCache.release_refresh_lock"
+        ) as release_refresh_lock:
+            self.assertEqual(self.it_service.get_service_accounts_by_client_id(self.user), self.indexed)
+
+        save_snapshot.assert_not_called()
+        release_refresh_lock.assert_called_once_with("1234")
+
+    def test_stale_snapshot_refreshing(
+        self, request_service_accounts, get_snapshot, save_snapshot, acquire_refresh_lock
+    ):
+        """Test that a stale snapshot is not refreshed again while another worker refreshes it."""
+        get_snapshot.return_value = self.snapshot(age=120)
+        acquire_refresh_lock.return_value = False
+
+        self.assertEqual(self.it_service.get_service_accounts_by_client_id(self.user), self.indexed)
+
+        request_service_accounts.assert_not_called()
+
+    def test_stale_snapshot_not_allowed(
+        self, request_service_accounts, get_snapshot, save_snapshot, acquire_refresh_lock
+    ):
+        """Test that a stale snapshot is refreshed right away when it may not be served."""
+        request_service_accounts.return_value = self.service_accounts[:1]
+        get_snapshot.return_value = self.snapshot(age=120)
+
+        result = self.it_service.get_service_accounts_by_client_id(self.user, allow_stale=False)
+
+        self.assertEqual(list(result), [self.service_accounts[0]["clientId"]])
+        acquire_refresh_lock.assert_not_called()
+
+    def test_snapshot_missing_client_id(
+        self, request_service_accounts, get_snapshot, save_snapshot, acquire_refresh_lock
+    ):
+        """Test that a fresh snapshot is refreshed when it lacks a required service account."""
+        created = {"clientId": "9fa1d9c6-a3d4-013c-b940-6aa2427b506c", "name": "new", "type": "service-account"}
+        request_service_accounts.return_value = self.service_accounts + [created]
+        get_snapshot.return_value = self.snapshot(age=10)
+
+        self.assertTrue(
+            self.it_service._is_service_account_valid(user=self.user, client_id=created["clientId"]),
+        )
+        request_service_accounts.assert_called_once_with(bearer_token="mocked-bt")
+
+    @override_settings(IT_SERVICE_ACCOUNTS_CACHE_ENABLED=False)
+    def test_snapshot_disabled(self, request_service_accounts, get_snapshot, save_snapshot, acquire_refresh_lock):
+        """Test that IT is called every time when the snapshot is disabled."""
+        request_service_accounts.return_value = self.service_accounts
+
+        self.assertEqual(self.it_service.get_service_accounts_by_client_id(self.user), self.indexed)
+        self.assertEqual(self.it_service.get_service_accounts_by_client_id(self.user), self.indexed)
+
+        self.assertEqual(request_service_accounts.call_count, 2)
+        get_snapshot.assert_not_called()
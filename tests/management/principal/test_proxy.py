@@ -16,9 +16,12 @@
 #
 """Test the principal proxy."""
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from rest_framework import status
 import requests
 
@@ -259,3 +262,102 @@ class PrincipalProxyTest(TestCase):
         usernames.sort()
         expected = ["user1", "user2"]
         self.assertEqual(usernames, expected)
+
+
+@override_settings(PRINCIPAL_LOOKUP_CACHE_ENABLED=True)
+class RequestPrincipalTest(TestCase):
+    """Test looking up a single principal through the cache."""
+
+    def setUp(self):
+        """Set up a dict-backed lookup cache."""
+        super().setUp()
+        self.cached = {}
+        get_patcher = patch(
+            "management.principal.proxy.PrincipalLookupCache.get_lookup",
+            side_effect=lambda org_id, username, params: self.cached.get((org_id, username, params)),
+        )
+        save_patcher = patch(
+            "management.principal.proxy.PrincipalLookupCache.save_lookup",
+            side_effect=lambda org_id, username, params, resp: self.cached.update({(org_id, username, params): resp}),
+        )
+        self.get_lookup = get_patcher.start()
+        self.save_lookup = save_patcher.start()
+        self.addCleanup(patch.stopall)
+
+    @patch("management.principal.proxy.PrincipalProxy.request_filtered_principals")
+    def test_request_principal_cached(self, request_filtered_principals):
+        """Test that found and unknown principals are both served from the cache after the first lookup."""
+        found = {"status_code": 200, "data": [{"username": "user1", "is_org_admin": True}]}
+        not_found = {"status_code": 200, "data": []}
+        request_filtered_principals.side_effect = [found, not_found]
+        proxy = PrincipalProxy()
+
+        for _ in range(2):
+            self.assertEqual(proxy.request_principal("user1", org_id="1234", options={}), found)
+            self.assertEqual(proxy.request_principal("unknown", org_id="1234", options={}), not_found)
+
+        self.assertEqual(request_filtered_principals.call_count, 2)
+        request_filtered_principals.assert_any_call(["unknown"], org_id="1234", options={})
+        self.assertEqual(self.save_lookup.call_count, 2)
+
+    @patch("management.principal.proxy.PrincipalProxy.request_filtered_principals")
+    def test_request_principal_options_in_key(self, request_filtered_principals):
+        """Test that lookups with different query parameters are cached separately."""
+        request_filtered_principals.return_value = {"status_code": 200, "data": [{"username": "user1"}]}
+        proxy = PrincipalProxy()
+
+        proxy.request_principal("user1", org_id="1234", options={})
+        proxy.request_principal("user1", org_id="1234", options={"return_id": True})
+        proxy.request_principal("user1", org_id="1234", options={"status": "disabled"})
+
+        self.assertEqual(request_filtered_principals.call_count, 3)
+
+    @patch("management.principal.proxy.PrincipalProxy.request_filtered_principals")
+    def test_request_principal_errors_not_cached(self, request_filtered_principals):
+        """Test that failed lookups are retried against BOP."""
+        request_filtered_principals.return_value = {"status_code": 500, "errors": [{"detail": "Unexpected error."}]}
+        proxy = PrincipalProxy()
+
+        proxy.request_principal("user1", org_id="1234")
+        proxy.request_principal("user1", org_id="1234")
+
+        self.assertEqual(request_filtered_principals.call_count, 2)
+        self.save_lookup.assert_not_called()
+
+    @override_settings(PRINCIPAL_LOOKUP_CACHE_ENABLED=False)
+    @patch("management.principal.proxy.PrincipalProxy.request_filtered_principals")
+    def test_request_principal_cache_disabled(self, request_filtered_principals):
+        """Test that every lookup goes to BOP when the cache is disabled."""
+        request_filtered_principals.return_value = {"status_code": 200, "data": [{"username": "user1"}]}
+        proxy = PrincipalProxy()
+
+        proxy.request_principal("user1", org_id="1234")
+        proxy.request_principal("user1", org_id="1234")
+
+        self.assertEqual(request_filtered_principals.call_count, 2)
+        self.get_lookup.assert_not_called()
+
+    @patch("management.principal.proxy.PrincipalProxy.request_filtered_principals")
+    def test_request_principal_concurrent_lookups(self, request_filtered_principals):
+        """Test that concurrent lookups of the same principal share a single request to BOP."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_request(*args, **kwargs):
+            started.set()
+            release.wait(5)
+            return {"status_code": 200, "data": [{"username": "user1"}]}
+
+        request_filtered_principals.side_effect = slow_request
+        proxy = PrincipalProxy()
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            leader = executor.submit(proxy.request_principal, "user1", "1234")
+            started.wait(5)
+            followers = [executor.submit(proxy.request_principal, "user1", "1234") for _ in range(2)]
+            time.sleep(0.1)
+            release.set()
+            results = [leader.result()] + [follower.result() for follower in followers]
+
+        self.assertEqual(request_filtered_principals.call_count, 1)
+        self.assertEqual(results, [{"status_code": 200, "data": [{"username": "user1"}]}] * 3)
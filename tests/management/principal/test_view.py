@@ -16,6 +16,7 @@
 #
 """Test the principal viewset."""
 
+import threading
 from datetime import datetime
 from unittest.mock import patch, ANY
 from uuid import uuid4
@@ -3178,3 +3179,53 @@ class PrincipalViewsetAllTypesTests(IdentityRequest):
         users = response.data.get("data").get("users")
         self.assertEqual(len(users), 4)
         self.assertEqual(response.data.get("meta").get("count"), 4)
+
+    @patch("management.principal.proxy.PrincipalProxy.request_principals")
+    @patch("management.principal.it_service.ITService.request_service_accounts")
+    def test_read_principal_all_requests_it_and_bop_concurrently(self, mock_sa, mock_user):
+        """Test that the users are requested from BOP while the service accounts are requested from IT."""
+        bop_requested = threading.Event()
+        waited_for_bop = []
+
+        def request_service_accounts(*args, **kwargs):
+            waited_for_bop.append(bop_requested.wait(5))
+            return self.mocked_service_accounts
+
+        def request_principals(*args, **kwargs):
+            bop_requested.set()
+            return self.mocked_users
+
+        mock_sa.side_effect = request_service_accounts
+        mock_user.side_effect = request_principals
+
+        client = APIClient()
+        url = f"{reverse('v1_management:principals')}?type=all&limit=2&offset=2"
+        response = client.get(url, **self.headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(waited_for_bop, [True])
+        self.assertEqual(len(response.data.get("data").get("serviceAccounts")), 1)
+        self.assertEqual(response.data.get("meta").get("count"), 6)
+        mock_user.assert_called_once_with(org_id=ANY, limit=1, offset=0, options=ANY)
+
+    @patch("management.principal.view.PrincipalView.users_from_proxy")
+    @patch("management.principal.it_service.ITService.request_service_accounts")
+    def test_read_principal_all_service_account_estimate_wrong(self, mock_sa, mock_user):
+        """Test that the users are requested again when IT returns fewer service accounts than the database has."""
+        # Only 2 of the 3 service accounts in the database are known to IT.
+        mock_sa.return_value = self.mocked_service_accounts[:2]
+        mock_user.return_value = {
+            "status_code": 200,
+            "data": {"userCount": 3, "users": [{"username": "test_user1"}, {"username": "test_user2"}]},
+        }, ""
+
+        client = APIClient()
+        url = f"{reverse('v1_management:principals')}?type=all&limit=2&offset=2"
+        response = client.get(url, **self.headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("serviceAccounts", response.data.get("data"))
+        self.assertEqual(len(response.data.get("data").get("users")), 2)
+        self.assertEqual(response.data.get("meta").get("count"), 5)
+        # The estimate of 3 service accounts asked for 1 user, while the page actually starts with the first 2 users.
+        self.assertEqual([c.args[3:] for c in mock_user.call_args_list], [(1, 0), (2, 0)])
@@ -0,0 +1,218 @@
+#
+# Copyright 2026 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Test RelationsApiReplicator."""
+
+from concurrent.futures import Future
+from contextlib import nullcontext
+from unittest.mock import MagicMock, patch
+
+import grpc
+from django.test import TestCase, override_settings
+from kessel.relations.v1beta1 import common_pb2, relation_tuples_pb2
+from management.relation_replicator.relations_api_replicator import RelationsApiReplicator
+from management.relation_replicator.types import RelationTuple
+from migration_tool.utils import create_relationship
+
+
+class FakeRpcError(grpc.RpcError):
+    """gRPC error with a status code."""
+
+    def __init__(self, code):
+        """Init the error."""
+        self._code = code
+
+    def code(self):
+        """Return the status code."""
+        return self._code
+
+    def details(self):
+        """Return the error details."""
+        return "fake error"
+
+
+def resolved(response):
+    """Return a future already resolved with the response."""
+    future = Future()
+    future.set_result(response)
+    return future
+
+
+@patch("management.relation_replicator.relations_api_replicator.jwt_manager.get_jwt_from_redis", return_value=None)
+@patch("management.relation_replicator.relations_api_replicator.create_client_channel_relation")
+@patch("management.relation_replicator.relations_api_replicator.relation_tuples_pb2_grpc.KesselTupleServiceStub")
+class RelationsApiReplicatorDeleteTest(TestCase):
+    """Test deleting relationships through the Relations API."""
+
+    def setUp(self):
+        """Set up the relationships to delete."""
+        self.replicator = RelationsApiReplicator()
+        self.relationships = [
+            create_relationship(("rbac", "role_binding"), "b1", ("rbac", "principal"), f"p{i}", "subject")
+            for i in range(5)
+        ]
+        self.fencing_check = relation_tuples_pb2.FencingCheck(lock_id="rbac/0", lock_token="token")
+
+    def _stub(self, stub_class, channel, futures):
+        channel.return_value = nullcontext(MagicMock())
+        stub = stub_class.return_value
+        stub.DeleteTuples.future.side_effect = futures
+        return stub
+
+    def test_duplicates_are_deleted_once(self, stub_class, channel, _):
+        """Test that identical relationships only cost a single delete."""
+        stub = self._stub(stub_class, channel, lambda request, metadata: resolved(MagicMock()))
+
+        self.replicator.delete_relationships(self.relationships + self.relationships[:2], self.fencing_check)
+
+        self.assertEqual(stub.DeleteTuples.future.call_count, 5)
+        subject_ids = [c.args[0].filter.subject_filter.subject_id for c in stub.DeleteTuples.future.call_args_list]
+        self.assertEqual(subject_ids, ["p0", "p1", "p2", "p3", "p4"])
+        for c in stub.DeleteTuples.future.call_args_list:
+            self.assertEqual(c.args[0].fencing_check, self.fencing_check)
+
+    @override_settings(RELATIONS_API_DELETE_CONCURRENCY=2)
+    def test_deletes_are_pipelined_within_window(self, stub_class, channel, _):
+        """Test that no more than the configured number of deletes are in flight."""
+        pending = []
+
+        def issue(request, metadata):
+            self.assertLessEqual(len([f for f in pending if not f.done()]), 1)
+            future = Future()
+            pending.append(future)
+            # Resolve the previous call only once the next one was issued
+            if len(pending) > 1:
+                pending[-2].set_result(MagicMock())
+            return future
+
+        stub = self._stub(stub_class, channel, issue)
+        original_result = Future.result
+
+        def result(future, timeout=None):
+            if not future.done():
+                future.set_result(MagicMock())
+            return original_result(future, timeout)
+
+        with patch.object(Future, "result", result):
+            self.replicator.delete_relationships(self.relationships, self.fencing_check)
+        self.assertEqual(stub.DeleteTuples.future.call_count, 5)
+
+    def test_returns_last_acknowledged_response(self, stub_class, channel, _):
+        """Test that the consistency token comes from the call the server acknowledged last."""
+        futures = [Future() for _ in self.relationships]
+        responses = [MagicMock(name=f"response{i}") for i in range(len(futures))]
+        self._stub(stub_class, channel, futures)
+
+        original_result = Future.result
+
+        def result(future, timeout=None):
+            # The server acknowledges the calls in reverse order
+            for i in reversed(range(len(futures))):
+                if not futures[i].done():
+                    futures[i].set_result(responses[i])
+            return original_result(future, timeout)
+
+        with patch.object(Future, "result", result):
+            response = self.replicator.delete_relationships(self.relationships, self.fencing_check)
+        self.assertIs(response, responses[0])
+
+    def test_failed_fencing_check_cancels_pending_deletes(self, stub_class, channel, _):
+        """Test that an invalid fencing token fails the whole batch."""
+        failed = Future()
+        failed.set_exception(FakeRpcError(grpc.StatusCode.FAILED_PRECONDITION))
+        pending = [Future() for _ in self.relationships[1:]]
+        self._stub(stub_class, channel, [failed] + pending)
+
+        with self.assertRaises(grpc.RpcError):
+            self.replicator.delete_relationships(self.relationships, self.fencing_check)
+        self.assertTrue(all(future.cancelled() for future in pending))
+
+
+@patch("management.relation_replicator.relations_api_replicator.jwt_manager.get_jwt_from_redis", return_value=None)
+@patch("management.relation_replicator.relations_api_replicator.create_client_channel_relation")
+@patch("management.relation_replicator.relations_api_replicator.relation_tuples_pb2_grpc.KesselTupleServiceStub")
+class RelationsApiReplicatorIterTuplesTest(TestCase):
+    """Test streaming tuples from the Relations API."""
+
+    def setUp(self):
+        """Set up the streamed relationships."""
+        self.replicator = RelationsApiReplicator()
+        self.relationships = [
+            create_relationship(("rbac", "role_binding"), "b1", ("rbac", "principal"), f"p{i}", "subject")
+            for i in range(3)
+        ]
+
+    def _response(self, relationship, token):
+        return relation_tuples_pb2.ReadTuplesResponse(
+            tuple=relationship.as_message(), pagination=common_pb2.ResponsePagination(continuation_token=token)
+        )
+
+    def _stub(self, stub_class, channel, pages):
+        channel.return_value = nullcontext(MagicMock())
+        stub = stub_class.return_value
+        stub.ReadTuples.side_effect = pages
+        return stub
+
+    def test_tuples_are_decoded_across_pages(self, stub_class, channel, _):
+        """Test that tuples are decoded from the messages and continuation tokens are followed."""
+        stub = self._stub(
+            stub_class,
+            channel,
+            [
+                [self._response(self.relationships[0], "t1"), self._response(self.relationships[1], "t2")],
+                [self._response(self.relationships[2], "t3")],
+                [],
+            ],
+        )
+
+        tuples = list(self.replicator.iter_tuples("role_binding", "b1", "subject", "principal", page_size=2))
+
+        self.assertTrue(all(isinstance(t, RelationTuple) for t in tuples))
+        self.assertEqual(tuples, self.relationships)
+        self.assertEqual(stub.ReadTuples.call_count, 3)
+        requests = [c.args[0] for c in stub.ReadTuples.call_args_list]
+        self.assertEqual([r.pagination.limit for r in requests], [2, 2, 2])
+        self.assertEqual([r.pagination.continuation_token for r in requests], ["", "t2", "t3"])
+        self.assertEqual(requests[0].filter.resource_id, "b1")
+        self.assertEqual(requests[0].filter.subject_filter.subject_type, "principal")
+
+    def test_tuples_are_streamed_lazily(self, stub_class, channel, _):
+        """Test that the next page is not requested before the current one has been consumed."""
+        stub = self._stub(stub_class, channel, [[self._response(self.relationships[0], "t1")], []])
+
+        tuples = self.replicator.iter_tuples("role_binding", "b1")
+        next(tuples)
+
+        self.assertEqual(stub.ReadTuples.call_count, 1)
+        self.assertEqual(list(tuples), [])
+        self.assertEqual(stub.ReadTuples.call_count, 2)
+
+    def test_stops_on_missing_or_repeated_token(self, stub_class, channel, _):
+        """Test that the stream stops when Kessel does not hand out a new continuation token."""
+        for pages in (
+            [[self._response(self.relationships[0], "")]],
+            [[self._response(self.relationships[0], "t1")], [self._response(self.relationships[1], "t1")]],
+        ):
+            with self.subTest(pages=len(pages)):
+                stub = self._stub(stub_class, channel, pages)
+
+                with patch("management.relation_replicator.relations_api_replicator.logger") as logger:
+                    tuples = list(self.replicator.iter_tuples("role_binding", "b1"))
+
+                logger.warning.assert_called_once()
+                self.assertEqual(len(tuples), len(pages))
+                self.assertEqual(stub.ReadTuples.call_count, len(pages))
+                stub.ReadTuples.reset_mock()
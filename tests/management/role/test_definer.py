@@ -52,7 +52,7 @@ from migration_tool.in_memory_tuples import (
     resource,
     subject,
 )
-from tests.core.test_kafka import copy_call_args
+from tests.core.test_kafka import copy_serialized_call_args
 from tests.identity_request import IdentityRequest
 from tests.management.role.test_dual_write import RbacFixture
 
@@ -95,9 +95,9 @@ class RoleDefinerTests(IdentityRequest):
         super().setUp()
         self.public_tenant = Tenant.objects.get(tenant_name="public")
 
-    @patch("core.kafka.RBACProducer.send_kafka_message")
-    def test_role_create(self, send_kafka_message):
-        kafka_mock = copy_call_args(send_kafka_message)
+    @patch("core.kafka.RBACProducer.send_serialized_kafka_message")
+    def test_role_create(self, send_serialized_kafka_message):
+        kafka_mock = copy_serialized_call_args(send_serialized_kafka_message)
         """Test that we can run a role seeding update."""
         with self.settings(NOTIFICATIONS_RH_ENABLED=True, NOTIFICATIONS_ENABLED=True):
             self.try_seed_roles()
@@ -161,10 +161,10 @@ class RoleDefinerTests(IdentityRequest):
         roles = Role.objects.filter(platform_default=True)
         self.assertTrue(len(roles))
 
-    @patch("core.kafka.RBACProducer.send_kafka_message")
-    def test_role_update_platform_default_role(self, send_kafka_message):
+    @patch("core.kafka.RBACProducer.send_serialized_kafka_message")
+    def test_role_update_platform_default_role(self, send_serialized_kafka_message):
         """Test that role seeding updates send out notification."""
-        kafka_mock = copy_call_args(send_kafka_message)
+        kafka_mock = copy_serialized_call_args(send_serialized_kafka_message)
         self.try_seed_roles()
 
         # Update non platform default role
@@ -21,6 +21,7 @@ import uuid
 from unittest.mock import patch
 
 from django.test import TestCase, override_settings
+from prometheus_client import REGISTRY
 from management.principal.model import Principal as PrincipalModel
 from management.relation_replicator.outbox_replicator import OutboxReplicator
 from management.relation_replicator.relation_replicator import RelationReplicator, ReplicationEventType
@@ -835,6 +836,92 @@ class RoleBindingServiceTests(IdentityRequest):
         parent_binding.delete()
         parent_group.delete()
 
+    def _create_binding(self, resource_type, resource_id):
+        """Create a binding of the test role on a resource."""
+        return RoleBinding.objects.create(
+            role=self.role, resource_type=resource_type, resource_id=resource_id, tenant=self.tenant
+        )
+
+    def test_lookup_binding_uuids_in_database(self):
+        """Test that a workspace inherits the bindings of its ancestors and its tenant, but not of other workspaces."""
+        default_binding = self._create_binding("workspace", str(self.default_workspace.id))
+        root_binding = self._create_binding("workspace", str(self.root_workspace.id))
+        tenant_binding = self._create_binding("tenant", self.tenant.tenant_resource_id())
+        child = Workspace.objects.create(name="Child", tenant=self.tenant, parent=self.workspace)
+        sibling = Workspace.objects.create(name="Sibling", tenant=self.tenant, parent=self.default_workspace)
+        self._create_binding("workspace", str(child.id))
+        self._create_binding("workspace", str(sibling.id))
+
+        with self.assertNumQueries(1):
+            binding_uuids = self.service._lookup_binding_uuids_in_database("workspace", str(self.workspace.id))
+
+        self.assertCountEqual(
+            binding_uuids,
+            [str(b.uuid) for b in (self.binding, default_binding, root_binding, tenant_binding)],
+        )
+        child.delete()
+
+    def test_lookup_binding_uuids_in_database_for_other_resources(self):
+        """Test that unknown workspaces inherit nothing and other resources only have their own bindings."""
+        tenant_binding = self._create_binding("tenant", self.tenant.tenant_resource_id())
+
+        self.assertEqual(self.service._lookup_binding_uuids_in_database("workspace", str(uuid.uuid4())), [])
+        self.assertEqual(self.service._lookup_binding_uuids_in_database("workspace", "not-a-uuid"), [])
+        self.assertEqual(
+            self.service._lookup_binding_uuids_in_database("tenant", self.tenant.tenant_resource_id()),
+            [str(tenant_binding.uuid)],
+        )
+
+    @patch("management.role_binding.service.RoleBindingService._lookup_binding_uuids_via_relations")
+    def test_get_role_bindings_by_subject_with_database_resolver(self, mock_lookup):
+        """Test that the database resolver selected for the request does not call the Relations API."""
+        parent_group = Group.objects.create(name="parent_group", tenant=self.tenant)
+        RoleBindingGroup.objects.create(
+            group=parent_group, binding=self._create_binding("workspace", str(self.default_workspace.id))
+        )
+        params = {
+            "resource_id": str(self.workspace.id),
+            "resource_type": "workspace",
+            "inheritance_resolver": "database",
+        }
+
+        queryset = self.service.get_role_bindings_by_subject(params)
+
+        mock_lookup.assert_not_called()
+        self.assertCountEqual(queryset.values_list("name", flat=True), ["test_group", "parent_group"])
+
+    @override_settings(ROLE_BINDING_INHERITANCE_RESOLVER="shadow")
+    @patch("management.role_binding.service.RoleBindingService._lookup_binding_uuids_via_relations")
+    def test_get_role_bindings_by_subject_in_shadow_mode(self, mock_lookup):
+        """Test that shadow mode serves the Relations API result and counts whether the database agrees."""
+        default_binding = self._create_binding("workspace", str(self.default_workspace.id))
+        params = {"resource_id": str(self.workspace.id), "resource_type": "workspace"}
+
+        def comparisons(result):
+            return (
+                REGISTRY.get_sample_value(
+                    "role_binding_inherited_bindings_shadow_comparisons_total", {"result": result}
+                )
+                or 0
+            )
+
+        mock_lookup.return_value = [str(self.binding.uuid), str(default_binding.uuid)]
+        matches = comparisons("match")
+        self.assertEqual(self.service.get_role_bindings_by_subject(params).count(), 1)
+        self.assertEqual(comparisons("match"), matches + 1)
+
+        mock_lookup.return_value = [str(self.binding.uuid)]
+        mismatches = comparisons("mismatch")
+        with patch("management.role_binding.service.logger") as mock_logger:
+            self.service.get_role_bindings_by_subject(params)
+        self.assertEqual(comparisons("mismatch"), mismatches + 1)
+        self.assertEqual(mock_logger.warning.call_args.args[-1], [str(default_binding.uuid)])
+
+        mock_lookup.return_value = None
+        unavailable = comparisons("relations_unavailable")
+        self.service.get_role_bindings_by_subject(params)
+        self.assertEqual(comparisons("relations_unavailable"), unavailable + 1)
+
 
 class RoleBindingSerializerTests(IdentityRequest):
     """Tests for RoleBindingByGroupSerializer."""
@@ -20,13 +20,26 @@ from unittest.mock import MagicMock, patch
 
 from django.test import TestCase, override_settings
 from grpc import RpcError
+from kessel.relations.v1beta1 import common_pb2, lookup_pb2
 
 from management.role_binding.util.relations_api_client import (
+    iter_subject_ids,
     lookup_binding_subjects,
     parse_resource_type,
 )
 
 
+def lookup_response(subject_id=""):
+    """Build a streamed LookupSubjects response for the given binding ID."""
+    return lookup_pb2.LookupSubjectsResponse(
+        subject=common_pb2.SubjectReference(
+            subject=common_pb2.ObjectReference(
+                type=common_pb2.ObjectType(namespace="rbac", name="role_binding"), id=subject_id
+            )
+        )
+    )
+
+
 class ParseResourceTypeTests(TestCase):
     """Tests for the parse_resource_type function."""
 
@@ -61,6 +74,22 @@ class ParseResourceTypeTests(TestCase):
         self.assertEqual(name, "")
 
 
+class IterSubjectIdsTests(TestCase):
+    """Tests for the iter_subject_ids function."""
+
+    def test_yields_subject_ids_in_stream_order(self):
+        """Test that subject IDs are read from the messages without converting them to dicts."""
+        responses = [lookup_response("binding-2"), lookup_response("binding-1")]
+
+        self.assertEqual(list(iter_subject_ids(responses)), ["binding-2", "binding-1"])
+
+    def test_skips_responses_without_subject_id(self):
+        """Test that responses without a subject ID are skipped."""
+        responses = [lookup_response(), lookup_pb2.LookupSubjectsResponse(), lookup_response("binding-1")]
+
+        self.assertEqual(list(iter_subject_ids(responses)), ["binding-1"])
+
+
 class LookupBindingSubjectsTests(TestCase):
     """Tests for the lookup_binding_subjects function."""
 
@@ -76,6 +105,18 @@ class LookupBindingSubjectsTests(TestCase):
         result = lookup_binding_subjects("workspace", "ws-123")
         self.assertIsNone(result)
 
+    def _lookup(self, mock_create_channel, responses):
+        """Run lookup_binding_subjects against a stub streaming the given responses."""
+        mock_stub = MagicMock()
+        mock_stub.LookupSubjects.return_value = responses
+        mock_create_channel.return_value.__enter__.return_value = mock_stub
+
+        with patch(
+            "management.role_binding.util.relations_api_client.lookup_pb2_grpc.KesselLookupServiceStub",
+            return_value=mock_stub,
+        ):
+            return lookup_binding_subjects("workspace", "ws-123")
+
     @override_settings(RELATION_API_SERVER="localhost:9000")
     @patch("management.role_binding.util.relations_api_client._jwt_manager")
     @patch("management.role_binding.util.relations_api_client.create_client_channel_relation")
@@ -83,25 +124,7 @@ class LookupBindingSubjectsTests(TestCase):
         """Test that subject IDs are extracted from successful response."""
         mock_jwt_manager.get_jwt_from_redis.return_value = "test-token"
 
-        mock_stub = MagicMock()
-        mock_response_1 = MagicMock()
-        mock_response_2 = MagicMock()
-
-        # Simulate json_format.MessageToDict output
-        with patch("management.role_binding.util.relations_api_client.json_format") as mock_json_format:
-            mock_json_format.MessageToDict.side_effect = [
-                {"subject": {"id": "binding-1"}},
-                {"subject": {"id": "binding-2"}},
-            ]
-
-            mock_stub.LookupSubjects.return_value = [mock_response_1, mock_response_2]
-            mock_create_channel.return_value.__enter__.return_value = mock_stub
-
-            with patch(
-                "management.role_binding.util.relations_api_client.lookup_pb2_grpc.KesselLookupServiceStub",
-                return_value=mock_stub,
-            ):
-                result = lookup_binding_subjects("workspace", "ws-123")
+        result = self._lookup(mock_create_channel, [lookup_response("binding-1"), lookup_response("binding-2")])
 
         self.assertIsNotNone(result)
         self.assertEqual(set(result), {"binding-1", "binding-2"})
@@ -113,15 +136,7 @@ class LookupBindingSubjectsTests(TestCase):
         """Test that empty list is returned when no subjects are found."""
         mock_jwt_manager.get_jwt_from_redis.return_value = "test-token"
 
-        mock_stub = MagicMock()
-        mock_stub.LookupSubjects.return_value = []
-        mock_create_channel.return_value.__enter__.return_value = mock_stub
-
-        with patch(
-            "management.role_binding.util.relations_api_client.lookup_pb2_grpc.KesselLookupServiceStub",
-            return_value=mock_stub,
-        ):
-            result = lookup_binding_subjects("workspace", "ws-123")
+        result = self._lookup(mock_create_channel, [])
 
         self.assertIsNotNone(result)
         self.assertEqual(result, [])
@@ -152,32 +167,6 @@ class LookupBindingSubjectsTests(TestCase):
 
         self.assertIsNone(result)
 
-    @override_settings(RELATION_API_SERVER="localhost:9000")
-    @patch("management.role_binding.util.relations_api_client._jwt_manager")
-    @patch("management.role_binding.util.relations_api_client.create_client_channel_relation")
-    def test_handles_nested_subject_format(self, mock_create_channel, mock_jwt_manager):
-        """Test handling of nested subject format in response."""
-        mock_jwt_manager.get_jwt_from_redis.return_value = "test-token"
-
-        mock_stub = MagicMock()
-        mock_response = MagicMock()
-
-        with patch("management.role_binding.util.relations_api_client.json_format") as mock_json_format:
-            # Response with nested subject format
-            mock_json_format.MessageToDict.return_value = {"subject": {"subject": {"id": "nested-binding-1"}}}
-
-            mock_stub.LookupSubjects.return_value = [mock_response]
-            mock_create_channel.return_value.__enter__.return_value = mock_stub
-
-            with patch(
-                "management.role_binding.util.relations_api_client.lookup_pb2_grpc.KesselLookupServiceStub",
-                return_value=mock_stub,
-            ):
-                result = lookup_binding_subjects("workspace", "ws-123")
-
-        self.assertIsNotNone(result)
-        self.assertEqual(result, ["nested-binding-1"])
-
     @override_settings(RELATION_API_SERVER="localhost:9000")
     @patch("management.role_binding.util.relations_api_client._jwt_manager")
     @patch("management.role_binding.util.relations_api_client.create_client_channel_relation")
@@ -185,26 +174,10 @@ class LookupBindingSubjectsTests(TestCase):
         """Test that duplicate subject IDs are deduplicated."""
         mock_jwt_manager.get_jwt_from_redis.return_value = "test-token"
 
-        mock_stub = MagicMock()
-        mock_response_1 = MagicMock()
-        mock_response_2 = MagicMock()
-        mock_response_3 = MagicMock()
-
-        with patch("management.role_binding.util.relations_api_client.json_format") as mock_json_format:
-            mock_json_format.MessageToDict.side_effect = [
-                {"subject": {"id": "binding-1"}},
-                {"subject": {"id": "binding-2"}},
-                {"subject": {"id": "binding-1"}},  # Duplicate
-            ]
-
-            mock_stub.LookupSubjects.return_value = [mock_response_1, mock_response_2, mock_response_3]
-            mock_create_channel.return_value.__enter__.return_value = mock_stub
-
-            with patch(
-                "management.role_binding.util.relations_api_client.lookup_pb2_grpc.KesselLookupServiceStub",
-                return_value=mock_stub,
-            ):
-                result = lookup_binding_subjects("workspace", "ws-123")
+        result = self._lookup(
+            mock_create_channel,
+            [lookup_response("binding-1"), lookup_response("binding-2"), lookup_response("binding-1")],
+        )
 
         self.assertIsNotNone(result)
         self.assertEqual(len(result), 2)
@@ -217,26 +190,10 @@ class LookupBindingSubjectsTests(TestCase):
         """Test that responses without subject ID are skipped."""
         mock_jwt_manager.get_jwt_from_redis.return_value = "test-token"
 
-        mock_stub = MagicMock()
-        mock_response_1 = MagicMock()
-        mock_response_2 = MagicMock()
-        mock_response_3 = MagicMock()
-
-        with patch("management.role_binding.util.relations_api_client.json_format") as mock_json_format:
-            mock_json_format.MessageToDict.side_effect = [
-                {"subject": {"id": "binding-1"}},
-                {"subject": {}},  # Missing id
-                {"other_field": "value"},  # Missing subject entirely
-            ]
-
-            mock_stub.LookupSubjects.return_value = [mock_response_1, mock_response_2, mock_response_3]
-            mock_create_channel.return_value.__enter__.return_value = mock_stub
-
-            with patch(
-                "management.role_binding.util.relations_api_client.lookup_pb2_grpc.KesselLookupServiceStub",
-                return_value=mock_stub,
-            ):
-                result = lookup_binding_subjects("workspace", "ws-123")
+        result = self._lookup(
+            mock_create_channel,
+            [lookup_response("binding-1"), lookup_response(), lookup_pb2.LookupSubjectsResponse()],
+        )
 
         self.assertIsNotNone(result)
         self.assertEqual(result, ["binding-1"])
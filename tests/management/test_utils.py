@@ -18,11 +18,14 @@
 
 import uuid
 
+import grpc
+
 from api.models import Tenant, User
 from management.models import Access, Group, Permission, Principal, Policy, Role
 from management.principal.view import VALID_PRINCIPAL_TYPE_VALUE
 from management.utils import (
     access_for_principal,
+    access_queryset_for_principal,
     get_principal_from_request,
     groups_for_principal,
     policies_for_principal,
@@ -33,6 +36,8 @@ from management.utils import (
     is_valid_uuid,
     value_to_list,
     build_system_user_from_token,
+    create_client_channel_relation,
+    GrpcChannelRegistry,
 )
 from management.authorization.token_validator import ITSSOTokenValidator
 from tests.identity_request import IdentityRequest
@@ -41,7 +46,7 @@ from unittest import mock
 from unittest.mock import Mock
 
 from rest_framework import serializers
-from django.test import override_settings
+from django.test import TestCase, override_settings
 
 SERVICE_ACCOUNT_KEY = "service-account"
 
@@ -142,6 +147,37 @@ class UtilsTests(IdentityRequest):
         access = access_for_principal(self.principal, self.tenant, **kwargs)
         self.assertCountEqual(access, [self.accessA, self.default_access])
 
+    def test_access_queryset_for_principal(self):
+        """Test that the single query resolver returns the same access as access_for_principal."""
+        for is_org_admin in (False, True):
+            kwargs = {"application": "app", "is_org_admin": is_org_admin}
+            with self.assertNumQueries(1):
+                access = list(access_queryset_for_principal(self.principal, self.tenant, **kwargs))
+            self.assertCountEqual(access, access_for_principal(self.principal, self.tenant, **kwargs))
+
+    def test_access_queryset_for_principal_public_default_group(self):
+        """Test that the public default groups are used when the tenant has not customized them."""
+        public_tenant = Tenant.objects.get(tenant_name="public")
+        public_access = Access.objects.create(permission=self.permission, role=self.default_role, tenant=public_tenant)
+        self.default_group.tenant = public_tenant
+        self.default_group.save()
+
+        access = access_queryset_for_principal(self.principal, self.tenant, application="app")
+        self.assertCountEqual(access, [self.accessA, self.default_access, public_access])
+
+        # A customized default group in the tenant replaces the public one
+        custom_group = Group.objects.create(
+            name="custom default group", system=False, platform_default=True, tenant=self.tenant
+        )
+        access = access_queryset_for_principal(self.principal, self.tenant, application="app")
+        self.assertCountEqual(access, [self.accessA])
+        custom_group.delete()
+
+    def test_access_queryset_for_service_account(self):
+        """Test that service accounts do not get access from the default groups."""
+        access = access_queryset_for_principal(self.service_account, self.tenant, application="app")
+        self.assertCountEqual(access, [])
+
     def test_groups_for_principal(self):
         """Test that we get the correct groups for a principal."""
         groups = groups_for_principal(self.principal, self.tenant)
@@ -599,3 +635,51 @@ class SystemUserFromTokenTests(IdentityRequest):
         result_user = build_system_user_from_token(request, token_validator)
 
         self._assert_system_user_fields(result_user, existing_username)
+
+
+@override_settings(DEVELOPMENT=True)
+class GrpcChannelRegistryTests(TestCase):
+    """Test the process-wide gRPC channel registry."""
+
+    @mock.patch("management.utils.grpc.insecure_channel")
+    def test_channel_is_reused(self, insecure_channel):
+        """Test that a channel is opened once per address and shared afterwards."""
+        registry = GrpcChannelRegistry()
+        channel = registry.get("relations", "localhost:9000")
+        self.assertIs(channel, registry.get("relations", "localhost:9000"))
+        insecure_channel.assert_called_once()
+        channel.subscribe.assert_called_once()
+
+        registry.get("inventory", "localhost:9000")
+        self.assertEqual(insecure_channel.call_count, 2)
+
+    @mock.patch("management.utils.grpc.insecure_channel")
+    def test_channel_is_discarded_when_unavailable(self, insecure_channel):
+        """Test that the shared channel is replaced, but left open to its other users, after the server was unavailable."""
+        error = grpc.RpcError()
+        error.code = lambda: grpc.StatusCode.UNAVAILABLE
+        with mock.patch("management.utils.GRPC_CHANNELS", GrpcChannelRegistry()) as registry:
+            with create_client_channel_relation("localhost:9000") as streaming_channel:
+                with self.assertRaises(grpc.RpcError):
+                    with create_client_channel_relation("localhost:9000") as channel:
+                        raise error
+                self.assertIs(channel, streaming_channel)
+                # Calls still in flight on the discarded channel are not cancelled
+                channel.close.assert_not_called()
+
+            insecure_channel.return_value = mock.Mock()
+            self.assertIsNot(channel, registry.get("relations", "localhost:9000"))
+            channel.close.assert_not_called()
+
+    @mock.patch("management.utils.os.getpid")
+    @mock.patch("management.utils.grpc.insecure_channel")
+    def test_channels_are_not_shared_after_fork(self, insecure_channel, getpid):
+        """Test that a forked process opens its own channels."""
+        getpid.return_value = 1
+        registry = GrpcChannelRegistry()
+        channel = registry.get("relations", "localhost:9000")
+
+        getpid.return_value = 2
+        insecure_channel.return_value = mock.Mock()
+        self.assertIsNot(channel, registry.get("relations", "localhost:9000"))
+        channel.close.assert_not_called()
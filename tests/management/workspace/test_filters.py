@@ -20,7 +20,7 @@ from importlib import reload
 from unittest.mock import MagicMock, Mock, patch
 from uuid import uuid4
 
-from django.test import TransactionTestCase
+from django.test import TestCase, TransactionTestCase
 from django.test.utils import override_settings
 from django.urls import clear_url_caches, reverse
 from kessel.inventory.v1beta2 import allowed_pb2
@@ -32,7 +32,7 @@ from management.models import Workspace
 from management.permissions.system_user_utils import SystemUserAccessResult
 from management.workspace.filters import WorkspaceAccessFilterBackend
 from management.workspace.service import WorkspaceService
-from management.workspace.utils.access import filter_top_level_workspaces
+from management.workspace.utils.access import filter_top_level_workspaces, get_top_level_ancestor_ids
 from rbac import urls
 from tests.identity_request import BaseIdentityRequest
 
@@ -592,3 +592,91 @@ class FilterTopLevelWorkspacesTests(TransactionTestCase):
         result_ids = set(result.values_list("id", flat=True))
         # Only default is top-level because ws_a1a has default as ancestor
         self.assertEqual(result_ids, {self.default.id})
+
+
+class GetTopLevelAncestorIdsTests(TestCase):
+    """Unit tests for get_top_level_ancestor_ids."""
+
+    def setUp(self):
+        """Set up test fixtures with a workspace hierarchy."""
+        self.tenant = Tenant.objects.create(tenant_name="test_tenant", org_id="test_org_id", ready=True)
+
+        # Create hierarchy:
+        #   root
+        #   └── default
+        #       ├── ws_a
+        #       │   └── ws_a1
+        #       │       └── ws_a1a
+        #       └── ws_b
+        self.root = Workspace.objects.create(name="Root", tenant=self.tenant, type=Workspace.Types.ROOT)
+        self.default = Workspace.objects.create(
+            name="Default", tenant=self.tenant, type=Workspace.Types.DEFAULT, parent=self.root
+        )
+        self.ws_a = Workspace.objects.create(name="Workspace A", tenant=self.tenant, parent=self.default)
+        self.ws_a1 = Workspace.objects.create(name="Workspace A1", tenant=self.tenant, parent=self.ws_a)
+        self.ws_a1a = Workspace.objects.create(name="Workspace A1A", tenant=self.tenant, parent=self.ws_a1)
+        self.ws_b = Workspace.objects.create(name="Workspace B", tenant=self.tenant, parent=self.default)
+
+    def _ids(self, *workspaces):
+        return {str(workspace.id) for workspace in workspaces}
+
+    def test_siblings_resolve_shared_ancestors(self):
+        """Ancestors of sibling top-level workspaces are returned once."""
+        result = get_top_level_ancestor_ids(self._ids(self.ws_a1a, self.ws_b), self.tenant)
+
+        self.assertEqual(result, self._ids(self.ws_a1, self.ws_a, self.default, self.root))
+
+    def test_only_top_level_ancestors_returned(self):
+        """Ancestors between a workspace and an accessible ancestor are not returned."""
+        result = get_top_level_ancestor_ids(self._ids(self.ws_a, self.ws_a1a), self.tenant)
+
+        self.assertEqual(result, self._ids(self.default, self.root))
+
+    def test_query_count_independent_of_workspace_count(self):
+        """Ancestors of any number of top-level workspaces are resolved with a fixed number of queries."""
+        siblings = [
+            Workspace.objects.create(name=f"Sibling {i}", tenant=self.tenant, parent=self.ws_b) for i in range(10)
+        ]
+
+        with self.assertNumQueries(3):
+            result = get_top_level_ancestor_ids(self._ids(*siblings), self.tenant)
+
+        self.assertEqual(result, self._ids(self.ws_b, self.default, self.root))
+
+    def test_empty_ids(self):
+        """No workspaces means no ancestors."""
+        with self.assertNumQueries(0):
+            self.assertEqual(get_top_level_ancestor_ids([], self.tenant), set())
+
+    @override_settings(WORKSPACE_PARENT_MAP_CACHE_ENABLED=True)
+    @patch("management.workspace.utils.access.WorkspaceParentMapCache.save_parent_map")
+    @patch("management.workspace.utils.access.WorkspaceParentMapCache.get_parent_map")
+    def test_cached_parent_map(self, mock_get_parent_map, mock_save_parent_map):
+        """The cached parent map is loaded once and then walked without queries."""
+        mock_get_parent_map.return_value = None
+        mock_save_parent_map.side_effect = lambda tenant_id, parent_map: setattr(
+            mock_get_parent_map, "return_value", parent_map
+        )
+
+        with self.assertNumQueries(1):
+            first = get_top_level_ancestor_ids(self._ids(self.ws_a, self.ws_a1a, self.ws_b), self.tenant)
+        with self.assertNumQueries(0):
+            second = get_top_level_ancestor_ids(self._ids(self.ws_a1a, self.ws_b), self.tenant)
+
+        mock_save_parent_map.assert_called_once()
+        self.assertEqual(first, self._ids(self.default, self.root))
+        self.assertEqual(second, self._ids(self.ws_a1, self.ws_a, self.default, self.root))
+
+    @override_settings(WORKSPACE_PARENT_MAP_CACHE_ENABLED=True)
+    @patch("management.workspace.utils.access.WorkspaceParentMapCache.save_parent_map")
+    @patch("management.workspace.utils.access.WorkspaceParentMapCache.get_parent_map")
+    def test_cached_parent_map_missing_workspace(self, mock_get_parent_map, mock_save_parent_map):
+        """A cached parent map missing one of the workspaces, e.g. bulk created ones, is rebuilt."""
+        mock_get_parent_map.return_value = {str(self.default.id): str(self.root.id), str(self.root.id): None}
+
+        with self.assertNumQueries(1):
+            result = get_top_level_ancestor_ids(self._ids(self.ws_a1a, self.ws_b), self.tenant)
+
+        mock_save_parent_map.assert_called_once()
+        self.assertIn(str(self.ws_a1a.id), mock_save_parent_map.call_args.args[1])
+        self.assertEqual(result, self._ids(self.ws_a1, self.ws_a, self.default, self.root))
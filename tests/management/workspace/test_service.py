@@ -16,13 +16,13 @@
 #
 """Tests for WorkspaceService notify wait logic."""
 
-from collections import deque
+import threading
 from dataclasses import dataclass
-from unittest.mock import Mock, call, patch
+from unittest.mock import Mock, patch
 
 from django.test import TestCase
 
-from management.workspace.service import WorkspaceService
+from management.workspace.service import ReadYourWritesDispatcher, WorkspaceService
 
 
 @dataclass
@@ -31,101 +31,108 @@ class FakeNotify:
     payload: str
 
 
-class WorkspaceServiceTest(TestCase):
-    """Tests for WorkspaceService._wait_for_notify_post_commit."""
+class ReadYourWritesDispatcherTest(TestCase):
+    """Tests for ReadYourWritesDispatcher."""
 
-    @patch("management.workspace.service.select.select")
-    @patch("management.workspace.service.connection")
-    def test_wait_for_notify_post_commit_listen_unlisten(self, mock_connection, mock_select):
-        # Arrange
-        mock_conn = Mock()
-        # Start with no notifications; they'll arrive after LISTEN
-        mock_conn.notifies = deque()
-        mock_conn.poll.side_effect = lambda: None
+    def setUp(self):
+        self.dispatcher = ReadYourWritesDispatcher()
 
-        mock_connection.ensure_connection = lambda: None
-        mock_connection.connection = mock_conn
+    def test_handle_resolves_registered_future(self):
+        future = self.dispatcher.register("42")
+        self.assertFalse(future.done())
+
+        threading.Timer(0.01, self.dispatcher.handle, args=["  42  "]).start()
+
+        self.assertEqual(future.result(timeout=1), "42")
+        self.assertEqual(self.dispatcher._waiters, {})
+
+    def test_notify_before_register_is_not_lost(self):
+        self.dispatcher.handle("42")
+
+        self.assertTrue(self.dispatcher.register("42").done())
+
+    def test_handle_only_resolves_matching_workspace(self):
+        future = self.dispatcher.register("42")
+
+        self.dispatcher.handle("43")
 
-        mock_cursor = Mock()
-        mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
+        self.assertFalse(future.done())
 
-        # Make select.select indicate readability and inject a notification just-in-time
-        def select_side_effect(*args, **kwargs):
-            mock_conn.notifies = deque([FakeNotify("READ_YOUR_WRITES_CHANNEL", "42")])
-            return ([mock_conn], [], [])
+    def test_discard_removes_waiter(self):
+        future = self.dispatcher.register("42")
 
-        mock_select.side_effect = select_side_effect
+        self.dispatcher.discard("42", future)
 
-        service = WorkspaceService()
+        self.assertEqual(self.dispatcher._waiters, {})
 
-        # Act
-        service._wait_for_notify_post_commit(workspace_id="42")
+    @patch("management.workspace.service.threading.Thread")
+    def test_ensure_started_once_per_process(self, mock_thread):
+        self.dispatcher.ensure_started()
+        self.dispatcher.ensure_started()
 
-        # Assert LISTEN/UNLISTEN executed
-        executed_sql_calls = [args[0] for args, _ in mock_cursor.execute.call_args_list]
-        self.assertTrue(any("LISTEN" in str(c) for c in executed_sql_calls))
-        self.assertTrue(any("UNLISTEN" in str(c) for c in executed_sql_calls))
+        mock_thread.assert_called_once()
+        mock_thread.return_value.start.assert_called_once()
 
+    @patch("management.workspace.service.time.sleep", side_effect=InterruptedError)
     @patch("management.workspace.service.select.select")
     @patch("management.workspace.service.connection")
-    def test_wait_for_notify_post_commit_payload_trimmed(self, mock_connection, mock_select):
-        # Arrange: notification payload contains extra spaces; should still match
+    def test_listen_dispatches_channel_notifications(self, mock_connection, mock_select, _):
         mock_conn = Mock()
-        mock_conn.notifies = deque()
-        mock_conn.poll.side_effect = lambda: None
-
-        mock_connection.ensure_connection = lambda: None
+        mock_conn.notifies = []
         mock_connection.connection = mock_conn
+        future = self.dispatcher.register("42")
 
-        mock_cursor = Mock()
-        mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
+        def poll():
+            if mock_conn.poll.call_count > 1:
+                raise ConnectionError("closed")
+            mock_conn.notifies.extend([FakeNotify("OTHER", "42"), FakeNotify("READ_YOUR_WRITES_CHANNEL", "42")])
 
-        def select_side_effect(*args, **kwargs):
-            mock_conn.notifies = deque([FakeNotify("READ_YOUR_WRITES_CHANNEL", "  42  ")])
-            return ([mock_conn], [], [])
+        mock_conn.poll.side_effect = poll
+        mock_select.return_value = ([mock_conn], [], [])
 
-        mock_select.side_effect = select_side_effect
+        with self.assertRaises(InterruptedError):
+            self.dispatcher._listen()
 
-        service = WorkspaceService()
+        self.assertTrue(future.done())
+        mock_connection.close.assert_called_once()
 
-        # Act
-        service._wait_for_notify_post_commit(workspace_id="42")
 
-        # Assert LISTEN/UNLISTEN executed
-        executed_sql_calls = [args[0] for args, _ in mock_cursor.execute.call_args_list]
-        self.assertTrue(any("LISTEN" in str(c) for c in executed_sql_calls))
-        self.assertTrue(any("UNLISTEN" in str(c) for c in executed_sql_calls))
+class WorkspaceServiceTest(TestCase):
+    """Tests for WorkspaceService._wait_for_notify_post_commit."""
 
-    @patch("management.workspace.service.select.select")
-    @patch("management.workspace.service.connection")
-    def test_wait_for_notify_post_commit_timeout(self, mock_connection, mock_select):
-        # Arrange: no readability, so we loop until timeout and then exit
-        mock_conn = Mock()
-        mock_conn.notifies = deque()
-        mock_conn.poll.side_effect = lambda: None
+    @patch("management.workspace.service.ryw_dispatcher", new_callable=ReadYourWritesDispatcher)
+    def test_wait_for_notify_post_commit_success(self, dispatcher):
+        dispatcher.ensure_started = Mock()
+        threading.Timer(0.01, dispatcher.handle, args=["42"]).start()
 
-        mock_connection.ensure_connection = lambda: None
-        mock_connection.connection = mock_conn
+        WorkspaceService()._wait_for_notify_post_commit(workspace_id="42")
+
+        dispatcher.ensure_started.assert_called_once()
+        self.assertEqual(dispatcher._waiters, {})
+
+    @patch("management.workspace.service.connection")
+    @patch("management.workspace.service.ryw_dispatcher", new_callable=ReadYourWritesDispatcher)
+    def test_wait_for_notify_post_commit_does_not_listen_on_request_connection(self, dispatcher, mock_connection):
+        dispatcher.ensure_started = Mock()
+        dispatcher.handle("42")
 
-        mock_cursor = Mock()
-        mock_connection.cursor.return_value.__enter__.return_value = mock_cursor
+        WorkspaceService()._wait_for_notify_post_commit(workspace_id="42")
 
-        # select.select returns no readable until the loop times out
-        mock_select.return_value = ([], [], [])
+        mock_connection.cursor.assert_not_called()
 
-        service = WorkspaceService()
+    @patch("management.workspace.service.ryw_dispatcher", new_callable=ReadYourWritesDispatcher)
+    def test_wait_for_notify_post_commit_timeout(self, dispatcher):
+        dispatcher.ensure_started = Mock()
 
         with patch("management.workspace.service.settings.READ_YOUR_WRITES_TIMEOUT_SECONDS", 0.01):
             # Act & Assert - should raise TimeoutError
             with self.assertRaises(TimeoutError) as context:
-                service._wait_for_notify_post_commit(workspace_id="999")
+                WorkspaceService()._wait_for_notify_post_commit(workspace_id="999")
 
             self.assertIn("Read-your-writes consistency check timed out", str(context.exception))
 
-        # Assert LISTEN/UNLISTEN executed despite timeout
-        executed_sql_calls = [args[0] for args, _ in mock_cursor.execute.call_args_list]
-        self.assertTrue(any("LISTEN" in str(c) for c in executed_sql_calls))
-        self.assertTrue(any("UNLISTEN" in str(c) for c in executed_sql_calls))
+        # The timed out waiter is not leaked
+        self.assertEqual(dispatcher._waiters, {})
 
 
 #
@@ -208,6 +215,13 @@ class WorkspaceServiceCreateTests(WorkspaceServiceTestBase):
         workspace = self.service.create(validated_data, self.tenant)
         self.assertEqual(workspace.tenant, self.tenant)
 
+    @patch("management.workspace.model.WorkspaceParentMapCache.delete_parent_map")
+    def test_create_invalidates_parent_map_on_commit(self, mock_delete_parent_map):
+        """Test the create method drops the cached parent map after commit"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.create({"name": "Parent Map", "parent_id": self.default_workspace.id}, self.tenant)
+        mock_delete_parent_map.assert_called_once_with(self.tenant.id)
+
     def test_create_success_without_parent_id(self):
         """Test the create method successfully without a parent"""
         validated_data = {"name": "Unique Standard Child"}
@@ -333,6 +347,22 @@ class WorkspaceServiceDestroyTests(WorkspaceServiceTestBase):
         self.service.destroy(self.standard_child_workspace)
         self.assertFalse(Workspace.objects.filter(id=self.standard_child_workspace.id).exists())
 
+    @patch("management.workspace.model.WorkspaceParentMapCache.delete_parent_map")
+    def test_save_outside_service_invalidates_parent_map_on_commit(self, mock_delete_parent_map):
+        """Test that workspaces saved without the service also drop the cached parent map after commit"""
+        with self.captureOnCommitCallbacks(execute=True):
+            Workspace.objects.create(name="Outside Service", parent=self.default_workspace, tenant=self.tenant)
+            mock_delete_parent_map.assert_not_called()
+        mock_delete_parent_map.assert_called_once_with(self.tenant.id)
+
+    @patch("management.workspace.model.WorkspaceParentMapCache.delete_parent_map")
+    def test_destroy_invalidates_parent_map_on_commit(self, mock_delete_parent_map):
+        """Test the destroy method drops the cached parent map after commit"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.destroy(self.standard_child_workspace)
+            mock_delete_parent_map.assert_not_called()
+        mock_delete_parent_map.assert_called_once_with(self.tenant.id)
+
     @override_settings(
         REPLICATION_TO_RELATION_ENABLED=True,
         ROOT_SCOPE_PERMISSIONS="",
@@ -23,11 +23,12 @@ from types import SimpleNamespace
 from unittest.mock import MagicMock, Mock, patch
 from uuid import uuid4
 
-from django.test import TransactionTestCase
+from django.test import TestCase, TransactionTestCase
 from django.test.utils import override_settings
 from django.urls import clear_url_caches, reverse
 from google.protobuf import json_format
 from kessel.inventory.v1beta2 import allowed_pb2
+from management.cache import KesselLookupCache, circuit_breaker
 from management.models import (
     Access,
     Group,
@@ -2854,3 +2855,57 @@ class WorkspaceInventoryAccessV2Tests(TransactionIdentityRequest):
                 request_proto.consistency.at_least_as_fresh.token,
                 "fresh-db-token",
             )
+
+
+class WorkspaceInventoryAccessCheckerCacheTests(TestCase):
+    """Test the caching of Inventory API results under the tenant's relations consistency token."""
+
+    def setUp(self):
+        """Set up a tenant whose relations have a consistency token."""
+        super().setUp()
+        circuit_breaker.reset()
+        self.tenant = Tenant.objects.create(
+            tenant_name="acct_cached", org_id="cached", relations_consistency_token="t1"
+        )
+
+    @override_settings(KESSEL_LOOKUP_CACHE_ENABLED=True, KESSEL_LOOKUP_CACHE_LIFETIME=30)
+    @patch("management.cache.KesselLookupCache.connection")
+    @patch("management.inventory_client.create_client_channel_inventory")
+    def test_results_are_cached_for_the_tenant(self, mock_channel, redis_connection):
+        """Test that checks and lookups of a tenant are saved under its consistency token."""
+        redis_connection.get.return_value = None
+        mock_stub = MagicMock()
+        mock_stub.CheckForUpdate.return_value = SimpleNamespace(allowed=allowed_pb2.Allowed.ALLOWED_TRUE)
+        mock_stub.StreamedListObjects.return_value = iter(
+            [SimpleNamespace(object=SimpleNamespace(resource_id="ws-1"), pagination=None)]
+        )
+
+        with patch(
+            "kessel.inventory.v1beta2.inventory_service_pb2_grpc.KesselInventoryServiceStub",
+            return_value=mock_stub,
+        ):
+            checker = WorkspaceInventoryAccessChecker(tenant=self.tenant)
+            self.assertTrue(checker.check_workspace_access("ws-1", "localhost/1", "view"))
+            self.assertEqual(
+                checker.lookup_accessible_workspaces("localhost/1", "view", consistency_token="t2"), {"ws-1"}
+            )
+
+        cache = KesselLookupCache()
+        check_key = cache.key_for("cached", "t1", 0, "check", "workspace:ws-1#view@localhost/1")
+        lookup_key = cache.key_for("cached", "t2", 0, "workspaces", "view@localhost/1")
+        pipe = redis_connection.pipeline.return_value.__enter__.return_value
+        pipe.set.assert_any_call(check_key, "true", ex=30)
+        pipe.set.assert_any_call(lookup_key, '["ws-1"]', ex=30)
+
+    @override_settings(KESSEL_LOOKUP_CACHE_ENABLED=True)
+    @patch("management.cache.KesselLookupCache.connection")
+    @patch("management.inventory_client.create_client_channel_inventory")
+    def test_cached_check_skips_inventory(self, mock_channel, redis_connection):
+        """Test that a cached denial is served without calling the Inventory API."""
+        redis_connection.get.side_effect = {
+            KesselLookupCache().key_for("cached", "t1", 0, "check", "workspace:ws-1#view@localhost/1"): b"false"
+        }.get
+        checker = WorkspaceInventoryAccessChecker(tenant=self.tenant)
+
+        self.assertFalse(checker.check_workspace_access("ws-1", "localhost/1", "view"))
+        mock_channel.assert_not_called()
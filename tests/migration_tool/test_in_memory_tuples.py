@@ -1,11 +1,22 @@
+import dataclasses
+import pickle
 import unittest
 import uuid
 from typing import Optional
 
 from google.protobuf import json_format
 from kessel.relations.v1beta1.common_pb2 import Relationship, ObjectReference, ObjectType, SubjectReference
-from migration_tool.in_memory_tuples import InMemoryTuples, RelationTuple
-from migration_tool.utils import create_relationship
+from migration_tool.in_memory_tuples import (
+    InMemoryTuples,
+    RelationTuple,
+    all_of,
+    one_of,
+    relation,
+    resource,
+    resource_type,
+    subject,
+)
+from migration_tool.utils import create_relationship, create_relationships
 
 
 def _make_tuple(
@@ -124,6 +135,42 @@ class TestRelationTuple(unittest.TestCase):
         t = _make_tuple(subject_relation=None)
         self.assertEqual(RelationTuple.from_message_dict(t.to_dict()), t)
 
+    def test_object_types_are_interned(self):
+        """Equal object types are the same instance, including after unpickling."""
+        t1 = _make_tuple()
+        t2 = _make_tuple(resource_id="other")
+        self.assertIs(t1.resource.type, t2.resource.type)
+        self.assertIs(pickle.loads(pickle.dumps(t1.resource.type)), t1.resource.type)
+        self.assertIsNot(t1.resource.type, t1.subject.subject.type)
+
+    def test_hash_and_equality(self):
+        """Tuples hash and compare by value, and survive pickling."""
+        t = _make_tuple(subject_relation="member")
+        same = _make_tuple(subject_relation="member")
+        self.assertIsNot(t, same)
+        self.assertEqual(t, same)
+        self.assertEqual(hash(t), hash(same))
+        self.assertNotEqual(t, _make_tuple(subject_relation=None))
+        self.assertNotEqual(t, _make_tuple(subject_relation="member", relation="other"))
+        self.assertEqual(len({t, same, _make_tuple()}), 2)
+
+        unpickled = pickle.loads(pickle.dumps(t))
+        self.assertEqual(unpickled, t)
+        self.assertEqual(hash(unpickled), hash(t))
+
+    def test_instances_are_slotted(self):
+        """Tuples do not carry a per-instance dict."""
+        t = _make_tuple()
+        for instance in (t, t.resource, t.resource.type, t.subject):
+            with self.subTest(instance=type(instance).__name__):
+                self.assertFalse(hasattr(instance, "__dict__"))
+
+    def test_fields(self):
+        """Tuples only expose their relationship parts as dataclass fields."""
+        t = _make_tuple()
+        self.assertEqual([f.name for f in dataclasses.fields(t)], ["resource", "relation", "subject"])
+        self.assertEqual(set(dataclasses.asdict(t)), {"resource", "relation", "subject"})
+
 
 class TestInMemoryTuples(unittest.TestCase):
     def setUp(self):
@@ -264,6 +311,77 @@ class TestInMemoryTuples(unittest.TestCase):
             self.fail(f"Expected adding a duplicate of an existing relationship to work, but got: {e}")
 
 
+class TestInMemoryTuplesIndexes(unittest.TestCase):
+    """Test the indexed lookups of the in-memory store."""
+
+    def setUp(self):
+        self.tuples = [
+            create_relationship(("rbac", "group"), f"g{g}", ("rbac", "principal"), f"p{p}", "member")
+            for g in range(5)
+            for p in range(20)
+        ] + [
+            create_relationship(("rbac", "role_binding"), f"b{g}", ("rbac", "group"), f"g{g}", "subject", "member")
+            for g in range(5)
+        ]
+        self.store = InMemoryTuples(self.tuples)
+
+    def _scan(self, tuples, predicate):
+        return {t for t in tuples if predicate(t)}
+
+    def test_indexed_predicates_match_scan(self):
+        """Indexed lookups find exactly the tuples a full scan finds."""
+        for predicate in [
+            resource("rbac", "group", "g1"),
+            resource("rbac", "group", "missing"),
+            subject("rbac", "principal", "p3"),
+            subject("rbac", "group", "g2"),
+            subject("rbac", "group", "g2", "member"),
+            relation("subject"),
+            all_of(relation("member"), subject("rbac", "principal", "p3"), resource("rbac", "group", "g4")),
+            all_of(resource_type("rbac", "group"), lambda t: t.subject.subject.id.endswith("1")),
+            one_of(resource("rbac", "group", "g1"), resource("rbac", "group", "g2")),
+        ]:
+            with self.subTest(predicate=predicate):
+                self.assertEqual(set(self.store.find_tuples(predicate)), self._scan(self.tuples, predicate))
+
+        subset = self.store.find_tuples(resource("rbac", "group", "g1"))
+        predicate = subject("rbac", "principal", "p3")
+        self.assertEqual(set(subset.find_tuples(predicate)), self._scan(subset, predicate))
+        self.assertEqual(len(subset.find_tuples(subject("rbac", "group", "g1", "member"))), 0)
+
+    def test_indexed_lookup_does_not_scan(self):
+        """Only the tuples of the smallest matching index bucket are tested against the predicate."""
+        tested = []
+        predicate = all_of(relation("member"), resource("rbac", "group", "g1"), lambda t: tested.append(t) or True)
+
+        found = self.store.find_tuples(predicate)
+
+        self.assertEqual(len(found), 20)
+        self.assertEqual(len(tested), 20)
+
+    def test_indexes_follow_writes(self):
+        """Removed tuples are no longer found through the indexes, and added ones are."""
+        removed = self.tuples[0]
+        added = create_relationship(("rbac", "group"), "g0", ("rbac", "principal"), "new", "member")
+
+        self.store.write(add=[added], remove=[removed])
+
+        self.assertNotIn(removed, self.store.find_tuples(resource("rbac", "group", "g0")))
+        self.assertEqual(self.store.find_tuples(subject("rbac", "principal", "new")).only, added)
+        self.assertEqual(len(self.store.find_tuples(resource("rbac", "group", "g0"))), 20)
+
+        self.store.clear()
+        self.assertEqual(len(self.store.find_tuples(relation("member"))), 0)
+
+    def test_traverse_subject(self):
+        """Traversal follows each subject to the tuples where it is the resource."""
+        bindings = self.store.find_tuples(resource("rbac", "role_binding", "b2"))
+
+        members = bindings.traverse_subject([relation("member")], require_full_match=False, match_once=False)
+
+        self.assertEqual(set(members), set(self.store.find_tuples(resource("rbac", "group", "g2"))))
+
+
 class TestCreateRelationship(unittest.TestCase):
     """Test the create_relationship utility function."""
 
@@ -320,3 +438,38 @@ class TestCreateRelationship(unittest.TestCase):
                 "",  # Invalid: empty subject_id
                 "binding",
             )
+
+
+class TestCreateRelationships(unittest.TestCase):
+    """Test the create_relationships utility function."""
+
+    def test_create_relationships_matches_create_relationship(self):
+        """Test that the batch is the same as creating each relationship on its own."""
+        ids = [("g1", "p1"), ("g1", "p2"), ("g2", "p1")]
+
+        rels = create_relationships(("rbac", "group"), ("rbac", "principal"), "member", ids, subject_relation="x")
+
+        self.assertEqual(
+            rels,
+            [
+                create_relationship(("rbac", "group"), g, ("rbac", "principal"), p, "member", subject_relation="x")
+                for g, p in ids
+            ],
+        )
+        self.assertIs(rels[0].resource, rels[1].resource)
+        self.assertIs(rels[0].subject, rels[2].subject)
+
+    def test_create_relationships_validates_batch(self):
+        """Test that invalid relations and ids in a batch are rejected like in create_relationship."""
+        for relation, ids, error_type in [
+            ("", [("g1", "p1")], ValueError),
+            (None, [("g1", "p1")], TypeError),
+            ("member", [("g1", "p1"), ("g1", None)], TypeError),
+            ("member", [("g1", "p1"), ("", "p1")], ValueError),
+            ("member", [("g1", "p1"), ("g1", "a$b")], ValueError),
+            ("member", [("*", "p1")], ValueError),
+            ("member", [(uuid.uuid4(), "p1")], TypeError),
+        ]:
+            with self.subTest(relation=relation, ids=ids):
+                with self.assertRaises(error_type):
+                    create_relationships(("rbac", "group"), ("rbac", "principal"), relation, ids)
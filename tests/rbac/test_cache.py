@@ -16,13 +16,30 @@
 #
 """Test the caching system."""
 
+import json
 import pickle
+import threading
+from types import SimpleNamespace
 from unittest import skipIf
-from unittest.mock import call, patch
+from unittest.mock import Mock, call, patch
 
 from django.conf import settings
-from django.test import TestCase
-from management.cache import TenantCache
+from django.test import TestCase, override_settings
+from management.cache import (
+    AccessCache,
+    ITServiceAccountsCache,
+    KesselLookupCache,
+    LocalCache,
+    PrincipalCache,
+    PrincipalCleanupCheckpointCache,
+    PrincipalLookupCache,
+    RedisCircuitBreaker,
+    SingleFlight,
+    TenantCache,
+    circuit_breaker,
+    invalidation_listener,
+    policy_invalidation_queue,
+)
 from management.models import Access, Group, Permission, Policy, Principal, ResourceDefinition, Role
 from redis import exceptions
 
@@ -43,6 +60,10 @@ class AccessCacheTest(TestCase):
     def setUp(self):
         """Set up AccessCache tests."""
         super().setUp()
+        circuit_breaker.reset()
+        # Drop invalidations left over by earlier tests whose transactions were never committed
+        with patch("management.cache.AccessCacheInvalidationQueue.connection"):
+            policy_invalidation_queue.flush()
         self.principal_a = Principal.objects.create(username="principal_a", tenant=self.tenant)
         self.principal_b = Principal.objects.create(username="principal_b", tenant=self.tenant)
         self.group_a = Group.objects.create(name="group_a", platform_default=True, tenant=self.tenant)
@@ -57,195 +78,240 @@ class AccessCacheTest(TestCase):
         self.tenant.delete()
         super().tearDownClass()
 
-    @patch("management.group.model.AccessCache.delete_policy")
-    def test_group_cache_add_remove_signals(self, cache):
-        """Test signals attached to Groups"""
-        cache.reset_mock()
+    def invalidated(self, connection):
+        """Return the policy keys unlinked and the generations bumped by the queue, then reset the mock."""
+        pipe = connection.pipeline.return_value.__enter__.return_value
+        keys = {key for unlink in pipe.unlink.call_args_list for key in unlink.args}
+        generations = {incr.args[0] for incr in pipe.incr.call_args_list}
+        connection.reset_mock()
+        return keys, generations
 
-        # If a Principal is added to a group
-        self.group_a.principals.add(self.principal_a)
+    def policy_keys(self, *principals):
+        """Return the policy cache keys of the given principals."""
+        return {AccessCache(self.tenant.org_id).key_for(principal.uuid) for principal in principals}
 
-        cache.assert_called_once()
-        cache.assert_called_once_with(self.principal_a.uuid)
+    @patch("management.cache.AccessCacheInvalidationQueue.connection")
+    def test_group_cache_add_remove_signals(self, connection):
+        """Test signals attached to Groups"""
+        # If a Principal is added to a group
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group_a.principals.add(self.principal_a)
+        self.assertEqual(self.invalidated(connection), (self.policy_keys(self.principal_a), set()))
 
-        cache.reset_mock()
         # If a Group is added to a Principal
-        self.principal_b.group.add(self.group_a)
-        cache.asset_called_once()
-        cache.asset_called_once_with(self.principal_b.uuid)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.principal_b.group.add(self.group_a)
+        self.assertEqual(self.invalidated(connection), (self.policy_keys(self.principal_b), set()))
 
-        cache.reset_mock()
         # If a Principal is removed from a group
-        self.group_a.principals.remove(self.principal_a)
-        cache.assert_called_once()
-        cache.assert_called_once_with(self.principal_a.uuid)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group_a.principals.remove(self.principal_a)
+        self.assertEqual(self.invalidated(connection), (self.policy_keys(self.principal_a), set()))
 
-        cache.reset_mock()
         # If a Group is removed from a Principal
-        self.principal_b.group.remove(self.group_a)
-        cache.asset_called_once()
-        cache.asset_called_once_with(self.principal_b.uuid)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.principal_b.group.remove(self.group_a)
+        self.assertEqual(self.invalidated(connection), (self.policy_keys(self.principal_b), set()))
+
+    @patch("management.cache.AccessCacheInvalidationQueue.connection")
+    def test_group_cache_clear_signals(self, connection):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group_a.principals.add(self.principal_a, self.principal_b)
+        connection.reset_mock()
 
-    @patch("management.group.model.AccessCache.delete_policy")
-    def test_group_cache_clear_signals(self, cache):
         # If all groups are removed from a Principal
-        self.group_a.principals.add(self.principal_a, self.principal_b)
-        cache.reset_mock()
-        self.principal_a.group.clear()
-        cache.assert_called_once()
-        cache.assert_called_once_with(self.principal_a.uuid)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.principal_a.group.clear()
+        self.assertEqual(self.invalidated(connection), (self.policy_keys(self.principal_a), set()))
 
-        cache.reset_mock()
         # If all Principals are removed from a Group
-        self.group_a.principals.clear()
-        cache.asset_called_once()
-        cache.asset_called_once_with(self.principal_b.uuid)
-
-    @patch("management.group.model.AccessCache.delete_policy")
-    def test_group_cache_delete_group_signal(self, cache):
-        self.group_a.principals.add(self.principal_a)
-        cache.reset_mock()
-        self.group_a.delete()
-        cache.assert_called_once()
-        cache.assert_called_once_with(self.principal_a.uuid)
-
-    @patch("management.policy.model.AccessCache.delete_all_policies_for_tenant")
-    @patch("management.policy.model.AccessCache.delete_policy")
-    def test_policy_cache_group_signals(self, cache_delete, cache_delete_all):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group_a.principals.clear()
+        self.assertEqual(self.invalidated(connection), (self.policy_keys(self.principal_b), set()))
+
+    @patch("management.cache.AccessCacheInvalidationQueue.connection")
+    def test_group_cache_delete_group_signal(self, connection):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group_a.principals.add(self.principal_a)
+        connection.reset_mock()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group_a.delete()
+        self.assertEqual(self.invalidated(connection), (self.policy_keys(self.principal_a), set()))
+
+    @patch("management.cache.AccessCacheInvalidationQueue.connection")
+    def test_policy_cache_group_signals(self, connection):
         """Test signals attached to Groups"""
-        self.group_a.principals.add(self.principal_a)
-        self.group_b.principals.add(self.principal_b)
-        cache_delete.reset_mock()
+        tenant_generation = AccessCache.generation_key_for(self.tenant.org_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group_a.principals.add(self.principal_a)
+            self.group_b.principals.add(self.principal_b)
+        connection.reset_mock()
+
+        # If a policy has its group set to a platform default group, its principals are covered by the tenant
+        with self.captureOnCommitCallbacks(execute=True):
+            self.policy_a.group = self.group_a
+            self.policy_a.save()
+        self.assertEqual(self.invalidated(connection), (set(), {tenant_generation}))
 
-        # If a policy has its group set
-        self.policy_a.group = self.group_a
-        self.policy_a.save()
-        cache_delete_all.asset_called_once()
-
-        cache_delete.reset_mock()
         # If a policy has its group changed
-        self.policy_a.group = self.group_b
-        self.policy_a.save()
-        cache_delete.asset_called_once()
-        cache_delete.asset_called_once_with(self.principal_b.uuid)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.policy_a.group = self.group_b
+            self.policy_a.save()
+        self.assertEqual(self.invalidated(connection), (self.policy_keys(self.principal_b), set()))
 
-        cache_delete.reset_mock()
         # If a policy is deleted
-        self.policy_a.delete()
-        cache_delete.assert_called_once()
-        cache_delete.assert_called_once_with(self.principal_b.uuid)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.policy_a.delete()
+        self.assertEqual(self.invalidated(connection), (self.policy_keys(self.principal_b), set()))
 
-    @patch("management.policy.model.AccessCache.delete_all_policies_for_tenant")
-    @patch("management.policy.model.AccessCache.delete_policy")
-    def test_policy_cache_add_remove_roles_signals(self, cache_delete, cache_delete_all):
+    @patch("management.cache.AccessCacheInvalidationQueue.connection")
+    def test_policy_cache_add_remove_roles_signals(self, connection):
         """Test signals attached to Policy/Roles"""
-        self.group_b.principals.add(self.principal_b)
-        self.policy_a.group = self.group_a
-        self.policy_a.save()
-        self.policy_b.group = self.group_b
-        self.policy_b.save()
-        cache_delete.reset_mock()
+        tenant_generation = AccessCache.generation_key_for(self.tenant.org_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group_b.principals.add(self.principal_b)
+            self.policy_a.group = self.group_a
+            self.policy_a.save()
+            self.policy_b.group = self.group_b
+            self.policy_b.save()
+        connection.reset_mock()
 
         # If a Role is added to a platform default group's Policy
-        self.policy_a.roles.add(self.role_a)
-        self.policy_a.save()
-        cache_delete_all.asset_called_once()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.policy_a.roles.add(self.role_a)
+            self.policy_a.save()
+        self.assertEqual(self.invalidated(connection), (set(), {tenant_generation}))
 
-        cache_delete.reset_mock()
-        # If a Policy is added to a Role
-        self.role_b.policies.add(self.policy_a)
-        cache_delete.asset_called_once()
-        cache_delete.asset_called_once_with(self.principal_b.uuid)
+        # If a platform default group's Policy is added to a Role
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role_b.policies.add(self.policy_a)
+        self.assertEqual(self.invalidated(connection), (set(), {tenant_generation}))
 
-        cache_delete.reset_mock()
         # If a Role is removed from a platform default group's Policy
-        self.policy_a.roles.remove(self.role_a)
-        self.policy_a.save()
-        cache_delete_all.asset_called_once()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.policy_a.roles.remove(self.role_a)
+            self.policy_a.save()
+        self.assertEqual(self.invalidated(connection), (set(), {tenant_generation}))
 
-        cache_delete.reset_mock()
         # If a Role is removed from a Policy
-        self.policy_b.roles.remove(self.role_b)
-        cache_delete.assert_called_once()
-        cache_delete.assert_called_once_with(self.principal_b.uuid)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.policy_b.roles.remove(self.role_b)
+        self.assertEqual(self.invalidated(connection), (self.policy_keys(self.principal_b), set()))
 
-        cache_delete.reset_mock()
         # If a Policy is removed from a Role
-        self.role_b.policies.remove(self.policy_b)
-        cache_delete.asset_called_once()
-        cache_delete.asset_called_once_with(self.principal_b.uuid)
-
-    @patch("management.policy.model.AccessCache.delete_policy")
-    def test_policy_cache_clear_signals(self, cache):
-        self.group_a.principals.add(self.principal_a)
-        self.group_b.principals.add(self.principal_b)
-        self.policy_a.group = self.group_a
-        self.policy_a.save()
-        self.policy_b.group = self.group_b
-        self.policy_b.save()
-        self.policy_a.roles.add(self.role_a)
-        self.policy_b.roles.add(self.role_b)
-        cache.reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role_b.policies.remove(self.policy_b)
+        self.assertEqual(self.invalidated(connection), (self.policy_keys(self.principal_b), set()))
+
+    @patch("management.cache.AccessCacheInvalidationQueue.connection")
+    def test_policy_cache_clear_signals(self, connection):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group_a.principals.add(self.principal_a)
+            self.group_b.principals.add(self.principal_b)
+            self.policy_a.group = self.group_a
+            self.policy_a.save()
+            self.policy_b.group = self.group_b
+            self.policy_b.save()
+            self.policy_a.roles.add(self.role_a)
+            self.policy_b.roles.add(self.role_b)
+        connection.reset_mock()
 
         # If all policies are removed from a role
-        self.role_a.policies.clear()
-        cache.assert_called_once()
-        cache.assert_called_once_with(self.principal_a.uuid)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role_a.policies.clear()
+        self.assertEqual(self.invalidated(connection), (self.policy_keys(self.principal_a), set()))
 
-        cache.reset_mock()
         # If all Roles are removed from a Policy
-        self.policy_b.roles.clear()
-        cache.asset_called_once()
-        cache.asset_called_once_with(self.principal_b.uuid)
-
-    @patch("management.role.model.AccessCache.delete_policy")
-    def test_policy_cache_change_delete_roles_signals(self, cache):
-        self.group_a.principals.add(self.principal_a)
-        self.group_b.principals.add(self.principal_b)
-        self.policy_a.group = self.group_a
-        self.policy_a.save()
-        self.policy_b.group = self.group_b
-        self.policy_b.save()
-        self.policy_a.roles.add(self.role_a)
-        self.policy_b.roles.add(self.role_b)
-        cache.reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.policy_b.roles.clear()
+        self.assertEqual(self.invalidated(connection), (self.policy_keys(self.principal_b), set()))
+
+    @patch("management.cache.AccessCacheInvalidationQueue.connection")
+    def test_policy_cache_change_delete_roles_signals(self, connection):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group_a.principals.add(self.principal_a)
+            self.group_b.principals.add(self.principal_b)
+            self.policy_a.group = self.group_a
+            self.policy_a.save()
+            self.policy_b.group = self.group_b
+            self.policy_b.save()
+            self.policy_a.roles.add(self.role_a)
+            self.policy_b.roles.add(self.role_b)
+        connection.reset_mock()
+        expected = (self.policy_keys(self.principal_a), set())
 
         # If a role is changed
-        self.role_a.version += 1
-        self.role_a.save()
-        cache.assert_called_once()
-        cache.assert_called_once_with(self.principal_a.uuid)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role_a.version += 1
+            self.role_a.save()
+        self.assertEqual(self.invalidated(connection), expected)
 
-        cache.reset_mock()
         # If Access is added
-        self.permission = Permission.objects.create(permission="foo:*:*", tenant=self.tenant)
-        self.access_a = Access.objects.create(permission=self.permission, role=self.role_a, tenant=self.tenant)
-        cache.assert_called_once()
-        cache.assert_called_once_with(self.principal_a.uuid)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.permission = Permission.objects.create(permission="foo:*:*", tenant=self.tenant)
+            self.access_a = Access.objects.create(permission=self.permission, role=self.role_a, tenant=self.tenant)
+        self.assertEqual(self.invalidated(connection), expected)
 
-        cache.reset_mock()
         # If ResourceDefinition is added
-        self.rd_a = ResourceDefinition.objects.create(access=self.access_a, tenant=self.tenant)
-        cache.assert_called_once()
-        cache.assert_called_once_with(self.principal_a.uuid)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rd_a = ResourceDefinition.objects.create(access=self.access_a, tenant=self.tenant)
+        self.assertEqual(self.invalidated(connection), expected)
 
-        cache.reset_mock()
         # If ResourceDefinition is destroyed
-        self.rd_a.delete()
-        cache.assert_called_once()
-        cache.assert_called_once_with(self.principal_a.uuid)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rd_a.delete()
+        self.assertEqual(self.invalidated(connection), expected)
 
-        cache.reset_mock()
         # If Access is destroyed
-        self.access_a.delete()
-        cache.assert_called_once()
-        cache.assert_called_once_with(self.principal_a.uuid)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.access_a.delete()
+        self.assertEqual(self.invalidated(connection), expected)
 
-        cache.reset_mock()
         # If Role is destroyed
-        self.role_a.delete()
-        cache.assert_called_once()
-        cache.assert_called_once_with(self.principal_a.uuid)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role_a.delete()
+        self.assertEqual(self.invalidated(connection), expected)
+
+    @patch("management.cache.AccessCacheInvalidationQueue.connection")
+    def test_invalidations_are_deferred_and_deduplicated(self, connection):
+        """Test that invalidations are applied once, after the transaction commits."""
+        self.group_a.principals.add(self.principal_a)
+        self.policy_a.group = self.group_b
+        self.policy_a.save()
+        self.policy_a.roles.add(self.role_a)
+        self.group_b.principals.add(self.principal_a)
+        permission = Permission.objects.create(permission="foo:*:*", tenant=self.tenant)
+        connection.reset_mock()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for _ in range(3):
+                Access.objects.create(permission=permission, role=self.role_a, tenant=self.tenant)
+            connection.pipeline.assert_not_called()
+        self.assertEqual(len(callbacks), 3)
+
+        pipe = connection.pipeline.return_value.__enter__.return_value
+        connection.pipeline.assert_called_once_with(transaction=False)
+        pipe.unlink.assert_called_once_with(*self.policy_keys(self.principal_a))
+        pipe.execute.assert_called_once()
+
+    @patch("management.cache.BATCH_DELETE_SIZE", 2)
+    @patch("management.cache.AccessCacheInvalidationQueue.connection")
+    def test_invalidation_queue_batches_unlinks(self, connection):
+        """Test that keys are unlinked in batches and skipped for tenants invalidated as a whole."""
+        pipe = connection.pipeline.return_value.__enter__.return_value
+        with self.captureOnCommitCallbacks(execute=True):
+            policy_invalidation_queue.delete_policies("12345", ["a", "b", "c", "a", "d", "e"])
+            policy_invalidation_queue.delete_policies("67890", ["f"])
+            policy_invalidation_queue.delete_all_policies_for_tenant("67890")
+
+        self.assertEqual([len(unlink.args) for unlink in pipe.unlink.call_args_list], [2, 2, 1])
+        self.assertEqual(
+            {key for unlink in pipe.unlink.call_args_list for key in unlink.args},
+            {AccessCache("12345").key_for(uuid) for uuid in "abcde"},
+        )
+        pipe.incr.assert_called_once_with(AccessCache.generation_key_for("67890"))
+        pipe.execute.assert_called_once()
 
 
 class TenantCacheTest(TestCase):
@@ -260,9 +326,13 @@ class TenantCacheTest(TestCase):
         self.tenant.delete()
         super().tearDownClass()
 
+    def setUp(self):
+        """Start every test with a closed circuit."""
+        super().setUp()
+        circuit_breaker.reset()
+
     @patch("management.cache.TenantCache.connection")
-    @patch("management.cache.BasicCache.redis_health_check")
-    def test_tenant_cache_functions_success(self, redis_health_check, redis_connection):
+    def test_tenant_cache_functions_success(self, redis_connection):
         tenant_name = self.tenant.tenant_name
         tenant_org_id = self.tenant.org_id
         key = f"rbac::tenant::tenant={tenant_org_id}"
@@ -274,10 +344,9 @@ class TenantCacheTest(TestCase):
         self.assertTrue(call().__enter__().set(key, dump_content) in redis_connection.pipeline.mock_calls)
 
         redis_connection.get.return_value = dump_content
-        redis_health_check.return_value = True
         # Get tenant from cache
         tenant = tenant_cache.get_tenant(tenant_org_id)
-        redis_health_check.assert_called_once()
+        redis_connection.ping.assert_not_called()
         redis_connection.get.assert_called_once_with(key)
         self.assertEqual(tenant, self.tenant)
 
@@ -286,32 +355,165 @@ class TenantCacheTest(TestCase):
         redis_connection.delete.assert_called_once_with(key)
 
     @patch("management.cache.TenantCache.connection")
-    @patch("management.cache.BasicCache.redis_health_check")
-    def test_tenant_cache_functions_failure(self, redis_health_check, redis_connection):
-        tenant_name = self.tenant.tenant_name
+    def test_tenant_cache_functions_failure(self, redis_connection):
         tenant_org_id = self.tenant.org_id
         key = f"rbac::tenant::tenant={tenant_org_id}"
-        dump_content = pickle.dumps(self.tenant)
 
-        # Save tenant to cache
         tenant_cache = TenantCache()
+        redis_connection.get.side_effect = exceptions.ConnectionError("Connection lost")
+        for _ in range(settings.REDIS_CIRCUIT_BREAKER_FAILURE_THRESHOLD):
+            self.assertIsNone(tenant_cache.get_tenant(tenant_org_id))
+        self.assertEqual(circuit_breaker.state, RedisCircuitBreaker.OPEN)
+
+        # Once the circuit is open Redis is not queried anymore
+        redis_connection.get.reset_mock()
+        self.assertIsNone(tenant_cache.get_tenant(tenant_org_id))
+        redis_connection.get.assert_not_called()
+
+        # Saving is skipped as well, but invalidation is still attempted
         tenant_cache.save_tenant(self.tenant)
-        self.assertTrue(call().__enter__().set(key, dump_content) in redis_connection.pipeline.mock_calls)
+        redis_connection.pipeline.assert_not_called()
+        tenant_cache.delete_tenant(tenant_org_id)
+        redis_connection.delete.assert_called_once_with(key)
 
-        redis_connection.get.return_value = dump_content
-        redis_health_check.return_value = False
-        # Get tenant from cache (should fail because redis_health_check failed)
+    @override_settings(LOCAL_CACHE_ENABLED=True)
+    @patch("management.cache.invalidation_listener")
+    @patch("management.cache.TenantCache.connection")
+    def test_tenant_local_cache(self, redis_connection, listener):
+        """Test that tenants are served from the in-process cache and invalidated across workers."""
+        tenant_org_id = self.tenant.org_id
+        tenant_cache = TenantCache()
+        TenantCache.local_cache.clear()
+
+        tenant_cache.save_tenant(self.tenant)
         tenant = tenant_cache.get_tenant(tenant_org_id)
-        redis_health_check.assert_called_once()
-        self.assertNotEqual(tenant, self.tenant)
+        self.assertEqual(tenant, self.tenant)
+        self.assertIsNot(tenant, self.tenant)
+        redis_connection.get.assert_not_called()
+        listener.ensure_started.assert_called()
+
+        # Deleting drops the local entry and tells the other workers to do the same
+        tenant_cache.delete_tenant(tenant_org_id)
+        listener.publish.assert_called_once_with("tenant", key=tenant_org_id)
+        redis_connection.get.return_value = None
+        self.assertIsNone(tenant_cache.get_tenant(tenant_org_id))
+        redis_connection.get.assert_called_once()
+
+        # A Redis hit fills the local cache
+        redis_connection.get.return_value = pickle.dumps(self.tenant)
+        tenant_cache.get_tenant(tenant_org_id)
+        tenant_cache.get_tenant(tenant_org_id)
+        self.assertEqual(redis_connection.get.call_count, 2)
+        TenantCache.local_cache.clear()
+
+
+class LocalCacheTest(TestCase):
+    """Test the in-process cache."""
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted once the cache is full."""
+        cache = LocalCache("test", max_size=2, lifetime=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+
+    @patch("management.cache.time.monotonic")
+    def test_expiration(self, monotonic):
+        """Test that entries expire after the lifetime."""
+        cache = LocalCache("test", max_size=2, lifetime=30)
+        monotonic.return_value = 100
+        cache.set("a", 1)
+        monotonic.return_value = 129
+        self.assertEqual(cache.get("a"), 1)
+        monotonic.return_value = 131
+        self.assertIsNone(cache.get("a"))
+
+    def test_invalidation_messages(self):
+        """Test that published invalidations are applied to the registered local caches."""
+        cache = PrincipalCache.local_cache
+        cache.set("rbac::principal::1::alice", "alice")
+        cache.set("rbac::principal::1::bob", "bob")
+        cache.set("rbac::principal::2::alice", "alice")
+
+        invalidation_listener.handle(b'{"cache": "principal", "key": "rbac::principal::1::bob", "prefix": null}')
+        self.assertIsNone(cache.get("rbac::principal::1::bob"))
+        invalidation_listener.handle(b'{"cache": "principal", "key": null, "prefix": "rbac::principal::1::"}')
+        self.assertIsNone(cache.get("rbac::principal::1::alice"))
+        self.assertEqual(cache.get("rbac::principal::2::alice"), "alice")
+        cache.clear()
+
+
+class RedisCircuitBreakerTest(TestCase):
+    """Test the Redis circuit breaker."""
+
+    def test_opens_after_threshold_and_closes_on_success(self):
+        """Test that the circuit opens after repeated failures and closes after a success."""
+        breaker = RedisCircuitBreaker(failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, RedisCircuitBreaker.CLOSED)
+        self.assertTrue(breaker.allow_request())
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, RedisCircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow_request())
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, RedisCircuitBreaker.CLOSED)
+        self.assertTrue(breaker.allow_request())
+
+    @patch("management.cache.threading.Thread")
+    @patch("management.cache.time.monotonic")
+    def test_probes_in_background_after_backoff(self, monotonic, thread):
+        """Test that a background probe is started once the backoff window elapsed."""
+        breaker = RedisCircuitBreaker(failure_threshold=1, reset_timeout=30)
+        monotonic.return_value = 100
+        breaker.record_failure()
+
+        monotonic.return_value = 110
+        self.assertFalse(breaker.allow_request())
+        thread.assert_not_called()
+
+        monotonic.return_value = 131
+        self.assertFalse(breaker.allow_request())
+        self.assertEqual(breaker.state, RedisCircuitBreaker.HALF_OPEN)
+        thread.assert_called_once()
+        thread.return_value.start.assert_called_once()
+
+        # Only a single probe runs at a time
+        self.assertFalse(breaker.allow_request())
+        thread.assert_called_once()
+
+    @patch("management.cache.Redis")
+    def test_probe_result(self, redis):
+        """Test that the probe closes the circuit on success and re-opens it on failure."""
+        breaker = RedisCircuitBreaker(failure_threshold=1, reset_timeout=30)
+        breaker.record_failure()
+        breaker._set_state(RedisCircuitBreaker.HALF_OPEN)
+        redis.return_value.ping.side_effect = exceptions.ConnectionError("Connection lost")
+        breaker._probe()
+        self.assertEqual(breaker.state, RedisCircuitBreaker.OPEN)
+
+        breaker._set_state(RedisCircuitBreaker.HALF_OPEN)
+        redis.return_value.ping.side_effect = None
+        redis.return_value.ping.return_value = True
+        breaker._probe()
+        self.assertEqual(breaker.state, RedisCircuitBreaker.CLOSED)
 
 
 class JWTCacheTest(TestCase):
     """Test JWT token caching."""
 
+    def setUp(self):
+        """Start every test with a closed circuit."""
+        super().setUp()
+        circuit_breaker.reset()
+
     @patch("management.cache.JWTCache.connection")
-    @patch("management.cache.BasicCache.redis_health_check")
-    def test_jwt_cache_set_and_get(self, redis_health_check, redis_connection):
+    def test_jwt_cache_set_and_get(self, redis_connection):
         """Test that JWT tokens are correctly stored and retrieved from cache."""
         from management.cache import JWTCache
 
@@ -334,30 +536,25 @@ class JWTCacheTest(TestCase):
 
         # Test getting JWT token
         redis_connection.get.return_value = test_token.encode("utf-8")
-        redis_health_check.return_value = True
 
         retrieved_token = jwt_cache.get_jwt_response()
-        redis_health_check.assert_called_once()
         redis_connection.get.assert_called_once_with(name=key)
         self.assertEqual(retrieved_token, test_token)
 
     @patch("management.cache.JWTCache.connection")
-    @patch("management.cache.BasicCache.redis_health_check")
-    def test_jwt_cache_get_returns_none_when_empty(self, redis_health_check, redis_connection):
+    def test_jwt_cache_get_returns_none_when_empty(self, redis_connection):
         """Test that get_jwt_response returns None when cache is empty."""
         from management.cache import JWTCache
 
         jwt_cache = JWTCache()
 
         redis_connection.get.return_value = None
-        redis_health_check.return_value = True
 
         retrieved_token = jwt_cache.get_jwt_response()
         self.assertIsNone(retrieved_token)
 
     @patch("management.cache.JWTCache.connection")
-    @patch("management.cache.BasicCache.redis_health_check")
-    def test_jwt_cache_handles_string_response(self, redis_health_check, redis_connection):
+    def test_jwt_cache_handles_string_response(self, redis_connection):
         """Test that JWT cache handles both bytes and string responses from Redis."""
         from management.cache import JWTCache
 
@@ -366,7 +563,6 @@ class JWTCacheTest(TestCase):
 
         # Test with string (already decoded)
         redis_connection.get.return_value = test_token
-        redis_health_check.return_value = True
 
         retrieved_token = jwt_cache.get_jwt_response()
         self.assertEqual(retrieved_token, test_token)
@@ -427,3 +623,348 @@ class JWTCacheOptimizedTest(TestCase):
 
         self.assertIsNone(token)
         redis_connection.get.assert_not_called()
+
+
+@override_settings(ACCESS_CACHE_ENABLED=True)
+class GenerationStampedCacheTest(TestCase):
+    def setUp(self):
+        """Start every test with a closed circuit."""
+        super().setUp()
+        circuit_breaker.reset()
+
+    @patch("management.cache.AccessCache.connection")
+    def test_delete_all_policies_bumps_generation(self, redis_connection):
+        AccessCache("12345").delete_all_policies_for_tenant()
+
+        redis_connection.incr.assert_called_once_with("rbac::generation::policy::tenant=12345")
+        redis_connection.scan_iter.assert_not_called()
+        redis_connection.delete.assert_not_called()
+
+    @patch("management.cache.AccessCache.connection")
+    def test_delete_all_policies_for_all_tenants(self, redis_connection):
+        AccessCache("*").delete_all_policies_for_tenant()
+
+        redis_connection.incr.assert_called_once_with("rbac::generation::policy::tenant=*")
+
+    @patch("management.cache.AccessCache.connection")
+    def test_policy_round_trip_uses_generation(self, redis_connection):
+        pipe = redis_connection.pipeline.return_value.__enter__.return_value
+        pipe.execute.return_value = [[b"2", None], None]
+        access_cache = AccessCache("12345")
+
+        # A miss still memoizes the generation the policy is computed against.
+        self.assertIsNone(access_cache.get_policy("uuid", "app"))
+        pipe.mget.assert_called_once_with(
+            ["rbac::generation::policy::tenant=*", "rbac::generation::policy::tenant=12345"]
+        )
+        access_cache.save_policy("uuid", "app", [{"permission": "app:*:*"}])
+        redis_connection.mget.assert_not_called()
+        pipe.hset.assert_called_once_with(
+            "rbac::policy::tenant=12345::user=uuid", "app", '["2.0", [{"permission": "app:*:*"}]]'
+        )
+
+        pipe.execute.return_value = [[b"2", None], '["2.0", [{"permission": "app:*:*"}]]']
+        self.assertEqual(AccessCache("12345").get_policy("uuid", "app"), [{"permission": "app:*:*"}])
+
+    @patch("management.cache.AccessCache.connection")
+    def test_policy_from_older_generation_is_a_miss(self, redis_connection):
+        pipe = redis_connection.pipeline.return_value.__enter__.return_value
+        for stored in ('["2.0", [{"permission": "app:*:*"}]]', '[{"permission": "app:*:*"}]'):
+            pipe.execute.return_value = [[b"2", b"1"], stored]
+            self.assertIsNone(AccessCache("12345").get_policy("uuid", "app"))
+
+    @patch("management.cache.PrincipalCache.connection")
+    def test_delete_all_principals_bumps_generation(self, redis_connection):
+        PrincipalCache().delete_all_principals_for_tenant("12345")
+
+        redis_connection.incr.assert_called_once_with("rbac::generation::principal::12345")
+        redis_connection.scan_iter.assert_not_called()
+
+    @patch("management.cache.PrincipalCache.connection")
+    def test_principal_from_older_generation_is_a_miss(self, redis_connection):
+        principal_cache = PrincipalCache()
+        key = "rbac::principal::12345::user::name"
+        redis_connection.mget.return_value = [b"3", pickle.dumps((b"3", {"username": "user::name"}))]
+        self.assertEqual(principal_cache.get_from_redis(key), {"username": "user::name"})
+        redis_connection.mget.assert_called_once_with(["rbac::generation::principal::12345", key])
+
+        redis_connection.mget.return_value = [b"4", pickle.dumps((b"3", {"username": "user::name"}))]
+        self.assertIsNone(principal_cache.get_from_redis(key))
+
+    @patch("management.cache.PrincipalCache.connection")
+    def test_principal_is_saved_with_generation_of_miss(self, redis_connection):
+        """An invalidation between the miss and the save leaves the saved principal stale."""
+        principal_cache = PrincipalCache()
+        principal = SimpleNamespace(username="user")
+        pipe = redis_connection.pipeline.return_value.__enter__.return_value
+        redis_connection.mget.return_value = [b"3", None]
+
+        self.assertIsNone(principal_cache.get_principal("12345", "user"))
+        redis_connection.get.return_value = b"4"
+        principal_cache.cache_principal("12345", principal)
+
+        redis_connection.get.assert_not_called()
+        stored = pickle.loads(pipe.set.call_args.kwargs["value"])
+        self.assertEqual(stored[0], b"3")
+
+        # Without a preceding miss, the current generation is used.
+        principal_cache.cache_principal("12345", principal)
+        redis_connection.get.assert_called_once_with(name="rbac::generation::principal::12345")
+        self.assertEqual(pickle.loads(pipe.set.call_args.kwargs["value"])[0], b"4")
+
+
+class PrincipalCleanupCheckpointCacheTest(TestCase):
+    def setUp(self):
+        """Start every test with a closed circuit."""
+        super().setUp()
+        circuit_breaker.reset()
+
+    @override_settings(PRINCIPAL_CLEANUP_CHECKPOINT_LIFETIME=60)
+    @patch("management.cache.PrincipalCleanupCheckpointCache.connection")
+    def test_checkpoint_functions(self, redis_connection):
+        key = "rbac::principal_cleanup::checkpoint"
+        checkpoint = PrincipalCleanupCheckpointCache()
+
+        redis_connection.get.return_value = None
+        self.assertEqual(checkpoint.get_checkpoint(), 0)
+
+        checkpoint.save_checkpoint(42)
+        self.assertIn(call().__enter__().set(key, 42, ex=60), redis_connection.pipeline.mock_calls)
+
+        redis_connection.get.return_value = b"42"
+        self.assertEqual(checkpoint.get_checkpoint(), 42)
+
+        checkpoint.delete_checkpoint()
+        redis_connection.delete.assert_called_once_with(key)
+
+    @patch("management.cache.PrincipalCleanupCheckpointCache.connection")
+    def test_checkpoint_unavailable(self, redis_connection):
+        redis_connection.get.side_effect = exceptions.ConnectionError
+        self.assertEqual(PrincipalCleanupCheckpointCache().get_checkpoint(), 0)
+
+
+class SingleFlightTest(TestCase):
+    def test_concurrent_calls_share_result(self):
+        """Test that callers arriving while a call runs get a copy of its result."""
+        single_flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def function():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {"users": ["user1"]}
+
+        leader = threading.Thread(target=lambda: results.append(single_flight.do("key", function)))
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=lambda: results.append(single_flight.do("key", function)))
+        follower.start()
+        follower.join(0.1)
+        release.set()
+        leader.join()
+        follower.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"users": ["user1"]}] * 2)
+        self.assertIsNot(results[0], results[1])
+
+    def test_errors_are_raised_and_not_kept(self):
+        """Test that a failed call raises and the next call runs again."""
+        single_flight = SingleFlight()
+
+        with self.assertRaises(ValueError):
+            single_flight.do("key", lambda: int("x"))
+
+        self.assertEqual(single_flight.do("key", lambda: 1), 1)
+
+
+@skipIf(not ACCESS_CACHE_ENABLED, "Caching is disabled.")
+class PrincipalLookupCacheTest(TestCase):
+    def setUp(self):
+        """Start every test with a closed circuit."""
+        super().setUp()
+        circuit_breaker.reset()
+
+    @override_settings(PRINCIPAL_LOOKUP_CACHE_LIFETIME=60, PRINCIPAL_LOOKUP_NEGATIVE_CACHE_LIFETIME=5)
+    @patch("management.cache.PrincipalLookupCache.connection")
+    def test_lookup_functions(self, redis_connection):
+        """Test that lookups are cached, with a shorter lifetime when no principal was found."""
+        cache = PrincipalLookupCache()
+        found = {"status_code": 200, "data": [{"username": "user1"}]}
+        not_found = {"status_code": 200, "data": []}
+
+        redis_connection.get.return_value = None
+        self.assertIsNone(cache.get_lookup("1234", "User1", "status=enabled"))
+        redis_connection.get.assert_called_once_with("rbac::principal_lookup::1234::user1::status=enabled")
+
+        cache.save_lookup("1234", "user1", "status=enabled", found)
+        cache.save_lookup("1234", "unknown", "status=enabled", not_found)
+        self.assertIn(
+            call().__enter__().set("rbac::principal_lookup::1234::user1::status=enabled", json.dumps(found), ex=60),
+            redis_connection.pipeline.mock_calls,
+        )
+        self.assertIn(
+            call()
+            .__enter__()
+            .set("rbac::principal_lookup::1234::unknown::status=enabled", json.dumps(not_found), ex=5),
+            redis_connection.pipeline.mock_calls,
+        )
+
+        redis_connection.get.return_value = json.dumps(not_found).encode()
+        self.assertEqual(cache.get_lookup("1234", "unknown", "status=enabled"), not_found)
+
+    @patch("management.cache.PrincipalLookupCache.connection")
+    def test_lookup_unavailable(self, redis_connection):
+        """Test that an unreachable Redis is a cache miss."""
+        redis_connection.get.side_effect = exceptions.ConnectionError
+        self.assertIsNone(PrincipalLookupCache().get_lookup("1234", "user1"))
+
+
+@skipIf(not ACCESS_CACHE_ENABLED, "Caching is disabled.")
+class ITServiceAccountsCacheTest(TestCase):
+    def setUp(self):
+        """Start every test with a closed circuit."""
+        super().setUp()
+        circuit_breaker.reset()
+
+    @override_settings(IT_SERVICE_ACCOUNTS_CACHE_STALE_LIFETIME=600, IT_SERVICE_TIMEOUT_SECONDS=10)
+    @patch("management.cache.time.time", return_value=1000.0)
+    @patch("management.cache.ITServiceAccountsCache.connection")
+    def test_snapshot_functions(self, redis_connection, _):
+        """Test that snapshots are kept for as long as they may be served stale."""
+        key = "rbac::it::service_accounts::org_id=1234"
+        cache = ITServiceAccountsCache()
+        service_accounts = {"b6636c60": {"clientId": "b6636c60", "name": "first"}}
+        snapshot = {"taken_at": 1000.0, "service_accounts": service_accounts}
+
+        redis_connection.get.return_value = None
+        self.assertIsNone(cache.get_snapshot("1234"))
+
+        cache.save_snapshot("1234", service_accounts)
+        self.assertIn(call().__enter__().set(key, json.dumps(snapshot), ex=600), redis_connection.pipeline.mock_calls)
+
+        redis_connection.get.return_value = json.dumps(snapshot).encode()
+        self.assertEqual(cache.get_snapshot("1234"), snapshot)
+
+        redis_connection.set.return_value = True
+        self.assertTrue(cache.acquire_refresh_lock("1234"))
+        redis_connection.set.assert_called_once_with(f"{key}::refreshing", 1, nx=True, ex=600)
+
+        redis_connection.set.return_value = None
+        self.assertFalse(cache.acquire_refresh_lock("1234"))
+
+        cache.release_refresh_lock("1234")
+        redis_connection.delete.assert_called_once_with(f"{key}::refreshing")
+
+    @patch("management.cache.ITServiceAccountsCache.connection")
+    def test_snapshot_unavailable(self, redis_connection):
+        """Test that an unreachable Redis means there is no snapshot and no refresh lock."""
+        redis_connection.get.side_effect = exceptions.ConnectionError
+        redis_connection.set.side_effect = exceptions.ConnectionError
+        cache = ITServiceAccountsCache()
+
+        self.assertIsNone(cache.get_snapshot("1234"))
+        circuit_breaker.reset()
+        self.assertFalse(cache.acquire_refresh_lock("1234"))
+
+
+class KesselLookupCacheTest(TestCase):
+    def setUp(self):
+        """Start every test with a closed circuit and a tenant whose relations have a consistency token."""
+        super().setUp()
+        circuit_breaker.reset()
+        self.tenant = Tenant.objects.create(
+            tenant_name="acct_kessel", org_id="kessel", relations_consistency_token="t1"
+        )
+
+    @override_settings(KESSEL_LOOKUP_CACHE_ENABLED=True, KESSEL_LOOKUP_CACHE_LIFETIME=30)
+    @patch("management.cache.KesselLookupCache.connection")
+    def test_get_or_lookup(self, redis_connection):
+        """Test that results are cached under the current consistency token and looked up again once it moves."""
+        cache = KesselLookupCache()
+        function = Mock(return_value=["ws-1", "ws-2"])
+        key = cache.key_for("kessel", "t1", 0, "workspaces", "view@localhost/1")
+        self.assertTrue(key.startswith("rbac::kessel::kessel::0::"))
+        self.assertTrue(key.endswith("::workspaces::view@localhost/1"))
+
+        redis_connection.get.return_value = None
+        self.assertEqual(
+            cache.get_or_lookup(self.tenant, "workspaces", "view@localhost/1", function), ["ws-1", "ws-2"]
+        )
+        redis_connection.get.assert_has_calls([call(KesselLookupCache.GENERATION_KEY), call(key)])
+        self.assertIn(
+            call().__enter__().set(key, json.dumps(["ws-1", "ws-2"]), ex=30), redis_connection.pipeline.mock_calls
+        )
+
+        redis_connection.get.side_effect = {key: json.dumps(["ws-1"]).encode()}.get
+        self.assertEqual(cache.get_or_lookup(self.tenant, "workspaces", "view@localhost/1", function), ["ws-1"])
+        function.assert_called_once()
+
+        Tenant.objects.filter(pk=self.tenant.pk).update(relations_consistency_token="t2")
+        cache.get_or_lookup(self.tenant, "workspaces", "view@localhost/1", function)
+        self.assertEqual(
+            redis_connection.get.call_args.args[0],
+            cache.key_for("kessel", "t2", 0, "workspaces", "view@localhost/1"),
+        )
+
+    @override_settings(KESSEL_LOOKUP_CACHE_ENABLED=True)
+    @patch("management.cache.KesselLookupCache.connection")
+    def test_get_or_lookup_after_generation_bump(self, redis_connection):
+        """Test that changes shared by all tenants invalidate the results cached under an unchanged token."""
+        cache = KesselLookupCache()
+        redis_connection.get.side_effect = {cache.key_for("kessel", "t1", 0, "check", "workspace:1"): b"true"}.get
+        self.assertTrue(cache.get_or_lookup(self.tenant, "check", "workspace:1", lambda: False))
+
+        cache.bump_generation()
+        redis_connection.incr.assert_called_once_with(KesselLookupCache.GENERATION_KEY)
+        redis_connection.get.side_effect = {KesselLookupCache.GENERATION_KEY: b"1"}.get
+        self.assertFalse(cache.get_or_lookup(self.tenant, "check", "workspace:1", lambda: False))
+        self.assertEqual(
+            redis_connection.get.call_args.args[0], cache.key_for("kessel", "t1", 1, "check", "workspace:1")
+        )
+
+    @override_settings(KESSEL_LOOKUP_CACHE_ENABLED=True)
+    @patch("management.cache.KesselLookupCache.connection")
+    def test_get_or_lookup_reads_token_and_generation_once_per_request(self, redis_connection):
+        """Test that the consistency token and the generation are only read by the first lookup of a request."""
+        cache = KesselLookupCache()
+        redis_connection.get.side_effect = lambda key: None if key == KesselLookupCache.GENERATION_KEY else b"true"
+
+        KesselLookupCache.start_request()
+        try:
+            with self.assertNumQueries(1):
+                for subject in ("workspace:1", "workspace:2", "workspace:3"):
+                    self.assertTrue(cache.get_or_lookup(self.tenant, "check", subject, lambda: False))
+        finally:
+            KesselLookupCache.finish_request()
+        self.assertEqual(
+            [c.args[0] for c in redis_connection.get.call_args_list].count(KesselLookupCache.GENERATION_KEY), 1
+        )
+
+        with self.assertNumQueries(1):
+            cache.get_or_lookup(self.tenant, "check", "workspace:1", lambda: False)
+
+    @override_settings(KESSEL_LOOKUP_CACHE_ENABLED=True)
+    @patch("management.cache.KesselLookupCache.connection")
+    def test_get_or_lookup_not_cached(self, redis_connection):
+        """Test that failed lookups and tenants without a consistency token are not cached."""
+        cache = KesselLookupCache()
+        redis_connection.get.return_value = None
+
+        self.assertIsNone(cache.get_or_lookup(self.tenant, "check", "workspace:1#view@localhost/1", lambda: None))
+        redis_connection.pipeline.assert_not_called()
+
+        redis_connection.reset_mock()
+        Tenant.objects.filter(pk=self.tenant.pk).update(relations_consistency_token=None)
+        self.assertTrue(cache.get_or_lookup(self.tenant, "check", "workspace:1#view@localhost/1", lambda: True))
+        redis_connection.get.assert_not_called()
+
+    @patch("management.cache.KesselLookupCache.connection")
+    def test_get_or_lookup_disabled(self, redis_connection):
+        """Test that the function is always called when the cache is disabled."""
+        self.assertFalse(KesselLookupCache().get_or_lookup(self.tenant, "check", "workspace:1", lambda: False))
+        redis_connection.get.assert_not_called()
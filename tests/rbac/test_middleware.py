@@ -1115,6 +1115,28 @@ class AccessHandlingTest(TestCase):
         }
         self.assertEqual(expected, access)
 
+    @patch("rbac.middleware.access_queryset_for_principal")
+    @patch("management.cache.AccessCache.get_policy")
+    def test_cached_access_is_used(self, get_policy, access_queryset_for_principal):
+        """Test that a cached access map is returned without resolving the principal's access."""
+        principal = Principal.objects.create(username="test_user", tenant=self.tenant)
+        cached = {"group": {"read": ["*"], "write": []}}
+        get_policy.return_value = cached
+
+        access = IdentityHeaderMiddleware._get_access_for_user("test_user", self.tenant)
+        self.assertEqual(cached, access)
+        get_policy.assert_called_once_with(principal.uuid, "rbac::access")
+        access_queryset_for_principal.assert_not_called()
+
+    @patch("management.cache.AccessCache.save_policy")
+    @patch("management.cache.AccessCache.get_policy", return_value=None)
+    def test_computed_access_is_cached(self, get_policy, save_policy):
+        """Test that the computed access map is written to the access cache."""
+        principal = Principal.objects.create(username="test_user", tenant=self.tenant)
+
+        access = IdentityHeaderMiddleware._get_access_for_user("test_user", self.tenant)
+        save_policy.assert_called_once_with(principal.uuid, "rbac::access", access)
+
 
 class RBACReadOnlyApiMiddleware(IdentityRequest):
     """Tests against the read-only API middleware."""